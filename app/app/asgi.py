@@ -0,0 +1,17 @@
+"""
+ASGI config for app project.
+
+It exposes the ASGI callable as a module-level variable named ``application``
+for servers such as uvicorn, e.g. ``uvicorn app.asgi:application``.
+"""
+
+import os
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
+django.setup()
+
+from core.asgi import ASGIHandler  # noqa: E402
+
+application = ASGIHandler()
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/2.1/ref/settings/
 """
 
 import os
+import tempfile
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -40,11 +41,13 @@ INSTALLED_APPS = [
     'rest_framework',
     'rest_framework.authtoken',
     'core',
-    'user',
-    'pets',
+    'user.apps.UserConfig',
+    'pets.apps.PetsConfig',
 ]
 
 MIDDLEWARE = [
+    'core.metrics.MetricsMiddleware',
+    'core.compression.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -85,6 +88,9 @@ DATABASES = {
         'NAME': os.environ.get('DB_NAME'),
         'USER': os.environ.get('DB_USER'),
         'PASSWORD': os.environ.get('DB_PASS'),
+        'OPTIONS': {
+            'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', 5)),
+        },
     }
 }
 
@@ -132,3 +138,122 @@ MEDIA_ROOT = '/vol/web/media'
 STATIC_ROOT = '/vol/web/static'
 
 AUTH_USER_MODEL = 'core.User'
+
+# Keyset pagination for the pets API list endpoints
+
+PETS_PAGE_SIZE = int(os.environ.get('PETS_PAGE_SIZE', 50))
+PETS_MAX_PAGE_SIZE = int(os.environ.get('PETS_MAX_PAGE_SIZE', 500))
+
+# Response cache for the pets API. It also holds the per-user generations
+# behind ETags and the search and match indexes, and the token cache, so
+# every worker process must share it: a file cache unless DEBUG is on.
+# Set CACHE_BACKEND to memcached or Redis for more than one host;
+# LocMemCache is only safe with a single process.
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache' if DEBUG
+            else 'django.core.cache.backends.filebased.FileBasedCache'
+        ),
+        'LOCATION': os.environ.get(
+            'CACHE_LOCATION',
+            '' if DEBUG else os.path.join(tempfile.gettempdir(), 'pets_cache')
+        ),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('CACHE_MAX_ENTRIES', 20000)),
+        },
+    }
+}
+
+PETS_CACHE_ALIAS = 'default'
+PETS_CACHE_TIMEOUT = int(os.environ.get('PETS_CACHE_TIMEOUT', 300))
+
+# Bulk create and update on the pets API list endpoints
+
+PETS_BULK_MAX_ITEMS = int(os.environ.get('PETS_BULK_MAX_ITEMS', 10000))
+PETS_BULK_BATCH_SIZE = 1000
+
+# Rows fetched per server-side cursor round trip by the export actions
+
+PETS_EXPORT_CHUNK_SIZE = 2000
+
+# Resized copies of uploaded pet images, longest side in pixels, rendered
+# by a background worker pool after the upload is committed
+
+PETS_IMAGE_VARIANTS = {
+    'thumb': 150,
+    'card': 400,
+    'full': 1200,
+}
+PETS_IMAGE_WORKERS = int(os.environ.get('PETS_IMAGE_WORKERS', 2))
+
+# Cached token authentication: lookups live in the shared cache for
+# AUTH_TOKEN_CACHE_TTL and per process for AUTH_TOKEN_LOCAL_TTL, which also
+# bounds how long other processes may honour a revoked token
+
+AUTH_TOKEN_CACHE_ALIAS = 'default'
+AUTH_TOKEN_CACHE_TTL = int(os.environ.get('AUTH_TOKEN_CACHE_TTL', 60))
+AUTH_TOKEN_LOCAL_TTL = int(os.environ.get('AUTH_TOKEN_LOCAL_TTL', 5))
+
+# Password checks for the token endpoint run on a bounded pool; logins
+# beyond AUTH_LOGIN_MAX_PENDING queued checks get 503 instead of waiting
+
+AUTH_LOGIN_WORKERS = int(os.environ.get('AUTH_LOGIN_WORKERS', 2))
+AUTH_LOGIN_MAX_PENDING = int(os.environ.get('AUTH_LOGIN_MAX_PENDING', 32))
+AUTH_LOGIN_TIMEOUT = 10
+
+# Seconds /readyz replays its last result before checking again
+
+HEALTH_CHECK_TTL = int(os.environ.get('HEALTH_CHECK_TTL', 5))
+
+# ASGI entry point (app/asgi.py): thread pool sizes for request handling,
+# GETs of ASGI_READ_VIEWS run on a separate pool of their own
+
+ASGI_THREADS = int(os.environ.get('ASGI_THREADS', 16))
+ASGI_READ_THREADS = int(os.environ.get('ASGI_READ_THREADS', 8))
+ASGI_READ_VIEWS = (
+    'pets:pet-list',
+    'pets:pet-detail',
+    'pets:order-list',
+    'user:me',
+)
+
+# Bearer token required to scrape /metrics; without one the endpoint is
+# only served when DEBUG is on
+
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# Rows validated and committed together by pet file imports
+
+PETS_IMPORT_CHUNK_SIZE = int(os.environ.get('PETS_IMPORT_CHUNK_SIZE', 5000))
+
+# Idempotency-Key support on the pets API creates: seconds a stored response
+# is replayed for, and how long a duplicate waits on one still in progress
+
+IDEMPOTENCY_KEY_TTL = int(os.environ.get('IDEMPOTENCY_KEY_TTL', 86400))
+IDEMPOTENCY_WAIT = 10
+
+# JSON for the REST API: JSON_BACKEND is auto (orjson when installed, else
+# the stdlib), orjson or stdlib; see core.renderers for how orjson differs
+
+JSON_BACKEND = os.environ.get('JSON_BACKEND', 'auto')
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': (
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'core.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+}
+
+# API responses of at least COMPRESSION_MIN_LENGTH bytes are sent with
+# brotli (when installed) or gzip, as the client's Accept-Encoding prefers
+
+COMPRESSION_CONTENT_TYPES = ('application/json',)
+COMPRESSION_MIN_LENGTH = 512
+COMPRESSION_BROTLI_QUALITY = 4
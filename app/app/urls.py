@@ -18,9 +18,13 @@ from django.urls import path, include
 from django.conf.urls.static import static
 from django.conf import settings
 
+from core import views as core_views
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('healthz', core_views.healthz, name='healthz'),
+    path('readyz', core_views.readyz, name='readyz'),
+    path('metrics', core_views.metrics, name='metrics'),
     path('api/user/', include('user.urls')),
     path('api/pets/', include('pets.urls')),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
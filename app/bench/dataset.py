@@ -0,0 +1,105 @@
+import random
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+
+from rest_framework.authtoken.models import Token
+
+from core.models import Category, Customer, Order, PetManager, StoreStatus
+
+from pets.summary import reconcile_summary
+
+PASSWORD = 'benchpass'
+
+CATEGORIES = [key for key, _ in Category.CATEGORY_CHOICES]
+STATUSES = [key for key, _ in StoreStatus.STATUS_CHOICES]
+NAMES = (
+    'Bazzle', 'Rex', 'Milo', 'Luna', 'Coco', 'Bella', 'Max', 'Daisy',
+    'Charlie', 'Nala', 'Oscar', 'Poppy', 'Simba', 'Willow', 'Ziggy'
+)
+
+
+class Fixture:
+    """One seeded user, their token and the ids of their rows"""
+
+    def __init__(self, user, token, pets, orders, customers):
+        self.user = user
+        self.token = token
+        self.pets = pets
+        self.orders = orders
+        self.customers = customers
+
+
+def seed(prefix, users, pets, orders, customers, seed=0):
+    """Create users each owning pets, orders and customers
+
+    Every user gets the same password, hashed once, and a token. Rows are
+    inserted with bulk_create and the inventory summaries rebuilt after.
+    """
+    rng = random.Random(seed)
+    model = get_user_model()
+    password = make_password(PASSWORD)
+    created = model.objects.bulk_create(
+        model(email=f'{prefix}-{i}@example.com', password=password)
+        for i in range(users)
+    )
+    # Only PostgreSQL returns the primary keys from bulk_create
+    if created and created[0].pk is None:
+        created = list(model.objects.filter(
+            email__startswith=f'{prefix}-'
+        ).order_by('id'))
+
+    fixtures = []
+    for user in created:
+        PetManager.objects.bulk_create(
+            (PetManager(
+                user=user,
+                name=f'{rng.choice(NAMES)} {i}',
+                in_store_status=rng.choice(STATUSES),
+                category=rng.choice(CATEGORIES),
+                price=f'{rng.randint(5, 900)}.{rng.randint(0, 99):02d}'
+            ) for i in range(pets)),
+            batch_size=1000
+        )
+        Order.objects.bulk_create(
+            (Order(
+                user=user,
+                customer_name=f'Customer {i}',
+                customer_phone=f'07{rng.randint(0, 10 ** 9):09d}',
+                customer_animal_choice=rng.choice(CATEGORIES),
+                customer_budget=f'{rng.randint(5, 900)}.00',
+                customer_allocated_preference=rng.choice(NAMES)
+            ) for i in range(orders)),
+            batch_size=1000
+        )
+        Customer.objects.bulk_create(
+            (Customer(
+                user=user,
+                name=f'{rng.choice(NAMES)} Customer {i}',
+                email=f'customer{i}@example.com',
+                customer_phone=f'07{rng.randint(0, 10 ** 9):09d}',
+                customer_address=f'{i} High Street'
+            ) for i in range(customers)),
+            batch_size=1000
+        )
+        reconcile_summary(user)
+        fixtures.append(Fixture(
+            user,
+            Token.objects.create(user=user).key,
+            list(PetManager.objects.filter(user=user).values_list(
+                'id', flat=True
+            )),
+            list(Order.objects.filter(user=user).values_list(
+                'id', flat=True
+            )),
+            list(Customer.objects.filter(user=user).values_list(
+                'id', flat=True
+            )),
+        ))
+
+    return fixtures
+
+
+def clear(prefix):
+    """Delete the users created by seed with prefix and all they own"""
+    get_user_model().objects.filter(email__startswith=f'{prefix}-').delete()
@@ -0,0 +1,125 @@
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+from django.db import connection
+from django.test import Client
+
+
+def free_port():
+    """Return a local TCP port nothing is listening on"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(name, port):
+    """Start runserver ('wsgi') or uvicorn ('asgi') and wait for it"""
+    if name == 'wsgi':
+        command = [
+            sys.executable, 'manage.py', 'runserver',
+            f'127.0.0.1:{port}', '--noreload'
+        ]
+    else:
+        command = [
+            sys.executable, '-m', 'uvicorn', 'app.asgi:application',
+            '--host', '127.0.0.1', '--port', str(port),
+            '--log-level', 'warning', '--no-access-log'
+        ]
+    process = subprocess.Popen(
+        command,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        env=dict(os.environ, PYTHONUNBUFFERED='1')
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), 0.2).close()
+            return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f'{name} server did not start')
+
+
+class InProcessSession:
+    """Send requests through Django's test client in this process"""
+
+    def __init__(self):
+        self.client = Client()
+
+    def request(self, method, path, body, token):
+        kwargs = {'HTTP_AUTHORIZATION': f'Token {token}'}
+        if body is not None:
+            kwargs['data'] = json.dumps(body)
+            kwargs['content_type'] = 'application/json'
+        res = self.client.generic(method, path, **kwargs)
+        return res.status_code
+
+    def close(self):
+        connection.close()
+
+
+class HTTPSession:
+    """Send requests over one keep-alive HTTP connection"""
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip('/')
+        self.conn = None
+
+    def request(self, method, path, body, token):
+        headers = {'Authorization': f'Token {token}'}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        if self.conn is None:
+            self.conn = http.client.HTTPConnection(
+                self.host, self.port, timeout=30
+            )
+        try:
+            self.conn.request(
+                method, self.prefix + path, payload, headers
+            )
+            res = self.conn.getresponse()
+            res.read()
+        except (OSError, http.client.HTTPException):
+            self.close()
+            return 0
+        if res.getheader('Connection', '').lower() == 'close':
+            self.close()
+
+        return res.status
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+class InProcessDriver:
+    """Drive the URL routes in process, without a server or sockets"""
+    name = 'inprocess'
+
+    def session(self):
+        return InProcessSession()
+
+
+class HTTPDriver:
+    """Drive a server at url over HTTP"""
+    name = 'http'
+
+    def __init__(self, url):
+        self.url = url
+
+    def session(self):
+        return HTTPSession(self.url)
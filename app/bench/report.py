@@ -0,0 +1,101 @@
+import json
+import math
+
+TOTAL = 'total'
+
+
+def percentile(ordered, percent):
+    """Return the nearest-rank percentile of an ascending list"""
+    if not ordered:
+        return 0.0
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def summarize(latencies, errors, seconds):
+    """Return throughput and latency figures for one set of requests"""
+    ordered = sorted(latencies)
+    return {
+        'requests': len(ordered),
+        'errors': errors,
+        'throughput': round(len(ordered) / seconds, 2),
+        'p50_ms': round(percentile(ordered, 50) * 1000, 3),
+        'p95_ms': round(percentile(ordered, 95) * 1000, 3),
+        'p99_ms': round(percentile(ordered, 99) * 1000, 3),
+    }
+
+
+def build_result(recorder, seconds, meta):
+    """Return the JSON-ready result of a run"""
+    names = sorted(set(recorder.latencies) | set(recorder.errors))
+    endpoints = {
+        name: summarize(
+            recorder.latencies.get(name, []),
+            recorder.errors.get(name, 0),
+            seconds
+        )
+        for name in names
+    }
+    endpoints[TOTAL] = summarize(
+        [value for values in recorder.latencies.values() for value in values],
+        sum(recorder.errors.values()),
+        seconds
+    )
+
+    return {'meta': meta, 'endpoints': endpoints}
+
+
+def save(result, path):
+    with open(path, 'w') as handle:
+        json.dump(result, handle, indent=2, sort_keys=True)
+        handle.write('\n')
+
+
+def load(path):
+    with open(path) as handle:
+        return json.load(handle)
+
+
+def format_table(result):
+    """Return the result's endpoints as a fixed width table"""
+    lines = [
+        f'{"endpoint":<20} {"req/s":>9} {"p50":>9} {"p95":>9} '
+        f'{"p99":>9} {"errors":>7}'
+    ]
+    for name, row in sorted(
+            result['endpoints'].items(), key=lambda item: item[0] == TOTAL):
+        lines.append(
+            f'{name:<20} {row["throughput"]:>9.1f} '
+            f'{row["p50_ms"]:>7.1f}ms {row["p95_ms"]:>7.1f}ms '
+            f'{row["p99_ms"]:>7.1f}ms {row["errors"]:>7}'
+        )
+    return '\n'.join(lines)
+
+
+def compare(baseline, current, threshold):
+    """Return (lines, regressions) comparing current with a baseline
+
+    An endpoint regresses when its p95 latency rises, or its throughput
+    falls, by more than threshold as a fraction of the baseline.
+    """
+    lines = [
+        f'{"endpoint":<20} {"req/s":>9} {"p95":>9} {"p99":>9}'
+    ]
+    regressions = []
+    for name, row in sorted(current['endpoints'].items()):
+        old = baseline['endpoints'].get(name)
+        if old is None:
+            continue
+        changes = {
+            key: (row[key] - old[key]) / old[key] if old[key] else 0.0
+            for key in ('throughput', 'p95_ms', 'p99_ms')
+        }
+        lines.append(
+            f'{name:<20} {changes["throughput"]:>+9.1%} '
+            f'{changes["p95_ms"]:>+9.1%} {changes["p99_ms"]:>+9.1%}'
+        )
+        if changes['p95_ms'] > threshold \
+                or changes['throughput'] < -threshold:
+            regressions.append(name)
+
+    return lines, regressions
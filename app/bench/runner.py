@@ -0,0 +1,67 @@
+import random
+import threading
+import time
+
+
+class Recorder:
+    """Collect latencies and failures per endpoint from worker threads"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+
+    def add(self, name, seconds, ok):
+        with self.lock:
+            if ok:
+                self.latencies.setdefault(name, []).append(seconds)
+            else:
+                self.errors[name] = self.errors.get(name, 0) + 1
+
+
+def _worker(driver, fixtures, mix, deadline, warmup, recorder, seed):
+    rng = random.Random(seed)
+    session = driver.session()
+    try:
+        while True:
+            now = time.perf_counter()
+            if now >= deadline:
+                break
+            fixture = rng.choice(fixtures)
+            endpoint = mix.choose(rng)
+            path, body = endpoint.build(fixture, rng)
+            start = time.perf_counter()
+            status = session.request(
+                endpoint.method, path, body, fixture.token
+            )
+            elapsed = time.perf_counter() - start
+            if start >= warmup:
+                recorder.add(endpoint.name, elapsed, 200 <= status < 400)
+    finally:
+        session.close()
+
+
+def run(driver, fixtures, mix, concurrency, seconds, warmup=0, seed=0):
+    """Drive the mix from concurrency threads, return a Recorder
+
+    Requests started in the first warmup seconds are made but not recorded.
+    """
+    recorder = Recorder()
+    start = time.perf_counter()
+    deadline = start + warmup + seconds
+    threads = [
+        threading.Thread(
+            target=_worker,
+            args=(
+                driver, fixtures, mix, deadline, start + warmup, recorder,
+                seed + i
+            )
+        )
+        for i in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return recorder
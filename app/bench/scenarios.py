@@ -0,0 +1,103 @@
+from django.urls import reverse
+
+from bench.dataset import CATEGORIES, NAMES, STATUSES
+
+
+class Endpoint:
+    """A route driven by the benchmark and how to build requests for it
+
+    build(fixture, rng) returns the (path, body) of one request, a body of
+    None sends no payload.
+    """
+
+    def __init__(self, name, method, write, weight, build):
+        self.name = name
+        self.method = method
+        self.write = write
+        self.weight = weight
+        self.build = build
+
+
+def _pet_body(rng):
+    return {
+        'name': rng.choice(NAMES),
+        'in_store_status': rng.choice(STATUSES),
+        'category': rng.choice(CATEGORIES),
+        'price': f'{rng.randint(5, 900)}.00',
+    }
+
+
+ENDPOINTS = (
+    Endpoint('pet-list', 'GET', False, 10, lambda f, rng: (
+        reverse('pets:pet-list'), None
+    )),
+    Endpoint('pet-list-filtered', 'GET', False, 4, lambda f, rng: (
+        f'{reverse("pets:pet-list")}?category={rng.choice(CATEGORIES)}'
+        f'&in_store_status=Instore', None
+    )),
+    Endpoint('pet-detail', 'GET', False, 10, lambda f, rng: (
+        reverse('pets:pet-detail', args=[rng.choice(f.pets)]), None
+    )),
+    Endpoint('pet-search', 'GET', False, 3, lambda f, rng: (
+        f'{reverse("pets:pet-search")}?q={rng.choice(NAMES)[:3]}', None
+    )),
+    Endpoint('order-list', 'GET', False, 4, lambda f, rng: (
+        reverse('pets:order-list'), None
+    )),
+    Endpoint('order-detail', 'GET', False, 4, lambda f, rng: (
+        reverse('pets:order-detail', args=[rng.choice(f.orders)]), None
+    )),
+    Endpoint('customer-list', 'GET', False, 4, lambda f, rng: (
+        reverse('pets:customer-list'), None
+    )),
+    Endpoint('summary', 'GET', False, 2, lambda f, rng: (
+        reverse('pets:summary'), None
+    )),
+    Endpoint('user-me', 'GET', False, 2, lambda f, rng: (
+        reverse('user:me'), None
+    )),
+    Endpoint('pet-create', 'POST', True, 4, lambda f, rng: (
+        reverse('pets:pet-list'), _pet_body(rng)
+    )),
+    Endpoint('pet-update', 'PATCH', True, 4, lambda f, rng: (
+        reverse('pets:pet-detail', args=[rng.choice(f.pets)]),
+        {'price': f'{rng.randint(5, 900)}.00'}
+    )),
+    Endpoint('order-create', 'POST', True, 2, lambda f, rng: (
+        reverse('pets:order-list'), {
+            'customer_name': 'Bench Customer',
+            'customer_phone': '07123456789',
+            'customer_animal_choice': rng.choice(CATEGORIES),
+            'customer_budget': f'{rng.randint(5, 900)}.00',
+            'customer_allocated_preference': rng.choice(NAMES),
+        }
+    )),
+    Endpoint('customer-create', 'POST', True, 1, lambda f, rng: (
+        reverse('pets:customer-list'), {
+            'name': 'Bench Customer',
+            'email': 'bench@example.com',
+            'customer_phone': '07123456789',
+            'customer_address': '1 High Street',
+        }
+    )),
+)
+
+
+class Mix:
+    """Pick endpoints so that about write_ratio of requests are writes"""
+
+    def __init__(self, write_ratio, endpoints=ENDPOINTS, only=None):
+        if only:
+            endpoints = [e for e in endpoints if e.name in only]
+        self.write_ratio = write_ratio
+        self.reads = [e for e in endpoints if not e.write]
+        self.writes = [e for e in endpoints if e.write]
+        if not self.writes:
+            self.write_ratio = 0
+        elif not self.reads:
+            self.write_ratio = 1
+
+    def choose(self, rng):
+        group = self.writes if rng.random() < self.write_ratio \
+            else self.reads
+        return rng.choices(group, [e.weight for e in group])[0]
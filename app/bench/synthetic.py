@@ -0,0 +1,337 @@
+import io
+import itertools
+import math
+import random
+from collections import Counter
+from contextlib import contextmanager
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+
+from core.models import Customer, InventorySummary, Order, PetManager
+
+from bench.dataset import CATEGORIES, NAMES, STATUSES
+
+
+def parse_weights(text, choices):
+    """Return (choices, weights) from 'Dog=40,Cat=60' text
+
+    Choices left out get no rows, an empty text weighs all choices evenly.
+    """
+    if not text:
+        return list(choices), [1] * len(choices)
+
+    weights = {}
+    for part in text.split(','):
+        key, _, weight = part.partition('=')
+        key = key.strip()
+        if key not in choices:
+            raise ValueError(f'{key!r} is not one of {", ".join(choices)}')
+        try:
+            weights[key] = float(weight)
+        except ValueError:
+            raise ValueError(f'{part!r} has no numeric weight')
+        if weights[key] < 0:
+            raise ValueError(f'{part!r} has a negative weight')
+    if not sum(weights.values()):
+        raise ValueError(f'{text!r} gives every choice a zero weight')
+    keys = [key for key in choices if weights.get(key)]
+
+    return keys, [weights[key] for key in keys]
+
+
+class Sampler:
+    """Draw weighted choices through a table of equally likely slots
+
+    random.choices with weights bisects in Python for every draw; spreading
+    the choices over a table once lets each draw be a plain index. Weights
+    are rounded to 1 / slots, so very rare choices may never be drawn.
+    """
+
+    def __init__(self, choices, weights=None, slots=1 << 20):
+        if weights is None or len(set(weights)) == 1:
+            self.table = list(choices)
+            return
+
+        scale = slots / sum(weights)
+        self.table = []
+        filled = 0
+        for choice, total in zip(
+                choices, itertools.accumulate(weights)):
+            end = round(total * scale)
+            self.table.extend([choice] * (end - filled))
+            filled = end
+
+    def draw(self, rng, count):
+        return rng.choices(self.table, k=count)
+
+
+class Distribution:
+    """Random column values for generated rows
+
+    Categories and statuses are drawn with the given weights, owners with
+    a Zipf skew (0 for an even spread) and prices to the cent either
+    uniformly or log-normally around the geometric mean of the range.
+    """
+
+    def __init__(self, categories='', statuses='', price_min=5,
+                 price_max=900, price_shape='uniform', user_skew=0.0):
+        if not 0 < price_min < price_max:
+            raise ValueError('Prices need 0 < minimum < maximum')
+        self.categories = Sampler(*parse_weights(categories, CATEGORIES))
+        self.statuses = Sampler(*parse_weights(statuses, STATUSES))
+        self.user_skew = user_skew
+
+        low, high = int(price_min * 100), int(price_max * 100)
+        prices = [
+            f'{cents // 100}.{cents % 100:02d}'
+            for cents in range(low, high + 1)
+        ]
+        weights = None
+        if price_shape == 'lognormal':
+            mu = (math.log(low) + math.log(high)) / 2
+            sigma = (math.log(high) - math.log(low)) / 6
+            weights = [
+                math.exp(-(math.log(cents) - mu) ** 2 / (2 * sigma ** 2))
+                / cents
+                for cents in range(low, high + 1)
+            ]
+        self.prices = Sampler(prices, weights)
+
+    def owners(self, user_ids):
+        """Return a sampler spreading rows over user_ids"""
+        return Sampler(user_ids, [
+            1 / (rank + 1) ** self.user_skew for rank in range(len(user_ids))
+        ])
+
+
+def _phones(rng, count):
+    draw = rng.random
+    return [f'07{int(draw() * 1e9):09d}' for _ in range(count)]
+
+
+class CopyWriter:
+    """Load column lists into a table with PostgreSQL COPY"""
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def write(self, model, columns):
+        data = io.StringIO()
+        data.writelines(
+            '\t'.join(row) + '\n' for row in zip(*columns.values())
+        )
+        data.seek(0)
+        quote = self.connection.ops.quote_name
+        with self.connection.cursor() as cursor:
+            cursor.copy_expert(
+                f'COPY {quote(model._meta.db_table)} '
+                f'({", ".join(quote(name) for name in columns)}) '
+                f'FROM STDIN',
+                data
+            )
+
+
+@contextmanager
+def deferred_indexes(connection, models):
+    """Drop the models' secondary indexes and foreign keys, then restore
+
+    Building an index once over the loaded rows, and validating a foreign
+    key in one pass, is far cheaper than maintaining them row by row.
+    Primary keys and unique indexes are kept.
+    """
+    tables = [model._meta.db_table for model in models]
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT t.relname, c.conname, pg_get_constraintdef(c.oid) '
+            'FROM pg_constraint c JOIN pg_class t ON t.oid = c.conrelid '
+            'WHERE c.contype = %s AND t.relname = ANY(%s) '
+            'AND t.relnamespace = current_schema()::regnamespace',
+            ['f', tables]
+        )
+        constraints = cursor.fetchall()
+        cursor.execute(
+            'SELECT i.indexname, i.indexdef FROM pg_indexes i '
+            'JOIN pg_class c ON c.relname = i.indexname '
+            'JOIN pg_index x ON x.indexrelid = c.oid '
+            'WHERE i.schemaname = current_schema() '
+            'AND i.tablename = ANY(%s) AND NOT x.indisunique',
+            [tables]
+        )
+        indexes = cursor.fetchall()
+        for table, name, _ in constraints:
+            cursor.execute(
+                f'ALTER TABLE {quote(table)} DROP CONSTRAINT {quote(name)}'
+            )
+        for name, _ in indexes:
+            cursor.execute(f'DROP INDEX {quote(name)}')
+    yield
+    with connection.cursor() as cursor:
+        # CREATE INDEX refuses to start while deferred checks are pending
+        cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+        for _, definition in indexes:
+            cursor.execute(definition)
+        for table, name, definition in constraints:
+            cursor.execute(
+                f'ALTER TABLE {quote(table)} '
+                f'ADD CONSTRAINT {quote(name)} {definition}'
+            )
+
+
+class BulkWriter:
+    """Load column lists into a table with bulk_create"""
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+
+    def write(self, model, columns):
+        names = list(columns)
+        model.objects.bulk_create(
+            (model(**dict(zip(names, row)))
+             for row in zip(*columns.values())),
+            batch_size=self.batch_size
+        )
+
+
+class _Streams(dict):
+    """Random streams per column, each seeded from the table and column"""
+
+    def __init__(self, seed):
+        super().__init__()
+        self.seed = seed
+
+    def __missing__(self, column):
+        rng = self[column] = random.Random(f'{self.seed}:{column}')
+        return rng
+
+
+class Generator:
+    """Write deterministic synthetic users, pets, orders and customers
+
+    Every column draws from its own random stream seeded from seed, so the
+    rows generated do not depend on the batch size or on which other
+    tables are filled.
+    """
+
+    def __init__(self, writer, distribution, prefix, seed=0,
+                 batch_size=50000):
+        self.writer = writer
+        self.distribution = distribution
+        self.prefix = prefix
+        self.seed = seed
+        self.batch_size = batch_size
+        self.inventory = Counter()
+
+    def streams(self, table):
+        return _Streams(f'{self.seed}:{table}')
+
+    def batches(self, total):
+        for start in range(0, total, self.batch_size):
+            yield start, min(self.batch_size, total - start)
+
+    def users(self, count, password):
+        """Create count users sharing one hashed password, return their ids"""
+        encoded = make_password(password)
+        model = get_user_model()
+        for start, size in self.batches(count):
+            self.writer.write(model, {
+                'email': [
+                    f'{self.prefix}-{i}@example.com'
+                    for i in range(start, start + size)
+                ],
+                'name': [f'User {i}' for i in range(start, start + size)],
+                'password': [encoded] * size,
+                'is_superuser': ['f'] * size,
+                'is_active': ['t'] * size,
+                'is_staff': ['f'] * size,
+            })
+
+        return [str(pk) for pk in model.objects.filter(
+            email__startswith=f'{self.prefix}-'
+        ).order_by('id').values_list('id', flat=True)]
+
+    def pets(self, count, user_ids):
+        rng = self.streams('pets')
+        dist = self.distribution
+        owners = dist.owners(user_ids)
+        for start, size in self.batches(count):
+            columns = {
+                'user_id': owners.draw(rng['user_id'], size),
+                'name': [
+                    f'{name} {i}' for i, name in enumerate(
+                        rng['name'].choices(NAMES, k=size), start
+                    )
+                ],
+                'in_store_status': dist.statuses.draw(
+                    rng['in_store_status'], size
+                ),
+                'category': dist.categories.draw(rng['category'], size),
+                'price': dist.prices.draw(rng['price'], size),
+                'image_variants': [''] * size,
+                'version': ['0'] * size,
+            }
+            self.writer.write(PetManager, columns)
+            self.inventory.update(zip(
+                columns['user_id'], columns['category'],
+                columns['in_store_status']
+            ))
+            yield size
+
+    def orders(self, count, user_ids):
+        rng = self.streams('orders')
+        dist = self.distribution
+        owners = dist.owners(user_ids)
+        for start, size in self.batches(count):
+            self.writer.write(Order, {
+                'user_id': owners.draw(rng['user_id'], size),
+                'customer_name': [
+                    f'Customer {i}' for i in range(start, start + size)
+                ],
+                'customer_phone': _phones(rng['customer_phone'], size),
+                'customer_animal_choice': dist.categories.draw(
+                    rng['customer_animal_choice'], size
+                ),
+                'customer_budget': dist.prices.draw(
+                    rng['customer_budget'], size
+                ),
+                'customer_allocated_preference': rng[
+                    'customer_allocated_preference'
+                ].choices(NAMES, k=size),
+            })
+            yield size
+
+    def customers(self, count, user_ids):
+        rng = self.streams('customers')
+        owners = self.distribution.owners(user_ids)
+        for start, size in self.batches(count):
+            self.writer.write(Customer, {
+                'user_id': owners.draw(rng['user_id'], size),
+                'name': [
+                    f'{name} Customer {i}' for i, name in enumerate(
+                        rng['name'].choices(NAMES, k=size), start
+                    )
+                ],
+                'email': [
+                    f'customer{i}@example.com'
+                    for i in range(start, start + size)
+                ],
+                'customer_phone': _phones(rng['customer_phone'], size),
+                'customer_address': [
+                    f'{i} High Street' for i in range(start, start + size)
+                ],
+            })
+            yield size
+
+    def summaries(self):
+        """Write the inventory summaries of the pets generated"""
+        InventorySummary.objects.bulk_create(
+            (InventorySummary(
+                user_id=int(user_id),
+                category=category,
+                in_store_status=in_store_status,
+                count=count
+            ) for (user_id, category, in_store_status), count
+                in self.inventory.items()),
+            batch_size=1000
+        )
@@ -0,0 +1,217 @@
+import asyncio
+import logging
+import sys
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.wsgi import get_wsgi_application
+from django.urls import Resolver404, resolve
+
+logger = logging.getLogger(__name__)
+
+# Request bodies larger than this are spooled to a temporary file
+SPOOL_SIZE = 1024 * 1024
+
+SERVER_ERROR = (
+    '500 Internal Server Error', [('Content-Type', 'text/plain')]
+)
+
+
+def build_environ(scope, body):
+    """Translate an ASGI HTTP scope and body file into a WSGI environ"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': scope['path'].encode('utf8').decode('latin1'),
+        'QUERY_STRING': scope['query_string'].decode('latin1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'REMOTE_ADDR': client[0],
+        'SERVER_PROTOCOL': f'HTTP/{scope.get("http_version", "1.1")}',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': body,
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    body.seek(0, 2)
+    environ['CONTENT_LENGTH'] = str(body.tell())
+    body.seek(0)
+    for name, value in scope.get('headers', ()):
+        name = name.decode('latin1').upper().replace('-', '_')
+        value = value.decode('latin1')
+        if name == 'CONTENT_LENGTH':
+            # The body has been read whole, its real length is already set
+            continue
+        if name != 'CONTENT_TYPE':
+            name = f'HTTP_{name}'
+        if name in environ:
+            value = f'{environ[name]},{value}'
+        environ[name] = value
+
+    return environ
+
+
+class ASGIHandler:
+    """Serve the Django project over ASGI from bounded thread pools
+
+    Django 2.1 has neither async views nor an async ORM, so every request
+    still runs the regular handler, but on a thread pool sized in settings
+    while the event loop holds the connections. Hot read endpoints get a
+    pool of their own so slow writes, exports and logins cannot starve
+    them.
+    """
+
+    def __init__(self):
+        self.application = get_wsgi_application()
+        self.read_views = frozenset(getattr(settings, 'ASGI_READ_VIEWS', ()))
+        self.read_pool = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'ASGI_READ_THREADS', 8),
+            thread_name_prefix='asgi-read'
+        )
+        self.pool = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'ASGI_THREADS', 16),
+            thread_name_prefix='asgi'
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self.http(scope, receive, send)
+        else:
+            raise ValueError(f'Unsupported ASGI scope type {scope["type"]}')
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.read_pool.shutdown(wait=True)
+                self.pool.shutdown(wait=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    def get_pool(self, scope):
+        """Return the read pool for GETs of hot read views, else the other"""
+        if scope['method'] not in ('GET', 'HEAD') or not self.read_views:
+            return self.pool
+        try:
+            match = resolve(scope['path'])
+        except Resolver404:
+            return self.pool
+
+        return self.read_pool if match.view_name in self.read_views \
+            else self.pool
+
+    async def read_body(self, receive):
+        body = tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE)
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                body.close()
+                return None
+            body.write(message.get('body', b''))
+            if not message.get('more_body', False):
+                break
+
+        return body
+
+    async def watch_disconnect(self, receive, closed):
+        """Set closed once the client disconnects"""
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                closed.set()
+                return
+
+    def run(self, environ, loop, queue, closed):
+        """Call the WSGI application and feed its output to queue
+
+        The whole response is produced on this one pool thread, so lazy
+        querysets and server-side cursors in streamed bodies stay on the
+        thread that owns their connection. The queue always receives a
+        status first and None last, a 500 if the application raised
+        before starting its response.
+        """
+        started = False
+
+        def put(item):
+            asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+        def start_response(status, headers, exc_info=None):
+            nonlocal started
+            started = True
+            put((status, headers))
+
+        result = None
+        try:
+            result = self.application(environ, start_response)
+            for chunk in result:
+                if closed.is_set():
+                    break
+                if chunk:
+                    put(chunk)
+        except Exception:
+            logger.exception('Error serving %s', environ['PATH_INFO'])
+            if not started:
+                put(SERVER_ERROR)
+                put(b'Internal Server Error')
+        finally:
+            # Fires request_finished, closing this thread's connections
+            if hasattr(result, 'close'):
+                result.close()
+            put(None)
+
+    async def http(self, scope, receive, send):
+        body = await self.read_body(receive)
+        if body is None:
+            return
+
+        loop = asyncio.get_event_loop()
+        queue = asyncio.Queue(maxsize=8)
+        closed = threading.Event()
+        watcher = loop.create_task(self.watch_disconnect(receive, closed))
+        task = loop.run_in_executor(
+            self.get_pool(scope), self.run,
+            build_environ(scope, body), loop, queue, closed
+        )
+        finished = False
+        try:
+            status, headers = await queue.get()
+            await send({
+                'type': 'http.response.start',
+                'status': int(status.split(' ', 1)[0]),
+                'headers': [
+                    (name.lower().encode('latin1'), value.encode('latin1'))
+                    for name, value in headers
+                ],
+            })
+            while True:
+                chunk = await queue.get()
+                if chunk is None:
+                    finished = True
+                    break
+                if scope['method'] != 'HEAD' and not closed.is_set():
+                    await send({
+                        'type': 'http.response.body',
+                        'body': chunk,
+                        'more_body': True,
+                    })
+            if not closed.is_set():
+                await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            # Stop the producer and take what it still puts until its end
+            closed.set()
+            watcher.cancel()
+            while not finished:
+                finished = await queue.get() is None
+            await task
+            body.close()
@@ -0,0 +1,99 @@
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def _brotli(content):
+    return brotli.compress(
+        content, quality=getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 4)
+    )
+
+
+# Codings offered in order of preference when the client weighs them alike
+COMPRESSORS = {'br': _brotli} if brotli is not None else {}
+COMPRESSORS['gzip'] = compress_string
+
+
+def parse_accept_encoding(header):
+    """Return the q value of each coding listed in an Accept-Encoding"""
+    weights = {}
+    for part in header.split(','):
+        coding, *params = [item.strip() for item in part.split(';')]
+        if not coding:
+            continue
+        weight = 1.0
+        for param in params:
+            name, _, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding.lower()] = weight
+
+    return weights
+
+
+def choose_encoding(header, codings):
+    """Return the coding of codings the client weighs highest, or None
+
+    Codings the header leaves out are only acceptable through '*', and a
+    q of 0 refuses one. Ties go to the earlier coding in codings.
+    """
+    weights = parse_accept_encoding(header or '')
+    best, best_weight = None, 0.0
+    for coding in codings:
+        weight = weights.get(coding, weights.get('*', 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+
+    return best
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Compress response bodies with brotli or gzip, as the client prefers
+
+    Like Django's GZipMiddleware, but negotiating q values and brotli when
+    the brotli module is installed. Only the API's content types, listed
+    in COMPRESSION_CONTENT_TYPES, are compressed; admin pages, streaming
+    responses, which manage their own encoding, and bodies under
+    COMPRESSION_MIN_LENGTH are sent as they are.
+    """
+
+    def process_response(self, request, response):
+        if response.streaming or response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '').split(';')[0]
+        if content_type.strip().lower() not in getattr(
+                settings, 'COMPRESSION_CONTENT_TYPES', ('application/json',)):
+            return response
+        min_length = getattr(settings, 'COMPRESSION_MIN_LENGTH', 512)
+        if len(response.content) < min_length:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        coding = choose_encoding(
+            request.META.get('HTTP_ACCEPT_ENCODING'), COMPRESSORS
+        )
+        if coding is None:
+            return response
+
+        compressed = COMPRESSORS[coding](response.content)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response['Content-Length'] = str(len(compressed))
+        response['Content-Encoding'] = coding
+        # The body is no longer byte for byte the tagged one
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+
+        return response
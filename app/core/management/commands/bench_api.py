@@ -0,0 +1,122 @@
+import datetime
+import platform
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bench import dataset, report
+from bench.drivers import HTTPDriver, InProcessDriver, free_port, \
+    start_server
+from bench.runner import run
+from bench.scenarios import ENDPOINTS, Mix
+
+PREFIX = 'bench-api'
+
+
+class Command(BaseCommand):
+    """Django command to load test the API routes and record the results"""
+    help = 'Seed a dataset, drive the API with a read/write mix and ' \
+           'report throughput and latency per endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--driver', choices=['inprocess', 'http'], default='inprocess'
+        )
+        parser.add_argument(
+            '--url', help='Server to drive with --driver http'
+        )
+        parser.add_argument(
+            '--server', choices=['wsgi', 'asgi'], default='asgi',
+            help='Server to start when --driver http has no --url'
+        )
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--seconds', type=float, default=10)
+        parser.add_argument('--warmup', type=float, default=1)
+        parser.add_argument('--write-ratio', type=float, default=0.1)
+        parser.add_argument(
+            '--endpoints', nargs='+',
+            choices=[endpoint.name for endpoint in ENDPOINTS],
+            help='Only drive these endpoints'
+        )
+        parser.add_argument('--users', type=int, default=4)
+        parser.add_argument('--pets', type=int, default=2000)
+        parser.add_argument('--orders', type=int, default=500)
+        parser.add_argument('--customers', type=int, default=500)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='Write the JSON result here')
+        parser.add_argument('--baseline', help='JSON result to compare to')
+        parser.add_argument('--threshold', type=float, default=0.1)
+        parser.add_argument(
+            '--fail-on-regression', action='store_true',
+            help='Exit non-zero when an endpoint regressed past threshold'
+        )
+
+    def get_driver(self, options):
+        """Return the driver and any server process started for it"""
+        if options['driver'] == 'inprocess':
+            return InProcessDriver(), None
+        if options['url']:
+            return HTTPDriver(options['url']), None
+        port = free_port()
+        try:
+            process = start_server(options['server'], port)
+        except RuntimeError as exc:
+            raise CommandError(exc)
+
+        return HTTPDriver(f'http://127.0.0.1:{port}'), process
+
+    def handle(self, *args, **options):
+        if not 0 <= options['write_ratio'] <= 1:
+            raise CommandError('--write-ratio must be between 0 and 1')
+        mix = Mix(options['write_ratio'], only=options['endpoints'])
+
+        dataset.clear(PREFIX)
+        fixtures = dataset.seed(
+            PREFIX, options['users'], options['pets'], options['orders'],
+            options['customers'], options['seed']
+        )
+        driver, process = self.get_driver(options)
+        try:
+            recorder = run(
+                driver, fixtures, mix, options['concurrency'],
+                options['seconds'], options['warmup'], options['seed']
+            )
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+            dataset.clear(PREFIX)
+
+        result = report.build_result(recorder, options['seconds'], {
+            'driver': driver.name,
+            'server': options['server'] if process else options['url'],
+            'concurrency': options['concurrency'],
+            'seconds': options['seconds'],
+            'write_ratio': mix.write_ratio,
+            'dataset': {
+                key: options[key]
+                for key in ('users', 'pets', 'orders', 'customers', 'seed')
+            },
+            'python': platform.python_version(),
+            'started': datetime.datetime.now().isoformat(timespec='seconds'),
+        })
+        self.stdout.write(report.format_table(result))
+        if options['output']:
+            report.save(result, options['output'])
+
+        if options['baseline']:
+            baseline = report.load(options['baseline'])
+            for key in ('driver', 'server', 'concurrency', 'write_ratio'):
+                if baseline['meta'].get(key) != result['meta'][key]:
+                    self.stdout.write(self.style.WARNING(
+                        f'Baseline {key} was {baseline["meta"].get(key)}'
+                    ))
+            lines, regressions = report.compare(
+                baseline, result, options['threshold']
+            )
+            self.stdout.write('\nChange against baseline')
+            self.stdout.write('\n'.join(lines))
+            if regressions:
+                message = f'Regressed: {", ".join(regressions)}'
+                if options['fail_on_regression']:
+                    raise CommandError(message)
+                self.stdout.write(self.style.WARNING(message))
@@ -0,0 +1,127 @@
+import time
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core import renderers
+from core.compression import COMPRESSORS
+from core.models import Order, PetManager
+from core.renderers import FastJSONParser, FastJSONRenderer
+
+from pets.serializers import OrderSerializer, PetSerializer
+
+
+class Rollback(Exception):
+    """Raised to discard the benchmark rows"""
+
+
+class Command(BaseCommand):
+    """Django command to compare DRF's JSON with the fast renderer"""
+    help = 'Time JSON rendering, parsing and compression of large pet ' \
+           'and order lists'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows', type=int, nargs='+', default=[1000, 10000, 50000]
+        )
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def best_of(self, repeat, func):
+        """Return the fastest of repeat timed calls of func"""
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    def seed(self, rows):
+        """Create rows pets and orders and return their serialized lists"""
+        user = get_user_model().objects.create(
+            email=f'bench-json-{rows}@example.com'
+        )
+        PetManager.objects.bulk_create(
+            PetManager(
+                user=user, name=f'Pet {i}', in_store_status='Instore',
+                category='Dog', price=f'{i % 1000}.{i % 100:02d}'
+            )
+            for i in range(rows)
+        )
+        Order.objects.bulk_create(
+            Order(
+                user=user, customer_name=f'Customer {i}',
+                customer_phone='07123456789', customer_animal_choice='Dog',
+                customer_budget=f'{i % 1000}.{i % 100:02d}',
+                customer_allocated_preference=f'Pet {i}'
+            )
+            for i in range(rows)
+        )
+
+        return {
+            'pets': PetSerializer(
+                PetManager.objects.filter(user=user), many=True
+            ).data,
+            'orders': OrderSerializer(
+                Order.objects.filter(user=user), many=True
+            ).data,
+        }
+
+    def measure(self, repeat, data):
+        """Yield a result row per JSON backend for one payload"""
+        content = JSONRenderer().render(data)
+        drf_render = self.best_of(
+            repeat, lambda: JSONRenderer().render(data)
+        )
+        drf_parse = self.best_of(
+            repeat, lambda: JSONParser().parse(BytesIO(content))
+        )
+        yield 'drf', drf_render, drf_parse
+
+        backends = ['stdlib'] + (['orjson'] if renderers.orjson else [])
+        for name in backends:
+            with override_settings(JSON_BACKEND=name):
+                yield name, self.best_of(
+                    repeat, lambda: FastJSONRenderer().render(data)
+                ), self.best_of(
+                    repeat, lambda: FastJSONParser().parse(BytesIO(content))
+                )
+
+    def handle(self, *args, **options):
+        repeat = options['repeat']
+        self.stdout.write(
+            f'{"payload":>8} {"rows":>7} {"backend":>7} {"render":>9} '
+            f'{"parse":>9} {"speedup":>8}'
+        )
+
+        for rows in options['rows']:
+            try:
+                with transaction.atomic():
+                    payloads = self.seed(rows)
+                    raise Rollback
+            except Rollback:
+                pass
+
+            for kind, data in payloads.items():
+                baseline = None
+                for name, render, parse in self.measure(repeat, data):
+                    baseline = baseline or render
+                    self.stdout.write(
+                        f'{kind:>8} {rows:>7} {name:>7} {render:>8.3f}s '
+                        f'{parse:>8.3f}s {baseline / render:>7.1f}x'
+                    )
+
+                content = JSONRenderer().render(data)
+                for coding, compress in COMPRESSORS.items():
+                    start = time.perf_counter()
+                    size = len(compress(content))
+                    elapsed = time.perf_counter() - start
+                    self.stdout.write(
+                        f'{kind:>8} {rows:>7} {coding:>7} {elapsed:>8.3f}s '
+                        f'{len(content) // 1024:>7}K -> {size // 1024}K'
+                    )
@@ -0,0 +1,110 @@
+import http.client
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from rest_framework.authtoken.models import Token
+
+from bench.drivers import free_port, start_server
+
+from core.models import PetManager
+
+READ_PATHS = ('/api/pets/pets/', '/api/pets/order/', '/api/user/me/')
+
+
+class Command(BaseCommand):
+    """Django command to compare the WSGI and ASGI entry points"""
+    help = 'Time concurrent API reads against runserver and uvicorn'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--connections', type=int, nargs='+', default=[1, 16, 64]
+        )
+        parser.add_argument('--seconds', type=float, default=5)
+        parser.add_argument('--pets', type=int, default=200)
+
+    def client_loop(self, port, token, deadline, latencies, errors):
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        headers = {'Authorization': f'Token {token}'}
+        turn = 0
+        while time.perf_counter() < deadline:
+            path = READ_PATHS[turn % len(READ_PATHS)]
+            turn += 1
+            start = time.perf_counter()
+            try:
+                conn.request('GET', path, headers=headers)
+                res = conn.getresponse()
+                res.read()
+                if res.status != 200:
+                    errors.append(res.status)
+                if res.getheader('Connection', '').lower() == 'close':
+                    conn.close()
+            except (OSError, http.client.HTTPException) as exc:
+                errors.append(exc)
+                conn.close()
+                continue
+            latencies.append(time.perf_counter() - start)
+        conn.close()
+
+    def measure(self, port, token, connections, seconds):
+        """Return requests per second, p95 latency and error count"""
+        deadline = time.perf_counter() + seconds
+        latencies, errors = [], []
+        threads = [
+            threading.Thread(
+                target=self.client_loop,
+                args=(port, token, deadline, latencies, errors)
+            )
+            for _ in range(connections)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        latencies.sort()
+        p95 = latencies[int(len(latencies) * 0.95)] if latencies else 0
+        return len(latencies) / seconds, p95 * 1000, len(errors)
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.create_user(
+            'bench-servers@example.com', 'benchpass'
+        )
+        token = Token.objects.create(user=user).key
+        PetManager.objects.bulk_create(
+            PetManager(
+                user=user,
+                name=f'Pet {i}',
+                in_store_status='Instore',
+                category='Cat',
+                price='10.00'
+            )
+            for i in range(options['pets'])
+        )
+
+        self.stdout.write(
+            f'{"server":>8} {"conns":>6} {"req/s":>9} {"p95":>9} {"errors":>7}'
+        )
+        try:
+            for name in ('wsgi', 'asgi'):
+                port = free_port()
+                try:
+                    process = start_server(name, port)
+                except RuntimeError as exc:
+                    raise CommandError(exc)
+                try:
+                    for connections in options['connections']:
+                        rate, p95, errors = self.measure(
+                            port, token, connections, options['seconds']
+                        )
+                        self.stdout.write(
+                            f'{name:>8} {connections:>6} {rate:>9.1f} '
+                            f'{p95:>7.1f}ms {errors:>7}'
+                        )
+                finally:
+                    process.terminate()
+                    process.wait()
+        finally:
+            user.delete()
@@ -0,0 +1,137 @@
+import time
+from contextlib import nullcontext
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from bench.synthetic import BulkWriter, CopyWriter, Distribution, \
+    Generator, deferred_indexes
+from core.models import Customer, Order, PetManager
+
+
+class Command(BaseCommand):
+    """Django command to fill the database with synthetic data"""
+    help = 'Generate users, pets, orders and customers at scale'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--pets', type=int, default=1000000)
+        parser.add_argument('--orders', type=int, default=200000)
+        parser.add_argument('--customers', type=int, default=200000)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--prefix', default='seed',
+            help='Generated users get <prefix>-<n>@example.com emails'
+        )
+        parser.add_argument('--password', default='seedpass')
+        parser.add_argument(
+            '--categories', default='',
+            help='Weights such as Dog=40,Cat=40,Fish=20, even by default'
+        )
+        parser.add_argument(
+            '--statuses', default='',
+            help='Weights such as Instore=80,Onhold=20, even by default'
+        )
+        parser.add_argument('--price-min', type=float, default=5)
+        parser.add_argument('--price-max', type=float, default=900)
+        parser.add_argument(
+            '--price-distribution', choices=['uniform', 'lognormal'],
+            default='uniform'
+        )
+        parser.add_argument(
+            '--user-skew', type=float, default=0,
+            help='Zipf exponent spreading rows over users, 0 is even'
+        )
+        parser.add_argument('--batch-size', type=int, default=50000)
+        parser.add_argument(
+            '--keep-indexes', action='store_true',
+            help='Update indexes row by row instead of rebuilding them'
+        )
+        parser.add_argument(
+            '--clear', action='store_true',
+            help='Delete users from an earlier run with the same prefix'
+        )
+
+    def timed(self, label, batches):
+        """Consume batches of rows, reporting the rate they were written"""
+        start = time.perf_counter()
+        rows = 0
+        for size in batches:
+            rows += size
+        elapsed = time.perf_counter() - start
+        rate = rows / elapsed if elapsed else 0
+        self.stdout.write(
+            f'{label:<10} {rows:>10} rows {elapsed:>8.2f}s '
+            f'{rate:>10.0f} rows/s'
+        )
+
+    def handle(self, *args, **options):
+        if options['users'] < 1:
+            raise CommandError('--users must be at least 1')
+        try:
+            distribution = Distribution(
+                options['categories'], options['statuses'],
+                options['price_min'], options['price_max'],
+                options['price_distribution'], options['user_skew']
+            )
+        except ValueError as exc:
+            raise CommandError(exc)
+
+        existing = get_user_model().objects.filter(
+            email__startswith=f'{options["prefix"]}-'
+        )
+        if existing.exists():
+            if not options['clear']:
+                raise CommandError(
+                    f'Users with prefix {options["prefix"]!r} exist, '
+                    f'pass --clear to replace them'
+                )
+            existing.delete()
+
+        indexes = nullcontext()
+        if connection.vendor == 'postgresql':
+            writer = CopyWriter(connection)
+            if not options['keep_indexes']:
+                indexes = deferred_indexes(
+                    connection, (PetManager, Order, Customer)
+                )
+        else:
+            writer = BulkWriter(min(options['batch_size'], 1000))
+        generator = Generator(
+            writer, distribution, options['prefix'], options['seed'],
+            options['batch_size']
+        )
+
+        start = time.perf_counter()
+        with transaction.atomic():
+            user_ids = generator.users(
+                options['users'], options['password']
+            )
+            self.stdout.write(f'{"users":<10} {len(user_ids):>10} rows')
+            with indexes:
+                self.timed(
+                    'pets', generator.pets(options['pets'], user_ids)
+                )
+                self.timed(
+                    'orders', generator.orders(options['orders'], user_ids)
+                )
+                self.timed(
+                    'customers',
+                    generator.customers(options['customers'], user_ids)
+                )
+                index_start = time.perf_counter()
+            if connection.vendor == 'postgresql' \
+                    and not options['keep_indexes']:
+                self.stdout.write(
+                    f'{"indexes":<10} {"":>15} '
+                    f'{time.perf_counter() - index_start:>8.2f}s'
+                )
+            generator.summaries()
+
+        total = options['pets'] + options['orders'] + options['customers']
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {total} rows in {elapsed:.1f}s '
+            f'({total / elapsed:.0f} rows/s)'
+        ))
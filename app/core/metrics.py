@@ -0,0 +1,241 @@
+import bisect
+import threading
+import time
+from contextlib import ExitStack
+
+from django.db import connections
+
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+class _Series:
+    """Counters for one route, action and method in one thread"""
+    __slots__ = (
+        'buckets', 'duration', 'requests', 'statuses', 'queries',
+        'query_seconds', 'response_bytes'
+    )
+
+    def __init__(self):
+        self.buckets = [0] * (len(DURATION_BUCKETS) + 1)
+        self.duration = 0.0
+        self.requests = 0
+        self.statuses = {}
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.response_bytes = 0
+
+
+class Registry:
+    """Aggregate request metrics in process without a shared lock
+
+    Every thread writes only to its own shard of series, the lock is taken
+    once per thread to register the shard and when exporting, so recording
+    a request never waits on another.
+    """
+
+    def __init__(self):
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.shards = []
+        self.collectors = []
+
+    def _shard(self):
+        shard = getattr(self.local, 'shard', None)
+        if shard is None:
+            shard = self.local.shard = {}
+            with self.lock:
+                self.shards.append(shard)
+        return shard
+
+    def record(self, key, status, duration, queries, query_seconds, size):
+        """Record one finished request under key (route, action, method)"""
+        shard = self._shard()
+        series = shard.get(key)
+        if series is None:
+            series = shard[key] = _Series()
+        series.buckets[bisect.bisect_left(DURATION_BUCKETS, duration)] += 1
+        series.duration += duration
+        series.requests += 1
+        status = f'{status // 100}xx'
+        series.statuses[status] = series.statuses.get(status, 0) + 1
+        series.queries += queries
+        series.query_seconds += query_seconds
+        series.response_bytes += size
+
+    def register_collector(self, collector):
+        """Add a callable returning extra (name, type, help, samples)"""
+        self.collectors.append(collector)
+
+    def merged(self):
+        """Return every key's series summed over all threads"""
+        with self.lock:
+            shards = list(self.shards)
+        totals = {}
+        for shard in shards:
+            for key, series in list(shard.items()):
+                total = totals.get(key)
+                if total is None:
+                    total = totals[key] = _Series()
+                for index, count in enumerate(series.buckets):
+                    total.buckets[index] += count
+                total.duration += series.duration
+                total.requests += series.requests
+                for status, count in list(series.statuses.items()):
+                    total.statuses[status] = \
+                        total.statuses.get(status, 0) + count
+                total.queries += series.queries
+                total.query_seconds += series.query_seconds
+                total.response_bytes += series.response_bytes
+
+        return totals
+
+    def reset(self):
+        with self.lock:
+            for shard in self.shards:
+                shard.clear()
+
+    def render(self):
+        """Return all metrics in the Prometheus text exposition format"""
+        totals = sorted(self.merged().items())
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+
+        def labels(key, **extra):
+            route, action, method = key
+            pairs = [('route', route), ('action', action), ('method', method)]
+            pairs.extend(extra.items())
+            return ','.join(
+                f'{name}="{_escape(value)}"' for name, value in pairs
+            )
+
+        family(
+            'http_request_duration_seconds', 'histogram',
+            'Time to produce a response by route and action'
+        )
+        for key, series in totals:
+            cumulative = 0
+            for bound, count in zip(DURATION_BUCKETS, series.buckets):
+                cumulative += count
+                lines.append(
+                    f'http_request_duration_seconds_bucket'
+                    f'{{{labels(key, le=repr(bound))}}} {cumulative}'
+                )
+            lines.append(
+                f'http_request_duration_seconds_bucket'
+                f'{{{labels(key, le="+Inf")}}} {series.requests}'
+            )
+            lines.append(
+                f'http_request_duration_seconds_sum{{{labels(key)}}} '
+                f'{series.duration!r}'
+            )
+            lines.append(
+                f'http_request_duration_seconds_count{{{labels(key)}}} '
+                f'{series.requests}'
+            )
+
+        family(
+            'http_requests_total', 'counter',
+            'Responses by route, action and status class'
+        )
+        for key, series in totals:
+            for status, count in sorted(series.statuses.items()):
+                lines.append(
+                    f'http_requests_total{{{labels(key, status=status)}}} '
+                    f'{count}'
+                )
+
+        for name, attr, help_text in (
+                ('db_queries_total', 'queries',
+                 'SQL statements run while handling requests'),
+                ('db_query_duration_seconds_total', 'query_seconds',
+                 'Time spent in SQL while handling requests'),
+                ('http_response_bytes_total', 'response_bytes',
+                 'Bytes of non-streamed response bodies')):
+            family(name, 'counter', help_text)
+            for key, series in totals:
+                lines.append(
+                    f'{name}{{{labels(key)}}} {getattr(series, attr)!r}'
+                )
+
+        for collector in self.collectors:
+            for name, kind, help_text, samples in collector():
+                family(name, kind, help_text)
+                for sample_labels, value in samples:
+                    pairs = ','.join(
+                        f'{label}="{_escape(text)}"'
+                        for label, text in sample_labels.items()
+                    )
+                    lines.append(
+                        f'{name}{{{pairs}}} {value!r}' if pairs
+                        else f'{name} {value!r}'
+                    )
+
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"') \
+        .replace('\n', '\\n')
+
+
+registry = Registry()
+
+
+class _QueryTimer:
+    """Database execute wrapper counting statements and their time"""
+    __slots__ = ('count', 'seconds')
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.count += 1
+
+
+def route_key(request):
+    """Return the (route, action, method) a request was served by"""
+    method = request.method
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return ('<unmatched>', '', method)
+    actions = getattr(match.func, 'actions', None)
+    action = actions.get(method.lower(), '') if actions else ''
+
+    return (match.view_name, action, method)
+
+
+class MetricsMiddleware:
+    """Time each request and count its SQL for the /metrics endpoint"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        timer = _QueryTimer()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(
+                    connections[alias].execute_wrapper(timer)
+                )
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        size = 0 if response.streaming else len(response.content)
+        registry.record(
+            route_key(request), response.status_code, duration,
+            timer.count, timer.seconds, size
+        )
+
+        return response
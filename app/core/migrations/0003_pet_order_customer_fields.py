@@ -0,0 +1,110 @@
+# Generated by Django 2.1.15 on 2026-10-18 10:18
+
+import core.models
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_category_customer_order_petmanager_petname_price_storestatus'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='customer_address',
+            field=models.CharField(default='', max_length=255),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='customer_phone',
+            field=models.CharField(default='', max_length=255),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='email',
+            field=models.CharField(default='', max_length=255),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='name',
+            field=models.CharField(default='', max_length=255),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='customer_allocated_preference',
+            field=models.CharField(default='', max_length=255),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='customer_animal_choice',
+            field=models.CharField(default='', max_length=255),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='customer_budget',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=8),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='customer_name',
+            field=models.CharField(default='', max_length=255),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='customer_phone',
+            field=models.CharField(default='', max_length=255),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='petmanager',
+            name='category',
+            field=models.CharField(choices=[('Dog', 'Dog'), ('Cat', 'Cat'), ('Bird', 'Bird'), ('Rodent', 'Rodent'), ('Reptile', 'Reptile'), ('Fish', 'Fish')], default='', max_length=100),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='petmanager',
+            name='image',
+            field=models.ImageField(null=True, upload_to=core.models.pet_image_file_path),
+        ),
+        migrations.AddField(
+            model_name='petmanager',
+            name='in_store_status',
+            field=models.CharField(choices=[('Instore', 'Instore'), ('Onhold', 'Onhold'), ('SoldPendingPickup', 'SoldPendingPickup'), ('Returned', 'Returned'), ('PurchasedAndRehomed', 'PurchasedAndRehomed'), ('Ordered', 'Ordered')], default='', max_length=30),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='petmanager',
+            name='name',
+            field=models.CharField(default='', max_length=255),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='petmanager',
+            name='price',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0'), max_digits=8),
+            preserve_default=False,
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['user', 'name', 'id'], name='core_custom_user_id_0d20b6_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['user', 'customer_name', 'id'], name='core_order_user_id_924b5d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='petmanager',
+            index=models.Index(fields=['user', 'name', 'id'], name='core_petman_user_id_b7c388_idx'),
+        ),
+    ]
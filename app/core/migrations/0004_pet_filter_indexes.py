@@ -0,0 +1,25 @@
+# Generated by Django 2.1.15 on 2026-10-18 10:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_pet_order_customer_fields'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='petmanager',
+            index=models.Index(fields=['user', 'in_store_status', 'category', 'name'], name='core_petman_user_id_ab852d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='petmanager',
+            index=models.Index(fields=['user', 'category', 'price'], name='core_petman_user_id_5555e3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='petmanager',
+            index=models.Index(fields=['user', 'price', 'id'], name='core_petman_user_id_a68d4f_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.1.15 on 2026-10-18 10:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_pet_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='petmanager',
+            name='image_variants',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 2.1.15 on 2026-10-18 11:02
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_petmanager_image_variants'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InventorySummary',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(choices=[('Dog', 'Dog'), ('Cat', 'Cat'), ('Bird', 'Bird'), ('Rodent', 'Rodent'), ('Reptile', 'Reptile'), ('Fish', 'Fish')], max_length=100)),
+                ('in_store_status', models.CharField(choices=[('Instore', 'Instore'), ('Onhold', 'Onhold'), ('SoldPendingPickup', 'SoldPendingPickup'), ('Returned', 'Returned'), ('PurchasedAndRehomed', 'PurchasedAndRehomed'), ('Ordered', 'Ordered')], max_length=30)),
+                ('count', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AlterUniqueTogether(
+            name='inventorysummary',
+            unique_together={('user', 'category', 'in_store_status')},
+        ),
+    ]
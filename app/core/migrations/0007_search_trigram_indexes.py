@@ -0,0 +1,48 @@
+from django.db import migrations
+
+TRIGRAM_INDEXES = (
+    ('core_petmanager', 'name'),
+    ('core_customer', 'name'),
+    ('core_customer', 'customer_phone'),
+    ('core_customer', 'email'),
+)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """Add pg_trgm GIN indexes for the search action on PostgreSQL
+
+    Servers built without the contrib modules are left alone and search
+    falls back to the in-process index.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"
+        )
+        if cursor.fetchone() is None:
+            return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {table}_{column}_trgm '
+            f'ON {table} USING gin ({column} gin_trgm_ops)'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {table}_{column}_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_inventorysummary'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 2.1.15 on 2026-10-18 11:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_search_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='petmanager',
+            name='sku',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AlterUniqueTogether(
+            name='petmanager',
+            unique_together={('user', 'sku')},
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.1.15 on 2026-10-18 11:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_petmanager_sku'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='petmanager',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -15,6 +15,13 @@ def pet_image_file_path(instance, filename):
     return os.path.join('uploads/pets/', filename)
 
 
+def pet_image_variant_path(name, variant):
+    """Generate the file path of a resized variant next to a pet image"""
+    root, ext = os.path.splitext(name)
+
+    return f'{root}_{variant}{ext}'
+
+
 class UserManager(BaseUserManager):
 
     def create_user(self, email, password=None, **extra_fields):
@@ -50,20 +57,6 @@ class User(AbstractBaseUser, PermissionsMixin):
 
 
 
-class PetManager(models.Model):
-    """Manage Pet Inventory"""
-    user = models.ForeignKey(
-        settings.AUTH_USER_MODEL,
-        on_delete=models.CASCADE
-        )
-    def create_pet(self, name, in_store_status, category, price):
-        pet = self.model(name, in_store_status, category, price)
-        image = models.ImageField(null=True, upload_to=pet_image_file_path)
-        pet.save(using=self._db)
-
-        return self.pet
-
-
 class StoreStatus(models.Model):
     """Status of Animal In Store Stock"""
     user = models.ForeignKey(
@@ -127,21 +120,64 @@ class Price(models.Model):
 
             return self.price
 
+
+class PetManager(models.Model):
+    """Manage Pet Inventory"""
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE
+        )
+    name = models.CharField(max_length=255)
+    in_store_status = models.CharField(
+        max_length=30,
+        choices=StoreStatus.STATUS_CHOICES
+        )
+    category = models.CharField(
+        max_length=100,
+        choices=Category.CATEGORY_CHOICES
+        )
+    price = models.DecimalField(max_digits=8, decimal_places=2)
+    image = models.ImageField(null=True, upload_to=pet_image_file_path)
+    image_variants = models.CharField(max_length=255, blank=True, default='')
+    sku = models.CharField(max_length=64, null=True, blank=True)
+    # Bumped by every change to the pet's details, see pets.transitions
+    version = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = (('user', 'sku'),)
+        indexes = [
+            models.Index(fields=['user', 'name', 'id']),
+            models.Index(
+                fields=['user', 'in_store_status', 'category', 'name']
+            ),
+            models.Index(fields=['user', 'category', 'price']),
+            models.Index(fields=['user', 'price', 'id']),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
 class Order(models.Model):
     """Customer Order Object"""
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE
     )
-    def create_order(self, user, customer_name, customer_phone, customer_animal_choice, customer_budget, customer_allocated_preference):
-        order = self.model(user, customer_name, customer_phone, customer_animal_choice, customer_budget, customer_allocated_preference)
-        customer_name = models.CharField(max_length=255)
-        customer_phone = models.CharField(max_length=255)
-        customer_animal_choice = models.CharField(max_length=255)
-        customer_budget = models.DecimalField(max_digits=8, decimal_places=2)
-        customer_allocated_preference = models.Charfield(max_length=255)
+    customer_name = models.CharField(max_length=255)
+    customer_phone = models.CharField(max_length=255)
+    customer_animal_choice = models.CharField(max_length=255)
+    customer_budget = models.DecimalField(max_digits=8, decimal_places=2)
+    customer_allocated_preference = models.CharField(max_length=255)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'customer_name', 'id']),
+        ]
+
+    def __str__(self):
+        return self.customer_name
 
-        return self.order
 
 class Customer(models.Model):
     """Customer Object"""
@@ -149,13 +185,55 @@ class Customer(models.Model):
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE
     )
-    def create_customer(self, user, name, email, customer_phone, customer_address):
-        customer = self.model(self, user, name, email, customer_phone, customer_address)
-        user = models.User
-        name = models.CharField(max_length=255)
-        email = models.CharField(max_length=255)
-        customer_phone = models.CharField(max_length=255)
-        customer_address = models.CharField(max_length=255)
+    name = models.CharField(max_length=255)
+    email = models.CharField(max_length=255)
+    customer_phone = models.CharField(max_length=255)
+    customer_address = models.CharField(max_length=255)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'name', 'id']),
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class InventorySummary(models.Model):
+    """Count of a user's pets per category and store status"""
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE
+    )
+    category = models.CharField(
+        max_length=100, choices=Category.CATEGORY_CHOICES
+    )
+    in_store_status = models.CharField(
+        max_length=30, choices=StoreStatus.STATUS_CHOICES
+    )
+    count = models.IntegerField(default=0)
 
-        return self.customer
+    class Meta:
+        unique_together = ('user', 'category', 'in_store_status')
 
+    def __str__(self):
+        return f'{self.category} {self.in_store_status}: {self.count}'
+
+
+class IdempotencyKey(models.Model):
+    """Response stored for a create retried with an Idempotency-Key"""
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE
+    )
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)
+    status_code = models.PositiveSmallIntegerField(default=0)
+    response = models.TextField(blank=True, default='')
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        unique_together = ('user', 'key')
+
+    def __str__(self):
+        return self.key
@@ -0,0 +1,143 @@
+import json
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# DRF escapes these so the output is also valid JavaScript
+_LINE_SEPARATORS = (
+    ('\u2028', '\\u2028', '\u2028'.encode(), b'\\u2028'),
+    ('\u2029', '\\u2029', '\u2029'.encode(), b'\\u2029'),
+)
+
+
+def _strict_constant(value):
+    raise ValueError(
+        f'Out of range float values are not JSON compliant: {value!r}'
+    )
+
+
+class StdlibBackend:
+    """Compact JSON through the stdlib C encoder and one shared encoder"""
+    name = 'stdlib'
+
+    def __init__(self):
+        self.encoder = JSONEncoder(
+            ensure_ascii=False, allow_nan=False, separators=(',', ':')
+        )
+
+    def dumps(self, data):
+        text = self.encoder.encode(data)
+        for char, escaped, _, _ in _LINE_SEPARATORS:
+            if char in text:
+                text = text.replace(char, escaped)
+        return text.encode()
+
+    def loads(self, content):
+        return json.loads(content, parse_constant=_strict_constant)
+
+
+class OrjsonBackend:
+    """Compact JSON through orjson, with DRF's encoder for other types
+
+    Datetimes are passed through to DRF's encoder so they keep its 'Z'
+    suffix; orjson would write '+00:00'. Floats with an exponent are
+    spelled as orjson writes them, 1e16 where the stdlib writes 1e+16, and
+    NaN and infinities render as null instead of raising.
+    """
+    name = 'orjson'
+
+    def __init__(self):
+        self.default = JSONEncoder().default
+        self.options = orjson.OPT_NON_STR_KEYS | \
+            orjson.OPT_PASSTHROUGH_DATETIME
+
+    def dumps(self, data):
+        content = orjson.dumps(data, default=self.default, option=self.options)
+        for _, _, char, escaped in _LINE_SEPARATORS:
+            if char in content:
+                content = content.replace(char, escaped)
+        return content
+
+    def loads(self, content):
+        return orjson.loads(content)
+
+
+BACKENDS = {'stdlib': StdlibBackend, 'orjson': OrjsonBackend}
+
+_backend = None
+
+
+def get_backend():
+    """Return the JSON backend chosen by the JSON_BACKEND setting
+
+    'auto' picks orjson when it is installed and the stdlib otherwise.
+    """
+    global _backend
+    name = getattr(settings, 'JSON_BACKEND', 'auto')
+    if _backend is not None and name in ('auto', _backend.name):
+        return _backend
+
+    if name == 'auto':
+        name = 'orjson' if orjson is not None else 'stdlib'
+    if name not in BACKENDS:
+        raise ImproperlyConfigured(
+            f'JSON_BACKEND must be auto or one of {", ".join(BACKENDS)}'
+        )
+    if name == 'orjson' and orjson is None:
+        raise ImproperlyConfigured('JSON_BACKEND is orjson, install orjson')
+    _backend = BACKENDS[name]()
+
+    return _backend
+
+
+class FastJSONRenderer(JSONRenderer):
+    """Render compact JSON through the configured backend
+
+    Output is what JSONRenderer writes: decimals the serializers coerce
+    stay strings and other types go through DRF's encoder. The stdlib
+    backend matches it byte for byte; orjson differs only in how floats
+    with an exponent are spelled and in writing NaN as null. Indented
+    output, as the browsable API asks for, and non-default UNICODE_JSON,
+    COMPACT_JSON or STRICT_JSON settings use JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return bytes()
+        indent = self.get_indent(accepted_media_type, renderer_context or {})
+        if indent is not None or self.ensure_ascii or not self.compact \
+                or not self.strict:
+            return super().render(
+                data, accepted_media_type, renderer_context
+            )
+
+        return get_backend().dumps(data)
+
+
+class FastJSONParser(JSONParser):
+    """Parse a JSON request body in one call to the configured backend"""
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if not self.strict:
+            return super().parse(stream, media_type, parser_context)
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+
+        try:
+            content = stream.read()
+            if encoding.lower().replace('-', '') != 'utf8':
+                content = content.decode(encoding)
+            return get_backend().loads(content)
+        except ValueError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
@@ -0,0 +1,208 @@
+import asyncio
+import io
+import json
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TransactionTestCase
+
+from rest_framework.authtoken.models import Token
+
+from core.asgi import ASGIHandler, build_environ
+from core.models import PetManager
+
+
+def request(handler, method, path, query=b'', headers=(), body=b'',
+            disconnect=False):
+    """Run one request through the handler and return (status, headers,
+    body chunks)"""
+    messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+    if disconnect:
+        messages.append({'type': 'http.disconnect'})
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        # A connected client sends nothing more until it goes away
+        await asyncio.Event().wait()
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        'type': 'http',
+        'method': method,
+        'path': path,
+        'query_string': query,
+        'headers': [(k.encode(), v.encode()) for k, v in headers],
+        'server': ('testserver', 80),
+        'client': ('127.0.0.1', 5000),
+    }
+    asyncio.get_event_loop().run_until_complete(
+        asyncio.wait_for(handler(scope, receive, send), 10)
+    )
+
+    start = sent[0]
+    return (
+        start['status'],
+        dict(start['headers']),
+        [message['body'] for message in sent[1:]],
+    )
+
+
+class EnvironTests(SimpleTestCase):
+    """Test translating ASGI scopes into WSGI environs"""
+
+    def test_build_environ(self):
+        """Test headers, path and query string are carried over"""
+        environ = build_environ({
+            'type': 'http',
+            'method': 'POST',
+            'path': '/api/pets/café/',
+            'query_string': b'q=1',
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'accept', b'text/html'),
+                (b'accept', b'application/json'),
+            ],
+        }, io.BytesIO(b'{}'))
+
+        self.assertEqual(environ['CONTENT_TYPE'], 'application/json')
+        self.assertEqual(environ['CONTENT_LENGTH'], '2')
+        self.assertEqual(environ['HTTP_ACCEPT'], 'text/html,application/json')
+        self.assertEqual(environ['QUERY_STRING'], 'q=1')
+        self.assertEqual(
+            environ['PATH_INFO'].encode('latin1').decode('utf8'),
+            '/api/pets/café/'
+        )
+
+    def test_hot_reads_use_read_pool(self):
+        """Test GETs of the configured views run on the read pool"""
+        handler = ASGIHandler()
+
+        def pool(method, path):
+            return handler.get_pool({'method': method, 'path': path})
+
+        self.assertIs(pool('GET', '/api/pets/pets/'), handler.read_pool)
+        self.assertIs(pool('GET', '/api/pets/pets/3/'), handler.read_pool)
+        self.assertIs(pool('GET', '/api/user/me/'), handler.read_pool)
+        self.assertIs(pool('POST', '/api/pets/pets/'), handler.pool)
+        self.assertIs(pool('GET', '/api/pets/pets/export/'), handler.pool)
+        self.assertIs(pool('GET', '/nowhere/'), handler.pool)
+
+    def test_application_error(self):
+        """Test an application raising before its response sends a 500"""
+        handler = ASGIHandler()
+
+        def application(environ, start_response):
+            raise RuntimeError('broken')
+        handler.application = application
+
+        with self.assertLogs('core.asgi', 'ERROR'):
+            status, headers, body = request(handler, 'GET', '/healthz')
+
+        self.assertEqual(status, 500)
+        self.assertEqual(b''.join(body), b'Internal Server Error')
+
+    def test_disconnect_stops_stream(self):
+        """Test a client going away stops an endless streamed body"""
+        handler = ASGIHandler()
+        closed = []
+
+        def application(environ, start_response):
+            start_response('200 OK', [('Content-Type', 'text/plain')])
+
+            def stream():
+                try:
+                    while True:
+                        yield b'chunk'
+                finally:
+                    closed.append(True)
+            return stream()
+        handler.application = application
+
+        status, headers, body = request(
+            handler, 'GET', '/healthz', disconnect=True
+        )
+
+        self.assertEqual(status, 200)
+        self.assertEqual(closed, [True])
+
+
+class ASGIHandlerTests(TransactionTestCase):
+    """Test serving the API through the ASGI handler"""
+
+    def setUp(self):
+        self.handler = ASGIHandler()
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com',
+            'testpass',
+            name='Test'
+        )
+        self.auth = (
+            ('authorization', f'Token {Token.objects.create(user=self.user)}'),
+        )
+
+    def test_healthz(self):
+        """Test a plain Django view is served"""
+        status, headers, body = request(self.handler, 'GET', '/healthz')
+
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(b''.join(body)), {'status': 'ok'})
+
+    def test_authenticated_read(self):
+        """Test an authenticated DRF read on the read pool"""
+        status, headers, body = request(
+            self.handler, 'GET', '/api/user/me/', headers=self.auth
+        )
+
+        self.assertEqual(status, 200)
+        self.assertEqual(
+            json.loads(b''.join(body))['email'], 'test@testing.com'
+        )
+
+    def test_post_body(self):
+        """Test request bodies reach the view"""
+        status, headers, body = request(
+            self.handler, 'POST', '/api/pets/pets/',
+            headers=self.auth + (('content-type', 'application/json'),),
+            body=json.dumps({
+                'name': 'Bazzle',
+                'in_store_status': 'Instore',
+                'category': 'Cat',
+                'price': '120.90',
+            }).encode()
+        )
+
+        self.assertEqual(status, 201)
+        self.assertTrue(PetManager.objects.filter(name='Bazzle').exists())
+
+    def test_head_has_no_body(self):
+        """Test HEAD responses keep headers but drop the body"""
+        status, headers, body = request(self.handler, 'HEAD', '/healthz')
+
+        self.assertEqual(status, 200)
+        self.assertEqual(b''.join(body), b'')
+
+    def test_streaming_response(self):
+        """Test streamed exports are sent chunk by chunk"""
+        PetManager.objects.bulk_create(
+            PetManager(
+                user=self.user,
+                name=f'Pet {i}',
+                in_store_status='Instore',
+                category='Cat',
+                price='10.00'
+            )
+            for i in range(5)
+        )
+
+        status, headers, body = request(
+            self.handler, 'GET', '/api/pets/pets/export/',
+            query=b'output=csv', headers=self.auth
+        )
+
+        self.assertEqual(status, 200)
+        self.assertEqual(headers[b'content-type'], b'text/csv')
+        self.assertEqual(b''.join(body).count(b'\n'), 6)
+        self.assertGreater(len(body), 1)
@@ -0,0 +1,109 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, TransactionTestCase
+
+from bench import dataset, report
+from bench.drivers import InProcessDriver
+from bench.runner import Recorder, run
+from bench.scenarios import Mix
+
+from core.models import InventorySummary, PetManager
+
+
+class BenchReportTests(SimpleTestCase):
+    """Test benchmark figures and baseline comparison"""
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles"""
+        ordered = list(range(1, 101))
+
+        self.assertEqual(report.percentile(ordered, 50), 50)
+        self.assertEqual(report.percentile(ordered, 99), 99)
+        self.assertEqual(report.percentile([7], 95), 7)
+        self.assertEqual(report.percentile([], 95), 0)
+
+    def test_build_result(self):
+        """Test results hold each endpoint and a total"""
+        recorder = Recorder()
+        for ms in (10, 20, 30):
+            recorder.add('pet-list', ms / 1000, True)
+        recorder.add('pet-create', 0.05, False)
+
+        result = report.build_result(recorder, 2, {'driver': 'inprocess'})
+
+        self.assertEqual(result['endpoints']['pet-list']['requests'], 3)
+        self.assertEqual(result['endpoints']['pet-list']['p50_ms'], 20)
+        self.assertEqual(result['endpoints']['pet-create']['errors'], 1)
+        self.assertEqual(result['endpoints']['total']['throughput'], 1.5)
+
+    def test_compare_flags_regressions(self):
+        """Test slower p95 or lower throughput past threshold regresses"""
+        def result(throughput, p95):
+            return {'endpoints': {'pet-list': {
+                'throughput': throughput, 'p95_ms': p95, 'p99_ms': p95
+            }}}
+
+        _, regressions = report.compare(
+            result(100, 10), result(95, 10.5), 0.1
+        )
+        self.assertEqual(regressions, [])
+        _, regressions = report.compare(result(100, 10), result(100, 12), 0.1)
+        self.assertEqual(regressions, ['pet-list'])
+        _, regressions = report.compare(result(100, 10), result(80, 10), 0.1)
+        self.assertEqual(regressions, ['pet-list'])
+
+    def test_mix_write_ratio(self):
+        """Test the mix falls back when a side has no endpoints"""
+        self.assertEqual(Mix(0.5, only=['pet-list']).write_ratio, 0)
+        self.assertEqual(Mix(0.5, only=['pet-create']).write_ratio, 1)
+
+
+class BenchRunTests(TransactionTestCase):
+    """Test seeding and driving the API in process"""
+
+    def test_seed(self):
+        """Test seeded users own their rows and a matching summary"""
+        fixtures = dataset.seed('bench-test', 2, 20, 5, 5)
+
+        self.assertEqual(len(fixtures), 2)
+        self.assertEqual(len(fixtures[0].pets), 20)
+        self.assertEqual(
+            sum(row.count for row in InventorySummary.objects.filter(
+                user=fixtures[0].user
+            )),
+            20
+        )
+
+        dataset.clear('bench-test')
+        self.assertFalse(PetManager.objects.exists())
+
+    def test_run_in_process(self):
+        """Test the mix is driven without errors through the routes"""
+        fixtures = dataset.seed('bench-test', 1, 10, 5, 5)
+
+        recorder = run(InProcessDriver(), fixtures, Mix(0.3), 2, 0.5)
+
+        self.assertEqual(recorder.errors, {})
+        self.assertTrue(recorder.latencies)
+
+    def test_command_writes_result(self):
+        """Test the command saves JSON and compares with a baseline"""
+        path = os.path.join(tempfile.mkdtemp(), 'result.json')
+        options = {
+            'seconds': 0.3, 'warmup': 0, 'concurrency': 1, 'users': 1,
+            'pets': 10, 'orders': 5, 'customers': 5,
+            'endpoints': ['pet-list'], 'stdout': StringIO()
+        }
+        call_command('bench_api', output=path, **options)
+        out = StringIO()
+        call_command('bench_api', baseline=path, **dict(options, stdout=out))
+
+        with open(path) as handle:
+            result = json.load(handle)
+        self.assertIn('pet-list', result['endpoints'])
+        self.assertIn('Change against baseline', out.getvalue())
+        os.remove(path)
@@ -1,6 +1,8 @@
 from unittest.mock import patch
 
 from django.core.management import call_command
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import CommandError
 from django.db.utils import OperationalError
 from django.test import TestCase
 
@@ -9,15 +11,54 @@ class CommandTests(TestCase):
 
     def test_wait_for_db_ready(self):
         """Test waiting for db when db is available"""
-        with patch('django.db.utils.ConnectionHandler.__getitem__') as gi:
-            gi.return_value = True
+        with patch('core.management.commands.wait_for_db.check_database') \
+                as cd:
             call_command('wait_for_db')
-            self.assertEqual(gi.call_count, 1)
+            self.assertEqual(cd.call_count, 1)
+
+    def test_wait_for_db_runs_query(self):
+        """Test the real check completes a round trip"""
+        call_command('wait_for_db', timeout=1)
 
     @patch('time.sleep', return_value=True)
     def test_wait_for_db(self, ts):
         """Test waiting for db"""
-        with patch('django.db.utils.ConnectionHandler.__getitem__') as gi:
-            gi.side_effect = [OperationalError] * 5 + [True]
+        with patch('core.management.commands.wait_for_db.check_database') \
+                as cd:
+            cd.side_effect = [OperationalError] * 5 + [None]
             call_command('wait_for_db')
-            self.assertEqual(gi.call_count, 6)
+            self.assertEqual(cd.call_count, 6)
+
+    @patch('time.sleep', return_value=True)
+    def test_wait_for_db_backoff(self, ts):
+        """Test delays grow exponentially with jitter up to the cap"""
+        with patch('core.management.commands.wait_for_db.check_database') \
+                as cd, \
+                patch('random.uniform', side_effect=lambda a, b: b):
+            cd.side_effect = [OperationalError] * 6 + [None]
+            call_command('wait_for_db', base_delay=0.5, max_delay=5)
+
+        delays = [call[0][0] for call in ts.call_args_list]
+        self.assertEqual(delays, [0.5, 1, 2, 4, 5, 5])
+
+    @patch('time.sleep', return_value=True)
+    def test_wait_for_db_timeout(self, ts):
+        """Test the command fails once the timeout has passed"""
+        with patch('core.management.commands.wait_for_db.check_database') \
+                as cd, \
+                patch('time.monotonic', side_effect=[0, 1, 2, 11]):
+            cd.side_effect = OperationalError('connection refused')
+            with self.assertRaises(CommandError):
+                call_command('wait_for_db', timeout=10)
+
+    @patch('time.sleep', return_value=True)
+    def test_wait_for_db_other_errors_raised(self, ts):
+        """Test errors other than an unreachable database are not retried"""
+        with patch('core.management.commands.wait_for_db.check_database') \
+                as cd:
+            cd.side_effect = ImproperlyConfigured('bad settings')
+            with self.assertRaises(ImproperlyConfigured):
+                call_command('wait_for_db', timeout=10)
+
+        self.assertEqual(cd.call_count, 1)
+        ts.assert_not_called()
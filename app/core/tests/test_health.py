@@ -0,0 +1,65 @@
+from unittest.mock import patch
+
+from django.db.utils import OperationalError
+from django.test import TestCase
+from django.urls import reverse
+
+from core.health import ReadinessProbe, check_migrations
+
+HEALTHZ_URL = reverse('healthz')
+READYZ_URL = reverse('readyz')
+
+
+class HealthEndpointTests(TestCase):
+    """Test the liveness and readiness endpoints"""
+
+    def setUp(self):
+        patcher = patch('core.views.readiness', ReadinessProbe(60))
+        self.probe = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_healthz(self):
+        """Test liveness reports ok without touching dependencies"""
+        with self.assertNumQueries(0):
+            res = self.client.get(HEALTHZ_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json(), {'status': 'ok'})
+
+    def test_readyz_ready(self):
+        """Test readiness passes with the database, migrations and cache"""
+        res = self.client.get(READYZ_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(
+            res.json()['checks'],
+            {'database': True, 'migrations': True, 'cache': True}
+        )
+
+    def test_readyz_cached(self):
+        """Test repeated probes reuse the last result"""
+        self.client.get(READYZ_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(READYZ_URL)
+        self.assertEqual(res.status_code, 200)
+
+    @patch('core.health.check_database', side_effect=OperationalError)
+    def test_readyz_database_down(self, cd):
+        """Test readiness fails while the database is unreachable"""
+        res = self.client.get(READYZ_URL)
+
+        self.assertEqual(res.status_code, 503)
+        self.assertFalse(res.json()['checks']['database'])
+
+    @patch('core.health.check_migrations', return_value=False)
+    def test_readyz_unapplied_migrations(self, cm):
+        """Test readiness fails until migrations are applied"""
+        res = self.client.get(READYZ_URL)
+
+        self.assertEqual(res.status_code, 503)
+        self.assertFalse(res.json()['checks']['migrations'])
+
+    def test_check_migrations(self):
+        """Test the migration check sees the test database as migrated"""
+        self.assertTrue(check_migrations())
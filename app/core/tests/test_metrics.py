@@ -0,0 +1,170 @@
+import re
+import time
+
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core.metrics import MetricsMiddleware, Registry, registry
+from core.models import PetManager
+
+from pets.cache import get_cache
+
+METRICS_URL = reverse('metrics')
+PETS_URL = reverse('pets:pet-list')
+
+SAMPLE = re.compile(r'^[a-z_]+(\{[^}]*\})? \S+$')
+
+
+def sample(text, name, **labels):
+    """Return the value of the sample name with labels in an exposition"""
+    for line in text.splitlines():
+        if not line.startswith(name + '{'):
+            continue
+        if all(f'{key}="{value}"' in line for key, value in labels.items()):
+            return float(line.rsplit(' ', 1)[1])
+    return None
+
+
+@override_settings(METRICS_TOKEN='secret')
+class MetricsEndpointTests(TestCase):
+    """Test request metrics collection and the /metrics endpoint"""
+
+    def setUp(self):
+        get_cache().clear()
+        self.user = get_user_model().objects.create_user(
+            'test@londonappdev.com', 'testpass'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        registry.reset()
+
+    def scrape(self):
+        res = self.client.get(
+            METRICS_URL, HTTP_AUTHORIZATION='Bearer secret'
+        )
+        self.assertEqual(res.status_code, 200)
+        return res.content.decode()
+
+    def test_route_and_action_labels(self):
+        """Test requests are labelled by route name and viewset action"""
+        self.client.get(PETS_URL)
+        self.client.get(PETS_URL)
+        self.client.post(PETS_URL, {})
+
+        text = self.scrape()
+        self.assertEqual(sample(
+            text, 'http_request_duration_seconds_count',
+            route='pets:pet-list', action='list', method='GET'
+        ), 2)
+        self.assertEqual(sample(
+            text, 'http_requests_total',
+            route='pets:pet-list', action='create', status='4xx'
+        ), 1)
+
+    def test_query_count(self):
+        """Test the SQL run by each request is counted"""
+        PetManager.objects.create(
+            user=self.user, name='Rex', in_store_status='Instore',
+            category='Dog', price='10.00'
+        )
+        self.client.get(PETS_URL)
+
+        text = self.scrape()
+        count = sample(text, 'db_queries_total', route='pets:pet-list')
+        self.assertIsNotNone(count)
+        self.assertGreater(count, 0)
+
+    def test_unmatched_route(self):
+        """Test unknown paths share one series"""
+        self.client.get('/no/such/path/')
+        self.client.get('/another/missing/path/')
+
+        text = self.scrape()
+        self.assertEqual(sample(
+            text, 'http_requests_total', route='<unmatched>', status='4xx'
+        ), 2)
+
+    def test_exposition_format(self):
+        """Test every line is a comment or a well formed sample"""
+        self.client.get(PETS_URL)
+
+        res = self.client.get(
+            METRICS_URL, HTTP_AUTHORIZATION='Bearer secret'
+        )
+
+        self.assertTrue(res['Content-Type'].startswith('text/plain'))
+        for line in res.content.decode().splitlines():
+            self.assertTrue(
+                line.startswith('# ') or SAMPLE.match(line), line
+            )
+        self.assertIn('login_pool_pending', res.content.decode())
+
+    def test_token_required(self):
+        """Test a configured token guards the endpoint"""
+        self.assertEqual(self.client.get(METRICS_URL).status_code, 403)
+        self.assertEqual(self.client.get(
+            METRICS_URL, HTTP_AUTHORIZATION='Bearer secre'
+        ).status_code, 403)
+
+        res = self.client.get(
+            METRICS_URL, HTTP_AUTHORIZATION='Bearer secret'
+        )
+        self.assertEqual(res.status_code, 200)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_closed_without_token(self):
+        """Test the endpoint is only open without a token under DEBUG"""
+        self.assertEqual(self.client.get(METRICS_URL).status_code, 403)
+
+        with override_settings(DEBUG=True):
+            self.assertEqual(self.client.get(METRICS_URL).status_code, 200)
+
+
+class RegistryTests(TestCase):
+    """Test the per-thread metrics registry"""
+
+    def test_histogram_buckets(self):
+        """Test durations land in cumulative buckets"""
+        metrics = Registry()
+        key = ('pets:pet-list', 'list', 'GET')
+        metrics.record(key, 200, 0.003, 1, 0.001, 10)
+        metrics.record(key, 200, 0.2, 2, 0.1, 10)
+        metrics.record(key, 500, 20, 0, 0, 0)
+
+        text = metrics.render()
+
+        self.assertEqual(sample(
+            text, 'http_request_duration_seconds_bucket', le='0.005'
+        ), 1)
+        self.assertEqual(sample(
+            text, 'http_request_duration_seconds_bucket', le='0.25'
+        ), 2)
+        self.assertEqual(sample(
+            text, 'http_request_duration_seconds_bucket', le='+Inf'
+        ), 3)
+        self.assertEqual(sample(text, 'db_queries_total'), 3)
+        self.assertEqual(sample(text, 'http_requests_total', status='5xx'), 1)
+
+    def test_middleware_overhead(self):
+        """Test recording a request costs well under 50 microseconds"""
+        request = RequestFactory().get(PETS_URL)
+        response = type('Response', (), {
+            'streaming': False, 'content': b'', 'status_code': 200
+        })()
+        middleware = MetricsMiddleware(lambda request: response)
+        bare = lambda request: response  # noqa: E731
+        rounds = 2000
+
+        start = time.perf_counter()
+        for _ in range(rounds):
+            bare(request)
+        baseline = time.perf_counter() - start
+        start = time.perf_counter()
+        for _ in range(rounds):
+            middleware(request)
+        measured = time.perf_counter() - start
+
+        self.assertLess((measured - baseline) / rounds, 50e-6)
@@ -0,0 +1,178 @@
+import shutil
+import tempfile
+
+from PIL import Image
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.models import Customer, Order, PetManager
+
+from pets.cache import get_cache
+
+from user.authentication import revoke_token
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+# Rows seeded per resource; every endpoint must run as many queries for each
+ROW_COUNTS = (1, 10, 1000)
+
+
+def seed(user, rows):
+    """Create rows pets, orders and customers for a user"""
+    PetManager.objects.bulk_create(
+        PetManager(
+            user=user, name=f'Pet {i}', in_store_status='Instore',
+            category='Cat', price='120.90'
+        )
+        for i in range(rows)
+    )
+    Order.objects.bulk_create(
+        Order(
+            user=user, customer_name=f'Customer {i}',
+            customer_phone='07123456789', customer_animal_choice='Cat',
+            customer_budget='150.00', customer_allocated_preference='Pet 1'
+        )
+        for i in range(rows)
+    )
+    Customer.objects.bulk_create(
+        Customer(
+            user=user, name=f'Customer {i}', email=f'c{i}@testing.com',
+            customer_phone='07123456789', customer_address='1 High Street'
+        )
+        for i in range(rows)
+    )
+
+
+def image_file():
+    """Return an open JPEG file to upload"""
+    ntf = tempfile.NamedTemporaryFile(suffix='.jpg')
+    Image.new('RGB', (64, 64), 'orange').save(ntf, format='JPEG')
+    ntf.seek(0)
+    return ntf
+
+
+def get_budget(path, method):
+    """Return the query budget the view serving path declares for method
+
+    Viewsets key their query_budget by action, plain API views by the
+    lower case HTTP method.
+    """
+    func = resolve(path).func
+    actions = getattr(func, 'actions', None)
+    key = actions[method] if actions else method
+
+    return func.cls.query_budget[key]
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class QueryBudgetTests(TestCase):
+    """Test every endpoint stays within its query budget at any size
+
+    Each request is made with cold caches, so authentication and response
+    caching add their worst case and the counts are repeatable.
+    """
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def endpoints(self, user):
+        """Return (name, method, path, data) for every endpoint covered"""
+        pet = PetManager.objects.filter(user=user).first()
+        order = Order.objects.filter(user=user).first()
+        customer = Customer.objects.filter(user=user).first()
+
+        return [
+            ('pet list', 'get', reverse('pets:pet-list'),
+             {'page_size': 500}),
+            ('pet retrieve', 'get',
+             reverse('pets:pet-detail', args=[pet.id]), None),
+            ('pet create', 'post', reverse('pets:pet-list'), {
+                'name': 'Bazzle', 'in_store_status': 'Instore',
+                'category': 'Cat', 'price': '120.90'
+            }),
+            ('pet upload image', 'post',
+             reverse('pets:pet-upload-image', args=[pet.id]),
+             {'image': image_file}),
+            ('pet transition', 'post',
+             reverse('pets:pet-transition', args=[pet.id]),
+             {'in_store_status': 'Onhold'}),
+            ('order list', 'get', reverse('pets:order-list'),
+             {'page_size': 500}),
+            ('order retrieve', 'get',
+             reverse('pets:order-detail', args=[order.id]), None),
+            ('order create', 'post', reverse('pets:order-list'), {
+                'customer_name': 'Jane', 'customer_phone': '07123456789',
+                'customer_animal_choice': 'Cat', 'customer_budget': '90.00',
+                'customer_allocated_preference': 'Bazzle'
+            }),
+            ('customer list', 'get', reverse('pets:customer-list'),
+             {'page_size': 500}),
+            ('customer retrieve', 'get',
+             reverse('pets:customer-detail', args=[customer.id]), None),
+            ('customer create', 'post', reverse('pets:customer-list'), {
+                'name': 'Jane', 'email': 'jane@testing.com',
+                'customer_phone': '07123456789',
+                'customer_address': '1 High Street'
+            }),
+            ('user create', 'post', reverse('user:create'), {
+                'email': f'new{user.pk}@testing.com',
+                'password': 'testpass', 'name': 'New'
+            }),
+            ('user token', 'post', reverse('user:token'), {
+                'email': user.email, 'password': 'testpass'
+            }),
+            ('user me', 'get', reverse('user:me'), None),
+        ]
+
+    def count_queries(self, client, token, method, path, data):
+        """Return the queries one cold cache request runs"""
+        get_cache().clear()
+        revoke_token(token.key)
+        files = []
+        if data:
+            data = dict(data)
+            for key, value in data.items():
+                if callable(value):
+                    files.append(value())
+                    data[key] = files[-1]
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                res = getattr(client, method)(
+                    path, data, format='multipart' if files else None
+                )
+        finally:
+            for file in files:
+                file.close()
+        self.assertLess(res.status_code, 300, f'{method} {path}: {res.data}')
+
+        return len(queries)
+
+    def test_query_budgets(self):
+        """Test query counts are within budget and independent of rows"""
+        counts = {}
+        for rows in ROW_COUNTS:
+            user = get_user_model().objects.create_user(
+                f'rows{rows}@testing.com', 'testpass'
+            )
+            seed(user, rows)
+            token = Token.objects.create(user=user)
+            client = APIClient()
+            client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+            for name, method, path, data in self.endpoints(user):
+                count = self.count_queries(client, token, method, path, data)
+                counts.setdefault(name, []).append(count)
+                with self.subTest(endpoint=name, rows=rows):
+                    self.assertLessEqual(count, get_budget(path, method))
+
+        for name, seen in counts.items():
+            with self.subTest(endpoint=name):
+                self.assertEqual(len(set(seen)), 1, f'{name} ran {seen}')
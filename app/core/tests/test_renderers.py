@@ -0,0 +1,293 @@
+import datetime
+import decimal
+import gzip
+import unittest
+import uuid
+from io import BytesIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.translation import ugettext_lazy as _
+
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from core import renderers
+from core.compression import brotli, choose_encoding, \
+    parse_accept_encoding
+from core.models import Order, PetManager
+from core.renderers import FastJSONParser, FastJSONRenderer, get_backend
+
+from pets.serializers import OrderSerializer, PetDetailSerializer, \
+    PetSerializer
+
+PETS_URL = reverse('pets:pet-list')
+
+BACKENDS = ['stdlib'] + (['orjson'] if renderers.orjson else [])
+
+
+def sample_payloads(user):
+    """Return payloads covering the types DRF's encoder handles"""
+    pets = [
+        PetManager.objects.create(
+            user=user, name=name, in_store_status='Instore',
+            category='Cat', price=price
+        )
+        for name, price in (
+            ('Bazzle', '120.90'), ('Zoë    ', '0.50'),
+            ('"Quoted" \\ pet', '99999.99')
+        )
+    ]
+    order = Order.objects.create(
+        user=user, customer_name='Jane', customer_phone='07123456789',
+        customer_animal_choice='Cat', customer_budget=decimal.Decimal('90'),
+        customer_allocated_preference='Bazzle'
+    )
+    aware = timezone.now()
+
+    return [
+        PetSerializer(pets, many=True).data,
+        PetDetailSerializer(pets[0]).data,
+        OrderSerializer([order], many=True).data,
+        {
+            'decimal': decimal.Decimal('1.10'),
+            'utc': aware,
+            'offset': aware.astimezone(
+                datetime.timezone(datetime.timedelta(hours=2))
+            ),
+            'naive': datetime.datetime(2020, 1, 2, 3, 4, 5, 6),
+            'date': datetime.date(2020, 1, 2),
+            'time': datetime.time(3, 4, 5),
+            'duration': datetime.timedelta(minutes=3),
+            'uuid': uuid.UUID(int=7),
+            'lazy': _('Not found.'),
+            'tuple': (1, None, True),
+            1: 'integer key',
+            'nested': [{'list': []}, {}],
+        },
+    ]
+
+
+FLOATS = {'plain': [0.1, 2.5, 1.0, -3.25], 'exponent': [1e16, 1e-7, 5e-324]}
+
+
+class FastJSONRendererTests(TestCase):
+    """Test the fast renderer and parser match DRF's JSON"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com', 'testpass'
+        )
+
+    def test_output_matches_drf(self):
+        """Test every backend renders byte for byte what DRF renders"""
+        payloads = sample_payloads(self.user)
+        for name in BACKENDS:
+            with override_settings(JSON_BACKEND=name):
+                for payload in payloads:
+                    with self.subTest(backend=name, payload=payload):
+                        self.assertEqual(
+                            FastJSONRenderer().render(payload),
+                            JSONRenderer().render(payload)
+                        )
+
+    def test_floats(self):
+        """Test floats match DRF, but for orjson's exponent spelling"""
+        for name in BACKENDS:
+            with override_settings(JSON_BACKEND=name):
+                with self.subTest(backend=name):
+                    self.assertEqual(
+                        FastJSONRenderer().render(FLOATS['plain']),
+                        JSONRenderer().render(FLOATS['plain'])
+                    )
+                    content = FastJSONRenderer().render(FLOATS['exponent'])
+                    self.assertEqual(
+                        FastJSONParser().parse(BytesIO(content)),
+                        FLOATS['exponent']
+                    )
+
+        with override_settings(JSON_BACKEND='stdlib'):
+            self.assertEqual(
+                FastJSONRenderer().render(FLOATS['exponent']),
+                JSONRenderer().render(FLOATS['exponent'])
+            )
+
+    def test_decimal_strings(self):
+        """Test serialized prices stay strings"""
+        PetManager.objects.create(
+            user=self.user, name='Bazzle', in_store_status='Instore',
+            category='Cat', price='5'
+        )
+        content = FastJSONRenderer().render(
+            PetSerializer(PetManager.objects.all(), many=True).data
+        )
+
+        self.assertIn(b'"price":"5.00"', content)
+
+    def test_indent_uses_drf(self):
+        """Test indented output, as the browsable API asks, is unchanged"""
+        data = {'a': [1, 2]}
+
+        self.assertEqual(
+            FastJSONRenderer().render(
+                data, 'application/json; indent=2'
+            ),
+            JSONRenderer().render(data, 'application/json; indent=2')
+        )
+
+    @override_settings(JSON_BACKEND='stdlib')
+    def test_stdlib_rejects_nan(self):
+        """Test NaN is refused as DRF's strict encoder does"""
+        with self.assertRaises(ValueError):
+            FastJSONRenderer().render({'value': float('nan')})
+
+    def test_parse(self):
+        """Test request bodies parse alike on every backend"""
+        body = '{"name": "Zoë", "price": "1.50", "tags": [1, 2.5, null]}'
+        for name in BACKENDS:
+            with override_settings(JSON_BACKEND=name):
+                with self.subTest(backend=name):
+                    self.assertEqual(
+                        FastJSONParser().parse(BytesIO(body.encode())),
+                        {'name': 'Zoë', 'price': '1.50',
+                         'tags': [1, 2.5, None]}
+                    )
+
+    def test_parse_other_encoding(self):
+        """Test a declared charset other than UTF-8 is decoded first"""
+        data = FastJSONParser().parse(
+            BytesIO('{"name": "Zoë"}'.encode('latin-1')),
+            parser_context={'encoding': 'latin-1'}
+        )
+
+        self.assertEqual(data, {'name': 'Zoë'})
+
+    def test_parse_errors(self):
+        """Test invalid JSON and NaN are parse errors"""
+        for name in BACKENDS:
+            with override_settings(JSON_BACKEND=name):
+                for body in (b'{"name": ', b'{"value": NaN}'):
+                    with self.subTest(backend=name, body=body), \
+                            self.assertRaises(ParseError):
+                        FastJSONParser().parse(BytesIO(body))
+
+    def test_backend_setting(self):
+        """Test unknown or missing backends are configuration errors"""
+        with override_settings(JSON_BACKEND='simplejson'), \
+                self.assertRaises(ImproperlyConfigured):
+            get_backend()
+        with override_settings(JSON_BACKEND='orjson'), \
+                patch.object(renderers, 'orjson', None), \
+                patch.object(renderers, '_backend', None), \
+                self.assertRaises(ImproperlyConfigured):
+            get_backend()
+
+        with override_settings(JSON_BACKEND='stdlib'):
+            self.assertEqual(get_backend().name, 'stdlib')
+
+    def test_api_round_trip(self):
+        """Test the API parses JSON requests and renders JSON responses"""
+        client = APIClient()
+        client.force_authenticate(self.user)
+
+        res = client.post(PETS_URL, {
+            'name': 'Bazzle', 'in_store_status': 'Instore',
+            'category': 'Cat', 'price': '120.90'
+        }, format='json')
+
+        self.assertEqual(res.json()['price'], '120.90')
+
+
+class CompressionTests(TestCase):
+    """Test response compression negotiated from Accept-Encoding"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com', 'testpass'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        PetManager.objects.bulk_create(
+            PetManager(
+                user=self.user, name=f'Pet {i}', in_store_status='Instore',
+                category='Cat', price='120.90'
+            )
+            for i in range(50)
+        )
+
+    def test_parse_accept_encoding(self):
+        """Test q values are read per coding"""
+        self.assertEqual(
+            parse_accept_encoding('gzip;q=0.5, br, *;q=0, x;q=bad'),
+            {'gzip': 0.5, 'br': 1.0, '*': 0.0, 'x': 0.0}
+        )
+
+    def test_choose_encoding(self):
+        """Test the best acceptable coding is chosen"""
+        codings = ('br', 'gzip')
+
+        self.assertEqual(choose_encoding('gzip, br', codings), 'br')
+        self.assertEqual(choose_encoding('gzip, br;q=0.5', codings), 'gzip')
+        self.assertEqual(choose_encoding('*', codings), 'br')
+        self.assertEqual(choose_encoding('br;q=0, *', codings), 'gzip')
+        self.assertIsNone(choose_encoding('identity', codings))
+        self.assertIsNone(choose_encoding('', codings))
+
+    def test_gzip_response(self):
+        """Test a large JSON response is gzipped with a weak ETag"""
+        plain = self.client.get(PETS_URL)
+        res = self.client.get(PETS_URL, HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(res['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', res['Vary'])
+        self.assertEqual(gzip.decompress(res.content), plain.content)
+        self.assertEqual(res['ETag'], 'W/' + plain['ETag'])
+
+        res = self.client.get(
+            PETS_URL, HTTP_ACCEPT_ENCODING='gzip',
+            HTTP_IF_NONE_MATCH=res['ETag']
+        )
+        self.assertEqual(res.status_code, 304)
+
+    @unittest.skipIf(brotli is None, 'brotli is not installed')
+    def test_brotli_response(self):
+        """Test brotli is preferred when the client accepts both"""
+        plain = self.client.get(PETS_URL)
+        res = self.client.get(PETS_URL, HTTP_ACCEPT_ENCODING='gzip, br')
+
+        self.assertEqual(res['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(res.content), plain.content)
+
+    def test_identity(self):
+        """Test clients that do not accept a coding get plain bodies"""
+        res = self.client.get(PETS_URL, HTTP_ACCEPT_ENCODING='identity')
+
+        self.assertFalse(res.has_header('Content-Encoding'))
+        self.assertEqual(len(res.json()['results']), 50)
+
+    def test_other_content_types_sent_plain(self):
+        """Test pages outside the API, such as the admin, are not touched"""
+        admin = get_user_model().objects.create_superuser(
+            'admin@testing.com', 'testpass'
+        )
+        self.client.force_login(admin)
+
+        res = self.client.get(
+            reverse('admin:index'), HTTP_ACCEPT_ENCODING='gzip'
+        )
+
+        self.assertEqual(res.status_code, 200)
+        self.assertGreater(len(res.content), 512)
+        self.assertFalse(res.has_header('Content-Encoding'))
+
+    @override_settings(COMPRESSION_MIN_LENGTH=10 ** 6)
+    def test_small_bodies_sent_plain(self):
+        """Test bodies under the minimum length are not compressed"""
+        res = self.client.get(PETS_URL, HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertFalse(res.has_header('Content-Encoding'))
@@ -0,0 +1,144 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+
+from bench.synthetic import BulkWriter, Distribution, Generator, Sampler
+from core.models import Customer, InventorySummary, Order, PetManager
+
+
+def seed(**options):
+    options = dict({
+        'users': 5, 'pets': 200, 'orders': 50, 'customers': 50,
+        'batch_size': 64, 'keep_indexes': True, 'stdout': StringIO()
+    }, **options)
+    call_command('seed', **options)
+
+
+def pet_rows():
+    return list(PetManager.objects.order_by('id').values_list(
+        'user__email', 'name', 'in_store_status', 'category', 'price'
+    ))
+
+
+class SeedCommandTests(TestCase):
+    """Test the synthetic data generator"""
+
+    def test_seed_counts(self):
+        """Test the requested rows are created for the generated users"""
+        seed()
+
+        self.assertEqual(
+            get_user_model().objects.filter(
+                email__startswith='seed-'
+            ).count(),
+            5
+        )
+        self.assertEqual(PetManager.objects.count(), 200)
+        self.assertEqual(Order.objects.count(), 50)
+        self.assertEqual(Customer.objects.count(), 50)
+
+    def test_seed_users_share_password(self):
+        """Test generated users log in with the given password"""
+        seed(password='letmein')
+
+        user = get_user_model().objects.get(email='seed-3@example.com')
+        self.assertTrue(user.check_password('letmein'))
+        self.assertTrue(user.is_active)
+
+    def test_seed_is_deterministic(self):
+        """Test the same seed gives the same rows at any batch size"""
+        seed(seed=7)
+        first = pet_rows()
+        seed(seed=7, clear=True, batch_size=1000)
+        second = pet_rows()
+        seed(seed=8, clear=True)
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, pet_rows())
+
+    def test_seed_existing_prefix(self):
+        """Test an earlier run is only replaced with --clear"""
+        seed()
+
+        with self.assertRaises(CommandError):
+            seed()
+
+    def test_seed_distributions(self):
+        """Test category and status weights shape the pets"""
+        seed(categories='Dog=3,Cat=1', statuses='Onhold=1', pets=2000)
+
+        categories = set(PetManager.objects.values_list(
+            'category', flat=True
+        ))
+        self.assertEqual(categories, {'Dog', 'Cat'})
+        self.assertGreater(
+            PetManager.objects.filter(category='Dog').count(), 1200
+        )
+        self.assertFalse(
+            PetManager.objects.exclude(in_store_status='Onhold').exists()
+        )
+
+    def test_seed_invalid_weights(self):
+        """Test unknown choices are rejected"""
+        with self.assertRaises(CommandError):
+            seed(categories='Dragon=1')
+
+    def test_seed_summary(self):
+        """Test the inventory summary matches the generated pets"""
+        seed(user_skew=1.5)
+
+        for row in InventorySummary.objects.all():
+            self.assertEqual(row.count, PetManager.objects.filter(
+                user=row.user_id,
+                category=row.category,
+                in_store_status=row.in_store_status
+            ).count())
+        self.assertEqual(
+            sum(InventorySummary.objects.values_list('count', flat=True)),
+            200
+        )
+
+    def test_seed_rebuilds_indexes(self):
+        """Test indexes dropped for the load are all restored"""
+        def indexes():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT indexdef FROM pg_indexes WHERE tablename = %s',
+                    [PetManager._meta.db_table]
+                )
+                return sorted(cursor.fetchall())
+
+        before = indexes()
+        seed(keep_indexes=False)
+
+        self.assertEqual(indexes(), before)
+        self.assertEqual(PetManager.objects.count(), 200)
+
+    def test_bulk_writer(self):
+        """Test the bulk_create writer used off PostgreSQL"""
+        generator = Generator(BulkWriter(100), Distribution(), 'bulk', 1, 50)
+        user_ids = generator.users(2, 'pass')
+        for _ in generator.pets(120, user_ids):
+            pass
+        generator.summaries()
+
+        self.assertEqual(PetManager.objects.count(), 120)
+        self.assertEqual(sum(
+            InventorySummary.objects.values_list('count', flat=True)
+        ), 120)
+
+
+class SamplerTests(TestCase):
+    """Test weighted sampling through slot tables"""
+
+    def test_weights_shape_table(self):
+        """Test choices fill slots in proportion to their weights"""
+        sampler = Sampler(['a', 'b', 'c'], [1, 0, 3], slots=400)
+
+        self.assertEqual(len(sampler.table), 400)
+        self.assertEqual(sampler.table.count('a'), 100)
+        self.assertNotIn('b', sampler.table)
@@ -0,0 +1,48 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
+from django.views.decorators.cache import never_cache
+
+from core.health import readiness
+from core.metrics import registry
+
+
+@never_cache
+def healthz(request):
+    """Report that the process is up and serving requests"""
+    return JsonResponse({'status': 'ok'})
+
+
+@never_cache
+def readyz(request):
+    """Report whether the database, migrations and cache are ready"""
+    checks = readiness.check()
+    ready = all(checks.values())
+
+    return JsonResponse(
+        {'status': 'ok' if ready else 'unavailable', 'checks': checks},
+        status=200 if ready else 503
+    )
+
+
+@never_cache
+def metrics(request):
+    """Expose the collected request metrics to a Prometheus scraper
+
+    Scrapers must send METRICS_TOKEN as a bearer token; without a token
+    configured the metrics are only served with DEBUG on.
+    """
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if not token:
+        if not settings.DEBUG:
+            return HttpResponseForbidden()
+    elif not hmac.compare_digest(
+            request.META.get('HTTP_AUTHORIZATION', '').encode(),
+            f'Bearer {token}'.encode()):
+        return HttpResponseForbidden()
+
+    return HttpResponse(
+        registry.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
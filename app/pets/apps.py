@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class PetsConfig(AppConfig):
     name = 'pets'
+
+    def ready(self):
+        from pets import signals  # noqa: F401
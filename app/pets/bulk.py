@@ -0,0 +1,147 @@
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, Value, When
+from django.db.models.functions import Cast
+from django.dispatch import Signal
+from django.utils.translation import ugettext_lazy as _
+
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from pets.cache import invalidate_user_cache
+
+# Sent with the model as sender after a batch is written without post_save
+bulk_saved = Signal(providing_args=['instances'])
+
+
+def _batch_size():
+    return getattr(settings, 'PETS_BULK_BATCH_SIZE', 1000)
+
+
+def _chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def bulk_update(model, objs, fields):
+    """Write the given fields of objs back in one UPDATE per batch
+
+    Each column is set through a CASE on the primary key, the same
+    statement QuerySet.bulk_update builds on newer Django releases.
+    """
+    for batch in _chunks(objs, _batch_size()):
+        updates = {}
+        for name in fields:
+            field = model._meta.get_field(name)
+            updates[field.attname] = Cast(Case(
+                *[
+                    When(pk=obj.pk, then=Value(
+                        getattr(obj, field.attname), output_field=field
+                    ))
+                    for obj in batch
+                ],
+                output_field=field
+            ), output_field=field)
+        model._base_manager.filter(
+            pk__in=[obj.pk for obj in batch]
+        ).update(**updates)
+
+
+class BulkListSerializer(serializers.ListSerializer):
+    """Save a validated batch with bulk queries instead of one per item"""
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        if not connection.features.can_return_ids_from_bulk_insert:
+            # The response needs the new ids, which only come back one
+            # insert at a time on this database
+            return [model.objects.create(**attrs) for attrs in validated_data]
+
+        instances = model.objects.bulk_create(
+            [model(**attrs) for attrs in validated_data],
+            batch_size=_batch_size()
+        )
+        bulk_saved.send(sender=model, instances=instances)
+
+        return instances
+
+    def update(self, instances, validated_data):
+        fields = set()
+        for instance, attrs in zip(instances, validated_data):
+            for name, value in attrs.items():
+                setattr(instance, name, value)
+            fields.update(attrs)
+        if fields:
+            model = self.child.Meta.model
+            bulk_update(model, instances, sorted(fields))
+            bulk_saved.send(sender=model, instances=instances)
+
+        return instances
+
+
+class BulkModelMixin:
+    """Accept a list payload to create or update many objects at once
+
+    The whole batch is validated first and written in one transaction, so
+    any invalid item rejects the request with errors listed per item.
+    """
+    bulk_max_items_message = _('A batch may hold at most %d items')
+
+    def get_bulk_items(self, request):
+        """Return the request payload if it is a list within the limit"""
+        max_items = getattr(settings, 'PETS_BULK_MAX_ITEMS', 10000)
+        if not isinstance(request.data, list):
+            raise serializers.ValidationError(
+                {'non_field_errors': [_('Expected a list of items')]}
+            )
+        if len(request.data) > max_items:
+            message = self.bulk_max_items_message % max_items
+            raise serializers.ValidationError(
+                {'non_field_errors': [message]}
+            )
+
+        return request.data
+
+    def create(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            return super().create(request, *args, **kwargs)
+
+        serializer = self.get_serializer(
+            data=self.get_bulk_items(request), many=True
+        )
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            self.perform_create(serializer)
+
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(methods=['PATCH'], detail=False, url_path='bulk')
+    def bulk_update(self, request):
+        """Partially update many objects identified by their ids"""
+        items = self.get_bulk_items(request)
+        # type() rather than isinstance(), which would take true as id 1
+        ids = [
+            item.get('id') if isinstance(item, dict)
+            and type(item.get('id')) is int else None
+            for item in items
+        ]
+        found = self.get_queryset().in_bulk(
+            [pk for pk in ids if pk is not None]
+        )
+        errors = [
+            {} if pk in found else {'id': [_('Object not found')]}
+            for pk in ids
+        ]
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = self.get_serializer(
+            [found[pk] for pk in ids], data=items, many=True, partial=True
+        )
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            self.perform_update(serializer)
+        invalidate_user_cache(request.user)
+
+        return Response(serializer.data, status=status.HTTP_200_OK)
@@ -0,0 +1,131 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.dispatch import Signal
+from django.utils.http import urlencode
+
+from rest_framework import status
+from rest_framework.response import Response
+
+# Sent with the new generation after this process bumps a user's generation
+generation_bumped = Signal(providing_args=['user', 'generation'])
+
+
+def get_cache():
+    """Return the cache backend used for pets API responses"""
+    return caches[getattr(settings, 'PETS_CACHE_ALIAS', 'default')]
+
+
+def _generation_key(user):
+    return f'pets:generation:{user.pk}'
+
+
+def get_generation(user):
+    """Return the current cache generation for a user
+
+    A missing counter is seeded from the clock rather than restarted at one,
+    so an evicted counter can never line up with stale response keys.
+    """
+    cache = get_cache()
+    key = _generation_key(user)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, time.time_ns(), None)
+        generation = cache.get(key)
+
+    return generation
+
+
+def _modified_key(user):
+    return f'pets:modified:{user.pk}'
+
+
+def get_last_modified(user):
+    """Return the time in epoch seconds of the user's last write"""
+    cache = get_cache()
+    key = _modified_key(user)
+    modified = cache.get(key)
+    if modified is None:
+        cache.add(key, int(time.time()), None)
+        modified = cache.get(key)
+
+    return modified
+
+
+def invalidate_user_cache(user):
+    """Retire every cached response for a user by bumping the generation"""
+    cache = get_cache()
+    key = _generation_key(user)
+    try:
+        generation = cache.incr(key)
+    except ValueError:
+        generation = time.time_ns()
+        cache.set(key, generation, None)
+
+    # Always move forward so two writes within a second differ
+    key = _modified_key(user)
+    modified = max(int(time.time()), (cache.get(key) or 0) + 1)
+    cache.set(key, modified, None)
+
+    generation_bumped.send(sender=None, user=user, generation=generation)
+
+
+def response_cache_key(request, generation):
+    """Build the cache key for a request at the given generation"""
+    params = urlencode(sorted(request.query_params.lists()), doseq=True)
+    digest = hashlib.md5(
+        f'{request.get_host()}{request.path}?{params}'.encode()
+    ).hexdigest()
+
+    return f'pets:response:{request.user.pk}:{generation}:{digest}'
+
+
+class CachedResponseMixin:
+    """Serve list and retrieve from a per-user versioned response cache
+
+    Writes through the viewset bump the user's generation, which orphans all
+    of their cached responses at once without scanning for keys.
+    """
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        """Return the cached response data or call handler and store it"""
+        cache = get_cache()
+        key = response_cache_key(request, get_generation(request.user))
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(
+                key,
+                response.data,
+                getattr(settings, 'PETS_CACHE_TIMEOUT', 300)
+            )
+
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def create(self, request, *args, **kwargs):
+        response = super().create(request, *args, **kwargs)
+        invalidate_user_cache(request.user)
+        return response
+
+    def update(self, request, *args, **kwargs):
+        response = super().update(request, *args, **kwargs)
+        invalidate_user_cache(request.user)
+        return response
+
+    def destroy(self, request, *args, **kwargs):
+        response = super().destroy(request, *args, **kwargs)
+        invalidate_user_cache(request.user)
+        return response
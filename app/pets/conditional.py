@@ -0,0 +1,96 @@
+import hashlib
+
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, \
+    quote_etag, urlencode
+
+from django.utils.translation import ugettext_lazy as _
+
+from rest_framework import status
+from rest_framework.response import Response
+
+from pets.cache import get_generation, get_last_modified
+
+
+def compute_etag(request, include_params=True):
+    """Return a strong ETag for a user's view of the requested resource
+
+    The tag is derived from the user's change generation instead of the
+    rendered body, so it is known before any query runs.
+    """
+    params = ''
+    if include_params:
+        params = urlencode(sorted(request.query_params.lists()), doseq=True)
+    media_type = getattr(request, 'accepted_media_type', '')
+    digest = hashlib.sha1(
+        f'{request.user.pk}:{get_generation(request.user)}:'
+        f'{request.path}?{params}:{media_type}'.encode()
+    ).hexdigest()
+
+    return quote_etag(digest)
+
+
+def _etag_matches(etag, header):
+    """Return True if etag is one of the tags listed in header
+
+    Compression marks tags weak, but they name the user's data generation
+    rather than the bytes sent, so a weak copy matches its strong tag.
+    """
+    etags = [tag[2:] if tag.startswith('W/') else tag
+             for tag in parse_etags(header)]
+    return '*' in etags or etag in etags
+
+
+class ConditionalRequestMixin:
+    """Answer conditional requests from the user's change watermark
+
+    List and retrieve carry ETag and Last-Modified headers and return
+    304 Not Modified before the queryset is touched. Updates honour
+    If-Match so a client cannot overwrite a change it has not seen.
+    """
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        """Return 304 if the client copy is current, else call handler"""
+        etag = compute_etag(request)
+        last_modified = get_last_modified(request.user)
+
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if_modified_since = parse_http_date_safe(
+            request.META.get('HTTP_IF_MODIFIED_SINCE', '')
+        )
+        if if_none_match is not None:
+            not_modified = _etag_matches(etag, if_none_match)
+        else:
+            not_modified = if_modified_since is not None and \
+                last_modified <= if_modified_since
+
+        if not_modified:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (
+                status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def update(self, request, *args, **kwargs):
+        if_match = request.META.get('HTTP_IF_MATCH')
+        if if_match is not None and not _etag_matches(
+                compute_etag(request, include_params=False), if_match):
+            return Response(
+                {'detail': _('Resource has changed since it was fetched')},
+                status=status.HTTP_412_PRECONDITION_FAILED
+            )
+
+        return super().update(request, *args, **kwargs)
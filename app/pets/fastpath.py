@@ -0,0 +1,185 @@
+import decimal
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db import models
+
+from rest_framework import fields, relations, serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from pets.fieldsets import requested_fields
+
+
+def _identity(value):
+    return value
+
+
+def _decimal_converter(field):
+    """Return a converter matching DecimalField.to_representation"""
+    coerce_to_string = getattr(
+        field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING
+    )
+    if field.localize or field.decimal_places is None or not coerce_to_string:
+        return field.to_representation
+
+    exponent = decimal.Decimal(1).scaleb(-field.decimal_places)
+    context = decimal.getcontext().copy()
+    if field.max_digits is not None:
+        context.prec = field.max_digits
+    rounding = field.rounding
+
+    def convert(value):
+        if not isinstance(value, decimal.Decimal):
+            return field.to_representation(value)
+        return '{0:f}'.format(
+            value.quantize(exponent, rounding=rounding, context=context)
+        )
+
+    return convert
+
+
+def _choice_converter(field, model_field):
+    """Return a converter matching ChoiceField.to_representation"""
+    if isinstance(model_field, models.CharField) and all(
+            key == value
+            for key, value in field.choice_strings_to_values.items()):
+        return _identity
+    return field.to_representation
+
+
+def _get_converter(field, model_field):
+    """Return a fast converter for a serializer field or None if unsupported
+
+    Converters reproduce the field's to_representation for the raw column
+    value returned by QuerySet.values().
+    """
+    if isinstance(field, fields.ChoiceField):
+        return _choice_converter(field, model_field)
+    if isinstance(field, fields.DecimalField):
+        return _decimal_converter(field)
+    if isinstance(field, fields.IntegerField) and \
+            isinstance(model_field, (models.AutoField, models.IntegerField)):
+        return _identity
+    if type(field) is fields.CharField and \
+            isinstance(model_field, models.CharField):
+        return _identity
+    if isinstance(field, relations.PrimaryKeyRelatedField) and \
+            not field.pk_field and \
+            model_field.many_to_one and \
+            model_field.target_field.name == 'id':
+        return _identity
+    if type(field) in (fields.BooleanField, fields.FloatField):
+        return field.to_representation
+
+    return None
+
+
+class FastRepresentation:
+    """Serialize rows from QuerySet.values() without model instances
+
+    Built once per serializer class from its field tree, it maps each raw
+    column through a precomputed converter and yields plain dicts whose
+    JSON is identical to the serializer's own output.
+    """
+
+    def __init__(self, names, columns, converters):
+        self.names = names
+        self.columns = columns
+        self.converters = converters
+
+    @classmethod
+    def from_serializer(cls, serializer):
+        """Return a fast representation of serializer or None"""
+        if type(serializer).to_representation is not \
+                serializers.Serializer.to_representation:
+            return None
+
+        model = serializer.Meta.model
+        names, columns, converters = [], [], []
+        for field in serializer._readable_fields:
+            source = field.source
+            if source == '*' or '.' in source or \
+                    isinstance(field, serializers.BaseSerializer):
+                return None
+            try:
+                model_field = model._meta.get_field(source)
+            except FieldDoesNotExist:
+                return None
+            if not model_field.concrete or model_field.many_to_many:
+                return None
+
+            converter = _get_converter(field, model_field)
+            if converter is None:
+                return None
+            names.append(field.field_name)
+            columns.append(source)
+            converters.append(converter)
+
+        return cls(tuple(names), tuple(columns), tuple(converters))
+
+    def serialize(self, rows):
+        """Return the representation of every values() row"""
+        plan = tuple(zip(self.names, self.columns, self.converters))
+        data = []
+        for row in rows:
+            item = {}
+            for name, column, convert in plan:
+                value = row[column]
+                item[name] = None if value is None else convert(value)
+            data.append(item)
+
+        return data
+
+    def iterate(self, rows):
+        """Yield the representation of each values() row as it is read"""
+        plan = tuple(zip(self.names, self.columns, self.converters))
+        for row in rows:
+            yield {
+                name: None if row[column] is None else convert(row[column])
+                for name, column, convert in plan
+            }
+
+
+_representations = {}
+
+
+def get_fast_representation(serializer_class, only=(), expand=()):
+    """Return the cached fast representation for a serializer class
+
+    only and expand narrow the serializer as its ?fields= and ?expand=
+    query params would. Names the serializer rejects raise before
+    anything is cached, so the cache stays bounded.
+    """
+    key = (serializer_class, only, expand)
+    if key not in _representations:
+        serializer = serializer_class()
+        if only or expand:
+            serializer.sparse(only, expand)
+        _representations[key] = FastRepresentation.from_serializer(serializer)
+    return _representations[key]
+
+
+class FastListMixin:
+    """Serve the list action from values() rows when the serializer allows
+
+    Serializers made only of plain column fields are rendered through
+    FastRepresentation, anything else falls back to the regular path.
+    """
+
+    def list(self, request, *args, **kwargs):
+        fast = get_fast_representation(
+            self.get_serializer_class(), *requested_fields(request)
+        )
+        if fast is None:
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        ordering = [f.lstrip('-') for f in queryset.query.order_by]
+        columns = set(fast.columns) | set(ordering) | {'id'}
+        rows = queryset.values(*columns)
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(fast.serialize(page))
+
+        return Response(fast.serialize(rows))
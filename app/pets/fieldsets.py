@@ -0,0 +1,61 @@
+from django.utils.translation import ugettext_lazy as _
+
+from rest_framework import serializers
+
+from pets.filters import params_to_list
+
+READ_METHODS = ('GET', 'HEAD')
+
+
+def requested_fields(request):
+    """Return the sorted ?fields= and ?expand= names of a read request
+
+    Writes always validate and return every field, so only GET and HEAD
+    requests are narrowed.
+    """
+    if request is None or request.method not in READ_METHODS:
+        return (), ()
+    params = request.query_params
+
+    return (
+        tuple(sorted(set(params_to_list(params.get('fields', ''))))),
+        tuple(sorted(set(params_to_list(params.get('expand', ''))))),
+    )
+
+
+class SparseFieldsMixin:
+    """Narrow a serializer to ?fields= and nest its ?expand= relations
+
+    expandable_fields maps a field name to the serializer class that
+    replaces it when expanded. Expanded fields are kept even when not
+    listed in fields. Unknown names are a validation error rather than
+    silently ignored, so a typo does not return an empty object.
+    """
+    expandable_fields = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        fields, expand = requested_fields(self.context.get('request'))
+        if fields or expand:
+            self.sparse(fields, expand)
+
+    def sparse(self, fields=(), expand=()):
+        """Keep only the named fields and expand the named relations"""
+        unknown = set(expand) - set(self.expandable_fields)
+        if unknown:
+            raise serializers.ValidationError({'expand': [
+                _('Cannot expand: %s') % ', '.join(sorted(unknown))
+            ]})
+        for name in expand:
+            self.fields[name] = self.expandable_fields[name](read_only=True)
+
+        if fields:
+            unknown = set(fields) - set(self.fields)
+            if unknown:
+                raise serializers.ValidationError({'fields': [
+                    _('Unknown fields: %s') % ', '.join(sorted(unknown))
+                ]})
+            keep = set(fields) | set(expand)
+            for name in list(self.fields):
+                if name not in keep:
+                    self.fields.pop(name)
@@ -0,0 +1,153 @@
+import datetime
+import hashlib
+import json
+
+from django.conf import settings
+from django.db import IntegrityError, OperationalError, connection, \
+    transaction
+from django.utils import timezone
+from django.utils.translation import ugettext_lazy as _
+
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+
+from core.models import IdempotencyKey
+
+from pets.cache import invalidate_user_cache
+
+HEADER = 'HTTP_IDEMPOTENCY_KEY'
+
+
+def _ttl():
+    return datetime.timedelta(
+        seconds=getattr(settings, 'IDEMPOTENCY_KEY_TTL', 86400)
+    )
+
+
+def request_fingerprint(request):
+    """Digest the method, path and body a key was first used with"""
+    digest = hashlib.sha256(f'{request.method} {request.path}\n'.encode())
+    digest.update(request.body)
+
+    return digest.hexdigest()
+
+
+def replay(stored, fingerprint):
+    """Return the stored response, or 422 if the key was used elsewhere"""
+    if stored.fingerprint != fingerprint:
+        return Response(
+            {'detail': _('Idempotency-Key was used for a different request')},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+    response = Response(json.loads(stored.response), status=stored.status_code)
+    response['Idempotent-Replayed'] = 'true'
+
+    return response
+
+
+def sweep_expired(batch_size=5000):
+    """Delete stored keys older than IDEMPOTENCY_KEY_TTL, return the count
+
+    Rows go in batches by primary key so a large backlog never holds one
+    long delete.
+    """
+    cutoff = timezone.now() - _ttl()
+    deleted = 0
+    while True:
+        pks = list(IdempotencyKey.objects.filter(
+            created__lt=cutoff
+        ).values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return deleted
+        deleted += IdempotencyKey.objects.filter(pk__in=pks).delete()[0]
+
+
+class IdempotencyMixin:
+    """Run a create once per Idempotency-Key and replay it for retries
+
+    A retry with a stored key is answered from one indexed lookup. The
+    first request claims the key by inserting its row in the same
+    transaction as the create, so a concurrent duplicate blocks on the
+    unique index until the first commits and then replays its response,
+    or runs itself if the first failed. Only successful responses are
+    stored; the claim of a failed create is rolled back with it.
+    """
+
+    def create(self, request, *args, **kwargs):
+        key = request.META.get(HEADER)
+        if key is None:
+            return super().create(request, *args, **kwargs)
+        if not 0 < len(key) <= IdempotencyKey._meta.get_field(
+                'key').max_length:
+            return Response(
+                {'detail': _('Idempotency-Key must be 1 to 255 characters')},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        fingerprint = request_fingerprint(request)
+        stored = IdempotencyKey.objects.filter(
+            user=request.user, key=key
+        ).first()
+        if stored is not None:
+            if stored.created >= timezone.now() - _ttl():
+                return replay(stored, fingerprint)
+            stored.delete()
+
+        with transaction.atomic():
+            try:
+                claim = self.claim_key(request, key, fingerprint)
+            except IntegrityError:
+                claim = None
+            except OperationalError:
+                return Response(
+                    {'detail': _('A request with this key is in progress')},
+                    status=status.HTTP_409_CONFLICT
+                )
+            if claim is None:
+                return replay(IdempotencyKey.objects.get(
+                    user=request.user, key=key
+                ), fingerprint)
+
+            response = super().create(request, *args, **kwargs)
+            if not status.is_success(response.status_code):
+                transaction.set_rollback(True)
+                return response
+            claim.status_code = response.status_code
+            claim.response = json.dumps(response.data, cls=JSONEncoder)
+            claim.save(update_fields=['status_code', 'response'])
+            # Readers may have cached the old list before this commits
+            transaction.on_commit(
+                lambda: invalidate_user_cache(request.user)
+            )
+
+        return response
+
+    def claim_key(self, request, key, fingerprint):
+        """Insert the key, waiting up to IDEMPOTENCY_WAIT on a duplicate
+
+        The shorter lock_timeout is set in the claim's own savepoint and
+        put back once the row is in, so the create's own locks keep the
+        normal timeout; a failed claim rolls it back with the savepoint.
+        """
+        postgresql = connection.vendor == 'postgresql'
+        with transaction.atomic():
+            if postgresql:
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "SELECT current_setting('lock_timeout'), "
+                        "set_config('lock_timeout', %s, true)",
+                        [f'{getattr(settings, "IDEMPOTENCY_WAIT", 10)}s']
+                    )
+                    previous = cursor.fetchone()[0]
+            claim = IdempotencyKey.objects.create(
+                user=request.user, key=key, fingerprint=fingerprint
+            )
+            if postgresql:
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        "SELECT set_config('lock_timeout', %s, true)",
+                        [previous]
+                    )
+
+        return claim
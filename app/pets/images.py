@@ -0,0 +1,123 @@
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+
+from PIL import Image
+
+from core.models import PetManager, pet_image_variant_path
+
+from pets.cache import invalidate_user_cache
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def get_variants():
+    """Return the configured variant names mapped to their longest side"""
+    return getattr(settings, 'PETS_IMAGE_VARIANTS', {
+        'thumb': 150,
+        'card': 400,
+        'full': 1200,
+    })
+
+
+def get_executor():
+    """Return the worker pool, starting it on first use"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, 'PETS_IMAGE_WORKERS', 2),
+            thread_name_prefix='pet-images'
+        )
+    return _executor
+
+
+def render_variant(image, size):
+    """Return the encoded bytes of image scaled to fit a size square"""
+    variant = image.copy()
+    variant.thumbnail((size, size), Image.LANCZOS)
+    if image.format == 'JPEG' and variant.mode not in ('RGB', 'L'):
+        variant = variant.convert('RGB')
+    buffer = io.BytesIO()
+    variant.save(buffer, format=image.format or 'PNG', optimize=True)
+
+    return buffer.getvalue()
+
+
+def delete_variants(name):
+    """Delete every variant file written for the image name"""
+    for variant in get_variants():
+        path = pet_image_variant_path(name, variant)
+        if default_storage.exists(path):
+            default_storage.delete(path)
+
+
+def generate_variants(pet_id, user_id, name):
+    """Write each variant of a pet image and mark it ready as it lands
+
+    Readiness is only recorded while the pet still holds the same image, so
+    a slow job never overwrites the variants of a newer upload; it deletes
+    what it wrote instead.
+    """
+    with default_storage.open(name) as fh:
+        image = Image.open(fh)
+        image.load()
+
+    ready = []
+    for variant, size in get_variants().items():
+        path = pet_image_variant_path(name, variant)
+        if default_storage.exists(path):
+            default_storage.delete(path)
+        default_storage.save(path, ContentFile(render_variant(image, size)))
+        ready.append(variant)
+
+        updated = PetManager.objects.filter(pk=pet_id, image=name).update(
+            image_variants=','.join(ready)
+        )
+        if not updated:
+            delete_variants(name)
+            return
+        invalidate_user_cache(get_user_model()(pk=user_id))
+
+
+def _run(pet_id, user_id, name, previous):
+    try:
+        if previous and previous != name:
+            delete_variants(previous)
+        generate_variants(pet_id, user_id, name)
+    except Exception:
+        logger.exception('Failed to generate variants of %s', name)
+    finally:
+        # Worker threads hold their own connection, release it per job
+        connection.close()
+
+
+def schedule_variants(pet, previous=''):
+    """Queue variant generation for a pet once the upload is committed
+
+    The variants of the previous image name, if any, are deleted first.
+    """
+    args = (pet.pk, pet.user_id, pet.image.name, previous)
+    transaction.on_commit(lambda: get_executor().submit(_run, *args))
+
+
+def get_variant_urls(pet, request=None):
+    """Return the URL of every ready variant of a pet's image by name"""
+    if not pet.image or not pet.image_variants:
+        return {}
+
+    urls = {}
+    for variant in pet.image_variants.split(','):
+        url = default_storage.url(
+            pet_image_variant_path(pet.image.name, variant)
+        )
+        urls[variant] = request.build_absolute_uri(url) if request else url
+
+    return urls
@@ -0,0 +1,450 @@
+import csv
+import hashlib
+import io
+import itertools
+import json
+import os
+import time
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils.translation import ugettext_lazy as _
+
+from rest_framework import serializers
+from rest_framework.decorators import action
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
+
+from core.models import Category, PetManager, StoreStatus
+
+from pets.bulk import bulk_saved, bulk_update
+from pets.cache import invalidate_user_cache
+from pets.summary import adjust_summary
+
+FIELDS = ('sku', 'name', 'category', 'in_store_status', 'price')
+
+_categories = {key.lower(): key for key, _ in Category.CATEGORY_CHOICES}
+_statuses = {key.lower(): key for key, _ in StoreStatus.STATUS_CHOICES}
+_max_lengths = {
+    name: PetManager._meta.get_field(name).max_length
+    for name in ('sku', 'name')
+}
+_price_field = PetManager._meta.get_field('price')
+_max_price = Decimal(10) ** (
+    _price_field.max_digits - _price_field.decimal_places
+)
+_cent = Decimal(1).scaleb(-_price_field.decimal_places)
+
+
+class ImportFailed(ValueError):
+    """Raised when a file cannot be imported at all"""
+
+
+def detect_format(name):
+    """Return 'ndjson' for .ndjson and .jsonl names, else 'csv'"""
+    return 'ndjson' if name.lower().endswith(('.ndjson', '.jsonl')) \
+        else 'csv'
+
+
+def read_records(stream, file_format):
+    """Yield each record of a text stream as a dict of strings
+
+    Records that cannot be parsed at all are yielded as an error string
+    in place of the dict, so they can be rejected without stopping.
+    """
+    if file_format == 'ndjson':
+        for line in stream:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                yield f'Invalid JSON: {exc}'
+                continue
+            if not isinstance(record, dict):
+                yield 'Expected a JSON object'
+                continue
+            yield {
+                key: '' if value is None else str(value)
+                for key, value in record.items()
+            }
+        return
+
+    reader = csv.DictReader(stream)
+    missing = set(FIELDS) - set(reader.fieldnames or ())
+    if missing:
+        raise ImportFailed(f'Missing columns: {", ".join(sorted(missing))}')
+    yield from reader
+
+
+def _price(text):
+    try:
+        value = Decimal(text).quantize(_cent)
+    except (InvalidOperation, TypeError):
+        return None
+    return value if Decimal(0) <= value < _max_price else None
+
+
+def validate_batch(records):
+    """Split a batch of records into valid rows and rejects
+
+    Each column is checked for the whole batch at once, against the model
+    choices, lengths and price digits. Rows are returned as tuples in
+    FIELDS order and rejects as (position in batch, record, error).
+    """
+    positions = [
+        position for position, record in enumerate(records)
+        if isinstance(record, dict)
+    ]
+    errors = {
+        position: [record] for position, record in enumerate(records)
+        if not isinstance(record, dict)
+    }
+
+    def fail(index, message):
+        errors.setdefault(positions[index], []).append(message)
+
+    columns = {
+        name: [
+            (records[position].get(name) or '').strip()
+            for position in positions
+        ]
+        for name in FIELDS
+    }
+    for name, limit in _max_lengths.items():
+        for index, value in enumerate(columns[name]):
+            if not value:
+                fail(index, f'{name} is required')
+            elif len(value) > limit:
+                fail(index, f'{name} is over {limit} characters')
+    for name, choices in (
+            ('category', _categories), ('in_store_status', _statuses)):
+        values = [choices.get(value.lower()) for value in columns[name]]
+        for index, value in enumerate(values):
+            if value is None:
+                fail(index, f'{name} {columns[name][index]!r} is not a choice')
+        columns[name] = values
+    columns['price'] = [_price(value) for value in columns['price']]
+    for index, value in enumerate(columns['price']):
+        if value is None:
+            fail(index, 'price is not a valid amount')
+
+    rows = [
+        row for position, row in zip(
+            positions, zip(*(columns[name] for name in FIELDS))
+        )
+        if position not in errors
+    ]
+    rejects = [
+        (
+            position,
+            records[position] if isinstance(records[position], dict)
+            else {},
+            '; '.join(messages)
+        )
+        for position, messages in sorted(errors.items())
+    ]
+
+    return rows, rejects
+
+
+def _dedupe(rows):
+    """Keep the last row for each sku, an upsert may touch a key once"""
+    return list({row[0]: row for row in rows}.values())
+
+
+def upsert_postgresql(user, rows):
+    """Insert or update rows by (user, sku), return (id, sku, status) written
+
+    Rows are copied into a temporary table and merged in one statement.
+    Rows identical to the stored pet are left alone and not returned.
+    The store status only applies to new pets; existing ones move through
+    the transition graph instead, so their status is kept.
+    """
+    table = PetManager._meta.db_table
+    data = io.StringIO()
+    writer = csv.writer(data)
+    writer.writerows(rows)
+    data.seek(0)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'CREATE TEMPORARY TABLE pets_import (sku varchar(64), '
+            'name varchar(255), category varchar(100), '
+            'in_store_status varchar(30), price numeric(8, 2))'
+        )
+        cursor.copy_expert(
+            'COPY pets_import FROM STDIN WITH (FORMAT csv)', data
+        )
+        cursor.execute(
+            f'INSERT INTO {table} AS pet (user_id, image_variants, version, '
+            f'sku, name, category, in_store_status, price) '
+            f'SELECT %s, \'\', 0, sku, name, category, in_store_status, '
+            f'price FROM pets_import '
+            f'ON CONFLICT (user_id, sku) DO UPDATE SET '
+            f'name = EXCLUDED.name, category = EXCLUDED.category, '
+            f'price = EXCLUDED.price, version = pet.version + 1 '
+            f'WHERE (pet.name, pet.category, pet.price) '
+            f'IS DISTINCT FROM (EXCLUDED.name, EXCLUDED.category, '
+            f'EXCLUDED.price) '
+            f'RETURNING id, sku, in_store_status',
+            [user.pk]
+        )
+        saved = cursor.fetchall()
+        cursor.execute('DROP TABLE pets_import')
+
+    return saved
+
+
+def upsert_portable(user, rows):
+    """Insert or update rows by (user, sku) with ORM bulk queries"""
+    existing = {
+        sku: (pk, in_store_status)
+        for sku, pk, in_store_status in PetManager.objects.filter(
+            user=user, sku__in=[row[0] for row in rows]
+        ).values_list('sku', 'id', 'in_store_status')
+    }
+    changed, added = [], []
+    for sku, name, category, in_store_status, price in rows:
+        pk, in_store_status = existing.get(sku, (None, in_store_status))
+        pet = PetManager(
+            id=pk, user=user, sku=sku, name=name,
+            category=category, in_store_status=in_store_status, price=price
+        )
+        (changed if pet.id else added).append(pet)
+    if changed:
+        bulk_update(PetManager, changed, ['name', 'category', 'price'])
+        PetManager.objects.filter(
+            pk__in=[pet.pk for pet in changed]
+        ).update(version=F('version') + 1)
+    added = PetManager.objects.bulk_create(added)
+    if added and added[0].pk is None:
+        existing = dict(PetManager.objects.filter(
+            user=user, sku__in=[pet.sku for pet in added]
+        ).values_list('sku', 'id'))
+        for pet in added:
+            pet.pk = existing[pet.sku]
+
+    return [
+        (pet.pk, pet.sku, pet.in_store_status) for pet in changed + added
+    ]
+
+
+def fingerprint(path):
+    """Identify a file by its size and the digest of its first block"""
+    with open(path, 'rb') as handle:
+        head = handle.read(65536)
+    return f'{os.path.getsize(path)}:{hashlib.sha256(head).hexdigest()}'
+
+
+class Checkpoint:
+    """Progress of an import, saved after each committed chunk
+
+    A crash between a commit and the save replays that chunk on resume,
+    which the upsert makes harmless.
+    """
+
+    def __init__(self, path, source):
+        self.path = path
+        self.source = source
+        self.records = 0
+        self.imported = 0
+        self.rejected = 0
+
+    def load(self):
+        """Read saved progress, returning False if there is none"""
+        if not self.path or not os.path.exists(self.path):
+            return False
+        with open(self.path) as handle:
+            saved = json.load(handle)
+        if saved.get('source') != self.source:
+            raise ImportFailed(
+                'The checkpoint was written for a different file'
+            )
+        self.records = saved['records']
+        self.imported = saved['imported']
+        self.rejected = saved['rejected']
+        return True
+
+    def save(self):
+        if not self.path:
+            return
+        temporary = f'{self.path}.tmp'
+        with open(temporary, 'w') as handle:
+            json.dump({
+                'source': self.source,
+                'records': self.records,
+                'imported': self.imported,
+                'rejected': self.rejected,
+            }, handle)
+        os.replace(temporary, self.path)
+
+    def clear(self):
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class RejectWriter:
+    """Write rejected records with their line number and error as CSV"""
+
+    def __init__(self, stream, keep=0):
+        self.writer = csv.writer(stream) if stream is not None else None
+        self.keep = keep
+        self.kept = []
+        if self.writer is not None and stream.tell() == 0:
+            self.writer.writerow(('record',) + FIELDS + ('error',))
+
+    def write(self, number, record, error):
+        if self.writer is not None:
+            self.writer.writerow(
+                (number,) + tuple(record.get(name, '') for name in FIELDS)
+                + (error,)
+            )
+        if len(self.kept) < self.keep:
+            self.kept.append({'record': number, 'error': error})
+
+
+class Importer:
+    """Stream records into a user's pets in chunked transactions
+
+    Every chunk is validated column by column, upserted by (user, sku)
+    and committed on its own together with its inventory summary counts,
+    then the checkpoint moves past it.
+    """
+
+    def __init__(self, user, chunk_size=None, checkpoint=None,
+                 rejects=None):
+        self.user = user
+        self.chunk_size = chunk_size or getattr(
+            settings, 'PETS_IMPORT_CHUNK_SIZE', 5000
+        )
+        self.checkpoint = checkpoint or Checkpoint(None, None)
+        self.rejects = rejects or RejectWriter(None)
+        self.upsert = upsert_postgresql \
+            if connection.vendor == 'postgresql' else upsert_portable
+
+    def _chunks(self, records):
+        chunk = []
+        for record in records:
+            chunk.append(record)
+            if len(chunk) == self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def previous_keys(self, rows):
+        """Lock the chunk's existing pets, return their summary key by sku"""
+        pets = PetManager.objects.select_for_update().filter(
+            user=self.user, sku__in=[row[0] for row in rows]
+        ).order_by('pk')
+        return {
+            sku: (category, in_store_status)
+            for sku, category, in_store_status in pets.values_list(
+                'sku', 'category', 'in_store_status'
+            )
+        }
+
+    def import_chunk(self, chunk):
+        rows, rejects = validate_batch(chunk)
+        rows = _dedupe(rows)
+        by_sku = {row[0]: row for row in rows}
+        saved = []
+        if rows:
+            with transaction.atomic():
+                previous = self.previous_keys(rows)
+                saved = self.upsert(self.user, rows)
+                adjust_summary(
+                    self.user,
+                    added=[
+                        (by_sku[sku][2], in_store_status)
+                        for pk, sku, in_store_status in saved
+                    ],
+                    removed=[
+                        previous[sku] for pk, sku, in_store_status in saved
+                        if sku in previous
+                    ]
+                )
+        if saved:
+            invalidate_user_cache(self.user)
+        if saved and bulk_saved.has_listeners(PetManager):
+            bulk_saved.send(sender=PetManager, instances=[
+                PetManager(
+                    id=pk, user=self.user, sku=sku, name=by_sku[sku][1],
+                    category=by_sku[sku][2], in_store_status=in_store_status,
+                    price=by_sku[sku][4]
+                )
+                for pk, sku, in_store_status in saved
+            ])
+        for position, record, error in rejects:
+            self.rejects.write(
+                self.checkpoint.records + position + 1, record, error
+            )
+
+        self.checkpoint.records += len(chunk)
+        self.checkpoint.imported += len(rows)
+        self.checkpoint.rejected += len(rejects)
+        self.checkpoint.save()
+
+    def run(self, records):
+        """Import records, skipping any the checkpoint already covers"""
+        start = time.perf_counter()
+        records = iter(records)
+        skip = self.checkpoint.records
+        next(itertools.islice(records, skip, skip), None)
+        for chunk in self._chunks(records):
+            self.import_chunk(chunk)
+
+        elapsed = time.perf_counter() - start
+        self.checkpoint.clear()
+
+        return {
+            'records': self.checkpoint.records,
+            'imported': self.checkpoint.imported,
+            'rejected': self.checkpoint.rejected,
+            'seconds': round(elapsed, 3),
+            'rows_per_second': round(
+                (self.checkpoint.records - skip) / elapsed if elapsed else 0
+            ),
+        }
+
+
+def open_text(handle):
+    """Wrap a binary upload or file as UTF-8 text, tolerating a BOM"""
+    return io.TextIOWrapper(handle, encoding='utf-8-sig', newline='')
+
+
+class ImportMixin:
+    """Upsert the user's pets from an uploaded CSV or NDJSON file"""
+    import_errors_shown = 100
+
+    @action(
+        methods=['POST'], detail=False, url_path='import', url_name='import',
+        parser_classes=(MultiPartParser,)
+    )
+    def import_file(self, request):
+        """Import a file of pets keyed by sku, reporting rejected records"""
+        upload = request.FILES.get('file')
+        if upload is None:
+            raise serializers.ValidationError(
+                {'file': [_('Attach a CSV or NDJSON file')]}
+            )
+        file_format = request.data.get('format') or detect_format(upload.name)
+        if file_format not in ('csv', 'ndjson'):
+            raise serializers.ValidationError(
+                {'format': [_('Choose one of: csv, ndjson')]}
+            )
+
+        importer = Importer(
+            request.user, rejects=RejectWriter(None, self.import_errors_shown)
+        )
+        try:
+            result = importer.run(
+                read_records(open_text(upload.file), file_format)
+            )
+        except ImportFailed as exc:
+            raise serializers.ValidationError({'file': [str(exc)]})
+        result['errors'] = importer.rejects.kept
+
+        return Response(result)
@@ -0,0 +1,82 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from rest_framework.renderers import JSONRenderer
+
+from core.models import PetManager
+
+from pets.fastpath import get_fast_representation
+from pets.serializers import PetSerializer
+
+
+class Rollback(Exception):
+    """Raised to discard the benchmark rows"""
+
+
+class Command(BaseCommand):
+    """Django command to compare PetSerializer with the values() fast path"""
+    help = 'Time PetSerializer against the fast list path on seeded rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows', type=int, nargs='+', default=[1000, 10000, 100000]
+        )
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def best_of(self, repeat, func):
+        """Return the fastest of repeat timed calls of func"""
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    def handle(self, *args, **options):
+        renderer = JSONRenderer()
+        fast = get_fast_representation(PetSerializer)
+        self.stdout.write(
+            f'{"rows":>8} {"serializer":>12} {"fast path":>12} {"speedup":>8}'
+        )
+
+        for rows in options['rows']:
+            try:
+                with transaction.atomic():
+                    user = get_user_model().objects.create(
+                        email=f'bench-{rows}@example.com'
+                    )
+                    PetManager.objects.bulk_create(
+                        PetManager(
+                            user=user,
+                            name=f'Pet {i}',
+                            in_store_status='Instore',
+                            category='Dog',
+                            price=f'{i % 1000}.{i % 100:02d}'
+                        )
+                        for i in range(rows)
+                    )
+                    queryset = PetManager.objects.filter(user=user)
+
+                    slow = self.best_of(
+                        options['repeat'],
+                        lambda: renderer.render(
+                            PetSerializer(queryset.all(), many=True).data
+                        )
+                    )
+                    quick = self.best_of(
+                        options['repeat'],
+                        lambda: renderer.render(
+                            fast.serialize(queryset.values(*fast.columns))
+                        )
+                    )
+                    raise Rollback
+            except Rollback:
+                pass
+
+            self.stdout.write(
+                f'{rows:>8} {slow:>11.3f}s {quick:>11.3f}s '
+                f'{slow / quick:>7.1f}x'
+            )
@@ -0,0 +1,79 @@
+import os
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from pets.importer import Checkpoint, Importer, ImportFailed, \
+    RejectWriter, detect_format, fingerprint, open_text, read_records
+
+
+class Command(BaseCommand):
+    """Django command to upsert a user's pets from a supplier file"""
+    help = 'Stream a CSV or NDJSON file of pets into a user\'s inventory'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument(
+            '--user', required=True, help='Email of the owning user'
+        )
+        parser.add_argument('--format', choices=['csv', 'ndjson'])
+        parser.add_argument('--chunk-size', type=int)
+        parser.add_argument(
+            '--checkpoint',
+            help='Progress file, <path>.checkpoint by default'
+        )
+        parser.add_argument(
+            '--rejects', help='Rejected records, <path>.rejects.csv by default'
+        )
+        parser.add_argument(
+            '--restart', action='store_true',
+            help='Ignore a saved checkpoint and import from the start'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if not os.path.isfile(path):
+            raise CommandError(f'No such file: {path}')
+        try:
+            user = get_user_model().objects.get(email=options['user'])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'No user with email {options["user"]}')
+
+        checkpoint = Checkpoint(
+            options['checkpoint'] or f'{path}.checkpoint', fingerprint(path)
+        )
+        if options['restart']:
+            checkpoint.clear()
+        try:
+            resumed = checkpoint.load()
+        except ImportFailed as exc:
+            raise CommandError(f'{exc}, pass --restart to start over')
+        if resumed:
+            self.stdout.write(
+                f'Resuming after record {checkpoint.records}'
+            )
+
+        rejects_path = options['rejects'] or f'{path}.rejects.csv'
+        file_format = options['format'] or detect_format(path)
+        with open(path, 'rb') as source, \
+                open(rejects_path, 'a' if resumed else 'w', newline='') \
+                as rejects:
+            importer = Importer(
+                user, options['chunk_size'], checkpoint,
+                RejectWriter(rejects)
+            )
+            try:
+                result = importer.run(
+                    read_records(open_text(source), file_format)
+                )
+            except ImportFailed as exc:
+                raise CommandError(exc)
+
+        if not result['rejected']:
+            os.remove(rejects_path)
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {result["imported"]} of {result["records"]} records '
+            f'in {result["seconds"]}s ({result["rows_per_second"]} rows/s), '
+            f'{result["rejected"]} rejected'
+            + (f', see {rejects_path}' if result['rejected'] else '')
+        ))
@@ -0,0 +1,31 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from pets.summary import reconcile_summary
+
+
+class Command(BaseCommand):
+    """Django command to rebuild inventory summaries from the pets table"""
+    help = 'Correct any drift between inventory summaries and actual pets'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', dest='emails', action='append', default=[],
+            help='Only reconcile the user with this email, may be repeated'
+        )
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.order_by('pk')
+        if options['emails']:
+            users = users.filter(email__in=options['emails'])
+
+        drifted = 0
+        for user in users.iterator():
+            corrected = reconcile_summary(user)
+            if corrected:
+                drifted += 1
+                self.stdout.write(f'{user.email}: {corrected} rows corrected')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Reconciled inventory, {drifted} users had drifted'
+        ))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from pets.idempotency import sweep_expired
+
+
+class Command(BaseCommand):
+    """Django command to delete expired Idempotency-Key responses"""
+    help = 'Delete stored Idempotency-Key responses older than their TTL'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        deleted = sweep_expired(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {deleted} expired idempotency keys'
+        ))
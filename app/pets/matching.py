@@ -0,0 +1,141 @@
+import bisect
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+from core.models import Category, PetManager
+
+from pets.cache import get_generation
+
+AVAILABLE_STATUS = 'Instore'
+
+_categories = {key.lower(): key for key, _ in Category.CATEGORY_CHOICES}
+
+
+class _Bucket:
+    """Available pets of one category sorted by price"""
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.prices = [entry['price'] for entry in entries]
+        self.by_name = {}
+        for position, entry in enumerate(entries):
+            self.by_name.setdefault(entry['name'].lower(), []).append(
+                position
+            )
+
+
+class InventoryIndex:
+    """In-memory index of a user's available pets for order matching
+
+    Pets are bucketed by category and sorted by price, so candidates for a
+    budget are found by bisection and read off the bucket from the most
+    expensive affordable pet downwards.
+    """
+
+    def __init__(self, rows):
+        buckets = {}
+        for row in rows:
+            buckets.setdefault(row['category'], []).append(row)
+        self.buckets = {
+            category: _Bucket(sorted(
+                entries, key=lambda entry: (entry['price'], entry['id'])
+            ))
+            for category, entries in buckets.items()
+        }
+
+    @classmethod
+    def for_user(cls, user):
+        """Build the index from the user's available pets"""
+        return cls(PetManager.objects.filter(
+            user=user, in_store_status=AVAILABLE_STATUS
+        ).values('id', 'name', 'category', 'price').order_by())
+
+    def candidates(self, order, limit, taken=()):
+        """Yield up to limit pets for an order, best match first
+
+        Pets must be in the requested category and within budget. A pet
+        named as the customer's preference comes first, then the rest by
+        price closest to the budget.
+        """
+        category = _categories.get(
+            (order.customer_animal_choice or '').strip().lower()
+        )
+        bucket = self.buckets.get(category)
+        if bucket is None or limit <= 0:
+            return
+
+        end = bisect.bisect_right(bucket.prices, order.customer_budget)
+        preferred = [
+            position for position in bucket.by_name.get(
+                (order.customer_allocated_preference or '').strip().lower(),
+                ()
+            )
+            if position < end
+        ]
+        for position in preferred:
+            entry = bucket.entries[position]
+            if entry['id'] not in taken:
+                yield entry
+                limit -= 1
+                if not limit:
+                    return
+
+        for position in range(end - 1, -1, -1):
+            entry = bucket.entries[position]
+            if entry['id'] in taken or position in preferred:
+                continue
+            yield entry
+            limit -= 1
+            if not limit:
+                return
+
+    def match(self, order, limit):
+        """Return the best limit candidates for an order"""
+        return list(self.candidates(order, limit))
+
+    def match_all(self, orders):
+        """Assign each order at most one pet, oldest order first
+
+        Orders are matched greedily in one pass and a pet given to an
+        earlier order is not offered to a later one.
+        """
+        taken = set()
+        results = []
+        for order in sorted(orders, key=lambda order: order.pk):
+            entry = next(self.candidates(order, 1, taken), None)
+            if entry is not None:
+                taken.add(entry['id'])
+            results.append((order, entry))
+
+        return results
+
+
+_indexes = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_index(user):
+    """Return the user's index, rebuilding it after any inventory write
+
+    Indexes are tagged with the user's cache generation, which every write
+    moves on, through the API or the model signals in pets.signals, and the
+    least recently used are dropped once PETS_MATCH_INDEX_USERS are held.
+    """
+    generation = get_generation(user)
+    with _lock:
+        cached = _indexes.get(user.pk)
+        if cached is not None and cached[0] == generation:
+            _indexes.move_to_end(user.pk)
+            return cached[1]
+
+    index = InventoryIndex.for_user(user)
+    size = getattr(settings, 'PETS_MATCH_INDEX_USERS', 1000)
+    with _lock:
+        _indexes[user.pk] = (generation, index)
+        _indexes.move_to_end(user.pk)
+        while len(_indexes) > size:
+            _indexes.popitem(last=False)
+
+    return index
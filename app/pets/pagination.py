@@ -0,0 +1,230 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.translation import ugettext_lazy as _
+
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def _encode_value(value):
+    """Return a JSON safe representation of an ordering value"""
+    if value is None or isinstance(value, (int, str)):
+        return value
+    return str(value)
+
+
+class KeysetPagination(BasePagination):
+    """Paginate a queryset by seeking past the last row of the previous page
+
+    The position is the full ordering key of a boundary row, so every page
+    is a single index range scan no matter how deep the client scrolls and
+    rows inserted or deleted behind the cursor never shift the pages.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = _('Invalid cursor')
+
+    def __init__(self):
+        self.page_size = getattr(
+            settings, 'PETS_PAGE_SIZE', api_settings.PAGE_SIZE
+        ) or 50
+        self.max_page_size = getattr(settings, 'PETS_MAX_PAGE_SIZE', 500)
+
+    def get_ordering(self, queryset, view):
+        """Return the ordering key, always ending in the primary key"""
+        ordering = list(queryset.query.order_by) or \
+            list(getattr(view, 'ordering', None) or ('id',))
+        ordering = ['-id' if field == '-pk' else field for field in ordering]
+        ordering = ['id' if field == 'pk' else field for field in ordering]
+        if ordering[-1].lstrip('-') != 'id':
+            ordering.append('-id' if ordering[0].startswith('-') else 'id')
+
+        return tuple(ordering)
+
+    def get_page_size(self, request):
+        """Return the requested page size, capped at max_page_size"""
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size
+            )
+        except (KeyError, ValueError):
+            return min(self.page_size, self.max_page_size)
+
+    def decode_cursor(self, request):
+        """Return the (position, reverse) pair held by the cursor param"""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None, False
+
+        try:
+            data = json.loads(
+                base64.urlsafe_b64decode(encoded.encode('ascii')).decode()
+            )
+            position = data['p']
+            reverse = bool(data.get('r', False))
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if not isinstance(position, list) or \
+                len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        return position, reverse
+
+    def encode_cursor(self, instance, reverse):
+        """Return an opaque cursor pointing at the given boundary row
+
+        The row may be a model instance or a dict from QuerySet.values().
+        """
+        if isinstance(instance, dict):
+            values = [instance[field.lstrip('-')] for field in self.ordering]
+        else:
+            values = [
+                getattr(instance, field.lstrip('-')) for field in self.ordering
+            ]
+        position = [_encode_value(value) for value in values]
+        data = {'p': position}
+        if reverse:
+            data['r'] = 1
+        encoded = base64.urlsafe_b64encode(
+            json.dumps(data, separators=(',', ':')).encode()
+        ).decode('ascii')
+
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded
+        )
+
+    def seek_filter(self, position, reverse):
+        """Build the lexicographic 'row comes after position' condition"""
+        condition = None
+        for index in reversed(range(len(self.ordering))):
+            field = self.ordering[index]
+            name = field.lstrip('-')
+            descending = field.startswith('-') != reverse
+            lookup = 'lt' if descending else 'gt'
+            term = Q(**{f'{name}__{lookup}': position[index]})
+            if condition is not None:
+                term |= Q(**{name: position[index]}) & condition
+            condition = term
+
+        # Leading bound lets the planner turn the seek into a range scan
+        name = self.ordering[0].lstrip('-')
+        descending = self.ordering[0].startswith('-') != reverse
+        lookup = 'lte' if descending else 'gte'
+        leading = Q(**{f'{name}__{lookup}': position[0]})
+
+        return leading & condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(queryset, view)
+        self.page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request)
+
+        if reverse:
+            order_by = [
+                field.lstrip('-') if field.startswith('-') else f'-{field}'
+                for field in self.ordering
+            ]
+        else:
+            order_by = self.ordering
+        queryset = queryset.order_by(*order_by)
+        if position is not None:
+            try:
+                queryset = queryset.filter(self.seek_filter(position, reverse))
+            except (ValueError, TypeError):
+                raise NotFound(self.invalid_cursor_message)
+
+        try:
+            results = list(queryset[:self.page_size + 1])
+        except (ValueError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+
+        if reverse:
+            results.reverse()
+            self.has_next = position is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = position is not None
+        self.page = results
+
+        return results
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+
+class RankedPagination(KeysetPagination):
+    """Paginate ranked search results by offset without counting them
+
+    Ranks are computed per query, so there is no stable key to seek past;
+    pages are sliced by offset and one extra row tells if another follows.
+    """
+    offset_query_param = 'offset'
+
+    def get_offset(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.offset_query_param]
+            )
+        except (KeyError, ValueError):
+            return 0
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.offset = self.get_offset(request)
+
+        results = list(queryset[self.offset:self.offset + self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        self.page = results[:self.page_size]
+
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(
+            self.base_url,
+            self.offset_query_param,
+            self.offset + self.page_size
+        )
+
+    def get_previous_link(self):
+        if not self.offset:
+            return None
+        offset = max(self.offset - self.page_size, 0)
+        if not offset:
+            return remove_query_param(self.base_url, self.offset_query_param)
+        return replace_query_param(
+            self.base_url, self.offset_query_param, offset
+        )
@@ -0,0 +1,162 @@
+from django.core.exceptions import FieldDoesNotExist
+
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, PrimaryKeyRelatedField
+
+
+def _related_model(model, attr):
+    """Return (field, related model) for a relation attr on model or None"""
+    try:
+        field = model._meta.get_field(attr)
+    except FieldDoesNotExist:
+        # Reverse relations are read through their accessor name
+        field = next((
+            f for f in model._meta.get_fields()
+            if f.auto_created and not f.concrete and
+            f.get_accessor_name() == attr
+        ), None)
+    if field is None or not field.is_relation or field.related_model is None:
+        return None
+
+    return field, field.related_model
+
+
+def _walk(serializer, model, prefix, many, select, prefetch):
+    """Collect the relation paths read by a serializer's field tree"""
+    for field in serializer.fields.values():
+        if field.write_only or field.source == '*':
+            if isinstance(field, serializers.BaseSerializer):
+                _walk(field, model, prefix, many, select, prefetch)
+            continue
+
+        current, path, is_many = model, prefix, many
+        for attr in field.source.split('.'):
+            related = _related_model(current, attr)
+            if related is None:
+                current = None
+                break
+            relation, current = related
+            path = f'{path}__{attr}' if path else attr
+            is_many = is_many or relation.one_to_many or relation.many_to_many
+
+            # A bare primary key comes straight from the local column
+            if isinstance(field, PrimaryKeyRelatedField) and \
+                    not (relation.one_to_many or relation.many_to_many):
+                break
+            (prefetch if is_many else select).add(path)
+
+        if current is None:
+            continue
+        if isinstance(field, serializers.ListSerializer):
+            field = field.child
+        elif isinstance(field, ManyRelatedField):
+            continue
+        if isinstance(field, serializers.BaseSerializer):
+            _walk(field, current, path, is_many, select, prefetch)
+
+
+def get_related_paths(serializer):
+    """Return the select_related and prefetch_related paths a serializer uses
+
+    The field tree is walked from the serializer's model: forward foreign
+    keys and one-to-one fields are joined, reverse and many-to-many
+    relations and anything below them are prefetched.
+    """
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    select, prefetch = set(), set()
+    _walk(serializer, serializer.Meta.model, '', False, select, prefetch)
+
+    # Drop paths already implied by a longer one
+    select = {
+        path for path in select
+        if not any(other.startswith(path + '__') for other in select)
+    }
+    prefetch = {
+        path for path in prefetch
+        if not any(other.startswith(path + '__') for other in prefetch)
+    }
+
+    return sorted(select), sorted(prefetch)
+
+
+def get_columns(serializer, model=None, prefix=''):
+    """Return the column paths a serializer reads, or None if unknown
+
+    Plain fields read their own column and nested serializers on forward
+    relations the columns of the joined row. Fields computed from the
+    whole object, such as method fields, could read any column, so their
+    serializer gets None and its rows are loaded in full.
+    """
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    model = model or serializer.Meta.model
+    columns = {f'{prefix}{model._meta.pk.name}'}
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if field.source == '*' or '.' in field.source:
+            return None
+        try:
+            model_field = model._meta.get_field(field.source)
+        except FieldDoesNotExist:
+            return None
+        if model_field.many_to_many or model_field.one_to_many:
+            continue
+        if not model_field.concrete:
+            return None
+        columns.add(f'{prefix}{model_field.name}')
+        if isinstance(field, serializers.BaseSerializer):
+            nested = get_columns(
+                field, model_field.related_model,
+                f'{prefix}{model_field.name}__'
+            )
+            if nested is None:
+                return None
+            columns |= nested
+
+    return columns
+
+
+def plan_queryset(queryset, serializer):
+    """Return the queryset with the joins and prefetches serializer needs"""
+    select, prefetch = get_related_paths(serializer)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+
+    return queryset
+
+
+class RelatedQuerysetMixin:
+    """Load the related rows an action's serializer reads up front
+
+    Viewsets declare what they need through their serializers, so list and
+    retrieve run a fixed number of queries however many rows are related.
+    """
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        serializer = self.get_serializer_class()(
+            context=self.get_serializer_context()
+        )
+        queryset = plan_queryset(queryset, serializer)
+        if self.action not in ('list', 'retrieve'):
+            return queryset
+
+        # Reads load only the columns rendered, narrowed by ?fields=
+        columns = get_columns(serializer)
+        if columns is None:
+            return queryset
+        # Keyset pagination reads the ordering columns off each row
+        for name in queryset.query.order_by or getattr(self, 'ordering', ()):
+            if not isinstance(name, str):
+                continue
+            name = name.lstrip('-')
+            try:
+                columns.add(queryset.model._meta.get_field(name).name)
+            except FieldDoesNotExist:
+                pass
+
+        return queryset.only(*columns)
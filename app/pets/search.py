@@ -0,0 +1,376 @@
+import bisect
+import itertools
+import math
+import re
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import CharField, FloatField, Func, Lookup, Q, Value
+from django.db.models.functions import Greatest
+from django.db.models.signals import post_delete, post_save
+from django.utils.module_loading import import_string
+from django.utils.translation import ugettext_lazy as _
+
+from rest_framework import serializers
+from rest_framework.decorators import action
+
+from pets.bulk import bulk_saved
+from pets.cache import generation_bumped, get_generation
+from pets.pagination import RankedPagination
+
+
+@CharField.register_lookup
+class TrigramWordSimilar(Lookup):
+    """pg_trgm's term <% column, served by a gin_trgm_ops index"""
+    lookup_name = 'trigram_word_similar'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{rhs} <%% {lhs}', rhs_params + lhs_params
+
+
+class WordSimilarity(Func):
+    """pg_trgm's word_similarity(term, column)"""
+    function = 'WORD_SIMILARITY'
+    output_field = FloatField()
+
+
+class TrigramSearchBackend:
+    """Rank matches with pg_trgm word similarity on PostgreSQL
+
+    The <% operator finds rows holding a word close to the term or starting
+    with it, through the trigram indexes on each searched column.
+    """
+
+    def search(self, model, user, fields, term):
+        """Return the user's objects matching term, best first"""
+        condition = Q()
+        for field in fields:
+            condition |= Q(**{f'{field}__trigram_word_similar': term})
+        ranks = [WordSimilarity(Value(term), field) for field in fields]
+        rank = Greatest(*ranks) if len(ranks) > 1 else ranks[0]
+
+        return model.objects.filter(condition, user=user).annotate(
+            rank=rank
+        ).order_by('-rank', 'id')
+
+
+def tokenize(value):
+    """Return the lower case words of value and, if several, them joined"""
+    words = re.findall(r'\w+', (value or '').lower())
+    if len(words) > 1:
+        words.append(''.join(words))
+    return words
+
+
+def trigrams(token):
+    """Return the padded trigrams of a token as pg_trgm builds them"""
+    padded = f'  {token} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class PrefixIndex:
+    """In-process inverted index over some text columns of one user's rows
+
+    Words map to the ids holding them; a sorted word list answers prefix
+    queries by bisection and a trigram map answers fuzzy ones. Rows are
+    loaded in bulk by build, or added and removed one at a time.
+    """
+    similarity = 0.4
+
+    def __init__(self, fields):
+        self.fields = tuple(fields)
+        self.lock = threading.Lock()
+        self.docs = {}
+        self.postings = {}
+        self.words = []
+        self.grams = {}
+
+    def _add_word(self, word, pk):
+        ids = self.postings.get(word)
+        if ids is None:
+            ids = self.postings[word] = set()
+            bisect.insort(self.words, word)
+            for gram in trigrams(word):
+                self.grams.setdefault(gram, set()).add(word)
+        ids.add(pk)
+
+    def _remove_word(self, word, pk):
+        ids = self.postings[word]
+        ids.discard(pk)
+        if not ids:
+            del self.postings[word]
+            del self.words[bisect.bisect_left(self.words, word)]
+            for gram in trigrams(word):
+                self.grams[gram].discard(word)
+
+    def add(self, pk, values):
+        """Index or re-index the row pk from its searched column values"""
+        words = set()
+        for value in values:
+            words.update(tokenize(value))
+        with self.lock:
+            for word in self.docs.pop(pk, ()):
+                self._remove_word(word, pk)
+            for word in words:
+                self._add_word(word, pk)
+            self.docs[pk] = words
+
+    def build(self, rows):
+        """Load (pk, *values) rows into an empty index in one pass"""
+        with self.lock:
+            for pk, *values in rows:
+                words = set()
+                for value in values:
+                    words.update(tokenize(value))
+                for word in words:
+                    self.postings.setdefault(word, set()).add(pk)
+                self.docs[pk] = words
+            self.words = sorted(self.postings)
+            for word in self.words:
+                for gram in trigrams(word):
+                    self.grams.setdefault(gram, set()).add(word)
+
+    def remove(self, pk):
+        """Drop the row pk from the index"""
+        with self.lock:
+            for word in self.docs.pop(pk, ()):
+                self._remove_word(word, pk)
+
+    def _scores(self, query):
+        """Return {pk: score} for the ids holding a word like query"""
+        scores = {}
+        start = bisect.bisect_left(self.words, query)
+        end = bisect.bisect_left(self.words, query + '\U0010ffff', start)
+        for word in itertools.islice(self.words, start, end):
+            score = 1.0 if word == query else 0.9
+            for pk in self.postings[word]:
+                if scores.get(pk, 0) < score:
+                    scores[pk] = score
+
+        if len(query) < 3:
+            return scores
+
+        # A word this similar must hold one of the rarest query trigrams
+        grams = sorted(
+            (self.grams.get(gram, set()) for gram in trigrams(query)),
+            key=len
+        )
+        size = len(grams)
+        rare = grams[:size - math.ceil(self.similarity * size) + 1]
+        for word in set().union(*rare):
+            count = sum(word in words for words in grams)
+            # A padded word has about one trigram per character plus one
+            score = count / (size + len(word) + 1 - count)
+            if score < self.similarity:
+                continue
+            for pk in self.postings[word]:
+                if scores.get(pk, 0) < score:
+                    scores[pk] = score
+
+        return scores
+
+    def search(self, term):
+        """Return the ids matching every word of term, best first"""
+        queries = re.findall(r'\w+', term.lower())
+        if not queries:
+            return []
+
+        with self.lock:
+            totals = None
+            for query in queries:
+                scores = self._scores(query)
+                if totals is None:
+                    totals = scores
+                else:
+                    totals = {
+                        pk: total + scores[pk]
+                        for pk, total in totals.items() if pk in scores
+                    }
+
+        return sorted(totals, key=lambda pk: (-totals[pk], pk))
+
+
+class RankedResults:
+    """Lazy sequence of objects for a ranked list of ids"""
+
+    def __init__(self, model, ids):
+        self.model = model
+        self.ids = ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, page):
+        ids = self.ids[page]
+        found = self.model.objects.in_bulk(ids)
+        return [found[pk] for pk in ids if pk in found]
+
+
+class InMemorySearchBackend:
+    """Search per-user prefix indexes held in this process
+
+    An index is built from the database on the first search for a user and
+    model and tagged with the user's cache generation. Saves, deletes and
+    bulk saves made in this process are applied to it as they commit, and
+    the bumps they cause carry the tag along. A bump it did not see, from a
+    write in another process, leaves the tag behind, so the next search
+    rebuilds the index. The least recently used indexes are dropped once
+    PETS_SEARCH_INDEXES are held. It suits databases without pg_trgm.
+    """
+
+    def __init__(self):
+        self.indexes = OrderedDict()
+        self.fields = {}
+        self.lock = threading.Lock()
+        post_save.connect(self.object_saved, weak=False)
+        post_delete.connect(self.object_deleted, weak=False)
+        bulk_saved.connect(self.objects_saved, weak=False)
+        generation_bumped.connect(self.generation_moved, weak=False)
+
+    def get_index(self, model, user, fields):
+        """Return the index for a user's rows, rebuilding it if stale"""
+        key = (model._meta.label, user.pk)
+        fields = tuple(fields)
+        generation = get_generation(user)
+        with self.lock:
+            cached = self.indexes.get(key)
+            if cached is not None and cached[0] == generation \
+                    and cached[1].fields == fields:
+                self.indexes.move_to_end(key)
+                return cached[1]
+            self.fields[key[0]] = fields
+
+        index = PrefixIndex(fields)
+        index.build(model.objects.filter(user=user).values_list(
+            'pk', *fields
+        ).iterator())
+        size = getattr(settings, 'PETS_SEARCH_INDEXES', 1000)
+        with self.lock:
+            self.indexes[key] = (generation, index)
+            self.indexes.move_to_end(key)
+            while len(self.indexes) > size:
+                self.indexes.popitem(last=False)
+
+        return index
+
+    def generation_moved(self, sender, user, generation, **kwargs):
+        """Carry the user's indexes over a bump made in this process
+
+        Only the next generation is taken, one after another process's
+        bump leaves the index stale. Writes here that change searched
+        columns must send post_save or bulk_saved for this to hold.
+        """
+        with self.lock:
+            for label in self.fields:
+                cached = self.indexes.get((label, user.pk))
+                if cached is not None and cached[0] == generation - 1:
+                    self.indexes[(label, user.pk)] = (generation, cached[1])
+
+    def _apply(self, label, fields, rows):
+        for user_id, pk, values in rows:
+            with self.lock:
+                cached = self.indexes.get((label, user_id))
+                if cached is not None and cached[1].fields != fields:
+                    # Indexed again with other columns, so rebuild it
+                    del self.indexes[(label, user_id)]
+                    continue
+            if cached is None:
+                continue
+            if values is None:
+                cached[1].remove(pk)
+            else:
+                cached[1].add(pk, values)
+
+    def objects_saved(self, sender, instances, **kwargs):
+        """Re-index saved rows once their transaction commits"""
+        label = sender._meta.label
+        fields = self.fields.get(label)
+        if fields is None:
+            return
+        rows = [
+            (
+                getattr(instance, 'user_id', None), instance.pk,
+                [getattr(instance, field) for field in fields]
+            )
+            for instance in instances
+        ]
+        transaction.on_commit(lambda: self._apply(label, fields, rows))
+
+    def object_saved(self, sender, instance, **kwargs):
+        self.objects_saved(sender, [instance])
+
+    def object_deleted(self, sender, instance, **kwargs):
+        """Drop a deleted row once its transaction commits"""
+        label = sender._meta.label
+        fields = self.fields.get(label)
+        if fields is None:
+            return
+        rows = [(getattr(instance, 'user_id', None), instance.pk, None)]
+        transaction.on_commit(lambda: self._apply(label, fields, rows))
+
+    def search(self, model, user, fields, term):
+        """Return the user's objects matching term, best first"""
+        index = self.get_index(model, user, fields)
+        return RankedResults(model, index.search(term))
+
+
+_backends = {}
+_default_backend = None
+
+
+def has_trigram_extension():
+    """Return whether the database has pg_trgm installed"""
+    if connection.vendor != 'postgresql':
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+def get_search_backend():
+    """Return the configured search backend, shared by the process
+
+    PETS_SEARCH_BACKEND names a backend class; by default PostgreSQL with
+    pg_trgm uses trigram indexes and anything else the in-process index.
+    """
+    global _default_backend
+    path = getattr(settings, 'PETS_SEARCH_BACKEND', None)
+    if not path:
+        if _default_backend is None:
+            _default_backend = 'pets.search.TrigramSearchBackend' \
+                if has_trigram_extension() \
+                else 'pets.search.InMemorySearchBackend'
+        path = _default_backend
+    if path not in _backends:
+        _backends[path] = import_string(path)()
+
+    return _backends[path]
+
+
+class SearchMixin:
+    """Add a ranked, paginated ?q= search over the viewset's search_fields"""
+    search_fields = ()
+    search_pagination_class = RankedPagination
+
+    @action(methods=['GET'], detail=False, url_path='search')
+    def search(self, request):
+        """Search the user's objects by prefix or close spelling"""
+        term = request.query_params.get('q', '').strip()
+        if not term:
+            raise serializers.ValidationError(
+                {'q': [_('Enter a search term')]}
+            )
+
+        results = get_search_backend().search(
+            self.queryset.model, request.user, self.search_fields, term
+        )
+        paginator = self.search_pagination_class()
+        page = paginator.paginate_queryset(results, request, view=self)
+
+        return paginator.get_paginated_response(
+            self.get_serializer(page, many=True).data
+        )
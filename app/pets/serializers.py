@@ -10,19 +10,68 @@ from core.models import Order
 from core.models import User
 from core.models import UserManager
 
+from pets.bulk import BulkListSerializer
+from pets.fieldsets import SparseFieldsMixin
+from pets.images import get_variant_urls
 
 
-class PetSerializer(serializers.ModelSerializer):
+
+class ValidatedColumnsMixin:
+    """Write only the validated columns back on update
+
+    Saving the whole instance would also write back every other column
+    as it was read, undoing a concurrent change to any of them.
+    """
+
+    def update(self, instance, validated_data):
+        for name, value in validated_data.items():
+            setattr(instance, name, value)
+        instance.save(update_fields=list(validated_data))
+
+        return instance
+
+
+class UserSerializer(serializers.ModelSerializer):
+    """Serializer for user objects"""
+
+    class Meta:
+        model = User
+        fields = ('id', 'name', 'email')
+        read_only_fields = ('id',)
+
+
+class PetSerializer(SparseFieldsMixin, ValidatedColumnsMixin,
+                    serializers.ModelSerializer):
     """Serializer for tag objects"""
+    expandable_fields = {'user': UserSerializer}
 
     class Meta:
         model = PetManager
-        fields = ('id', 'name', 'in_store_status', 'category', 'price')
-        read_only_fields = ('id',)
+        fields = (
+            'id', 'name', 'in_store_status', 'category', 'price', 'version'
+        )
+        read_only_fields = ('id', 'version')
+        list_serializer_class = BulkListSerializer
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.instance is not None and 'in_store_status' in fields:
+            # Status moves on update through pets.transitions.save_versioned
+            fields['in_store_status'].read_only = True
+
+        return fields
 
 class PetDetailSerializer(PetSerializer):
     """Serialize a Pet Detail"""
-    pet = PetSerializer(many=True, read_only=True)
+    user = UserSerializer(read_only=True)
+    variants = serializers.SerializerMethodField()
+
+    class Meta(PetSerializer.Meta):
+        fields = PetSerializer.Meta.fields + ('user', 'variants')
+
+    def get_variants(self, obj):
+        """Return the URLs of the image variants generated so far"""
+        return get_variant_urls(obj, self.context.get('request'))
 
 class StoreStatusSerializer(serializers.ModelSerializer):
     """Serializer for ingredient objects"""
@@ -57,46 +106,65 @@ class PriceSerializer(serializers.ModelSerializer):
         fields = ('id', 'price')
         read_only_fields = ('id',)
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for ingredient objects"""
+    expandable_fields = {'user': UserSerializer}
 
     class Meta:
         model = Order
-        fields = ('id', 'order', 'customer_name'
+        fields = ('id', 'customer_name',
                 'customer_phone', 'customer_animal_choice',
                 'customer_budget', 'customer_allocated_preference')
-        read_only_fields = ('id', 'order')
+        read_only_fields = ('id',)
+        list_serializer_class = BulkListSerializer
 
 class OrderDetailSerializer(OrderSerializer):
     """Serialize an Order Detail"""
-    order = OrderSerializer(many=True, read_only=True)
+    user = UserSerializer(read_only=True)
+
+    class Meta(OrderSerializer.Meta):
+        fields = OrderSerializer.Meta.fields + ('user',)
 
-class CustomerSerializer(serializers.ModelSerializer):
+class CustomerSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for customer objects"""
+    expandable_fields = {'user': UserSerializer}
 
     class Meta:
         model = Customer
-        fields = ('id', 'customer', 'user', 
+        fields = ('id', 'user',
                 'name', 'email', 'customer_phone',
                  'customer_address')
-        read_only_fields = ('id', 'customer', 'user')
+        read_only_fields = ('id', 'user')
+        list_serializer_class = BulkListSerializer
 
-class CustomerDetailSerializer(OrderSerializer):
+class CustomerDetailSerializer(CustomerSerializer):
     """Serialize a Customer in Detail"""
-    customer = CustomerSerializer(many=True, read_only=True)
+    user = UserSerializer(read_only=True)
 
-class UserSerializer(serializers.ModelSerializer):
-    """Serializer for user objects"""
+class PetCandidateSerializer(serializers.Serializer):
+    """Serializer for a pet offered as a match for an order"""
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    category = serializers.CharField()
+    price = serializers.DecimalField(max_digits=8, decimal_places=2)
 
-    class Meta:
-        model = User
-        fields = ('id', 'name', 'email')
-        read_only_fields = ('id')
 
-class PetImageSerializer(serializers.ModelSerializer):
+class OrderMatchSerializer(serializers.Serializer):
+    """Serializer for the pet assigned to an order by batch matching"""
+    order = serializers.IntegerField(source='order.id')
+    pet = PetCandidateSerializer(allow_null=True)
+
+
+class PetImageSerializer(ValidatedColumnsMixin,
+                         serializers.ModelSerializer):
     """Serializer for uploading images to pets"""
+    variants = serializers.SerializerMethodField()
 
     class Meta:
         model = PetManager
-        fields = ('id', 'image')
-        read_only_fields = ('id',)      
\ No newline at end of file
+        fields = ('id', 'image', 'variants')
+        read_only_fields = ('id',)
+
+    def get_variants(self, obj):
+        """Return the URLs of the image variants generated so far"""
+        return get_variant_urls(obj, self.context.get('request'))      
\ No newline at end of file
@@ -0,0 +1,47 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from core.models import Customer, Order, PetManager
+
+from pets.bulk import bulk_saved
+from pets.cache import invalidate_user_cache
+
+# Models whose API responses are cached and tagged per owner
+CACHED_MODELS = (PetManager, Order, Customer)
+
+
+def invalidate_owners(user_ids):
+    """Bump the cache generation of each owner now and again on commit
+
+    The bump on commit retires anything a concurrent read cached from the
+    rows as they were before the transaction committed.
+    """
+    users = [
+        get_user_model()(pk=pk) for pk in set(user_ids) if pk is not None
+    ]
+
+    def invalidate():
+        for user in users:
+            invalidate_user_cache(user)
+
+    invalidate()
+    transaction.on_commit(invalidate)
+
+
+def object_changed(sender, instance, **kwargs):
+    """Retire the owner's cached responses after a save or delete"""
+    invalidate_owners([instance.user_id])
+
+
+def objects_saved(sender, instances, **kwargs):
+    """Retire the owners' cached responses after a bulk save"""
+    invalidate_owners([instance.user_id for instance in instances])
+
+
+# Writes from the admin, commands and plain ORM code must retire cached
+# responses and ETags too, not only those made through the viewsets
+for model in CACHED_MODELS:
+    post_save.connect(object_changed, sender=model)
+    post_delete.connect(object_changed, sender=model)
+    bulk_saved.connect(objects_saved, sender=model)
@@ -0,0 +1,94 @@
+from collections import Counter
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F
+
+from core.models import Category, InventorySummary, PetManager, StoreStatus
+
+
+def summary_keys(pets):
+    """Return the (category, in_store_status) key of each pet"""
+    if isinstance(pets, PetManager):
+        pets = [pets]
+    return [(pet.category, pet.in_store_status) for pet in pets]
+
+
+def adjust_summary(user, added=(), removed=()):
+    """Apply the count changes for added and removed summary keys
+
+    Rows are changed with F() deltas in key order inside the caller's
+    transaction, so concurrent writers never lose an update or deadlock.
+    """
+    deltas = Counter(added)
+    deltas.subtract(removed)
+    for (category, in_store_status), delta in sorted(deltas.items()):
+        if not delta:
+            continue
+        rows = InventorySummary.objects.filter(
+            user=user, category=category, in_store_status=in_store_status
+        )
+        if rows.update(count=F('count') + delta):
+            continue
+        try:
+            with transaction.atomic():
+                InventorySummary.objects.create(
+                    user=user,
+                    category=category,
+                    in_store_status=in_store_status,
+                    count=delta
+                )
+        except IntegrityError:
+            # Another writer created the row first
+            rows.update(count=F('count') + delta)
+
+
+def get_summary(user):
+    """Return the user's counts for every category and store status"""
+    summary = {
+        category: {status: 0 for status, _ in StoreStatus.STATUS_CHOICES}
+        for category, _ in Category.CATEGORY_CHOICES
+    }
+    rows = InventorySummary.objects.filter(user=user).values_list(
+        'category', 'in_store_status', 'count'
+    )
+    for category, in_store_status, count in rows:
+        summary.setdefault(category, {})[in_store_status] = count
+
+    return summary
+
+
+def reconcile_summary(user):
+    """Rebuild the user's summary from their pets, return rows corrected"""
+    with transaction.atomic():
+        current = {
+            (row.category, row.in_store_status): row
+            for row in InventorySummary.objects.select_for_update().filter(
+                user=user
+            )
+        }
+        actual = {
+            (row['category'], row['in_store_status']): row['total']
+            for row in PetManager.objects.filter(user=user).values(
+                'category', 'in_store_status'
+            ).annotate(total=Count('id')).order_by()
+        }
+
+        corrected = 0
+        for key in sorted(set(current) | set(actual)):
+            count = actual.get(key, 0)
+            row = current.get(key)
+            if row is None:
+                if count:
+                    InventorySummary.objects.create(
+                        user=user,
+                        category=key[0],
+                        in_store_status=key[1],
+                        count=count
+                    )
+                    corrected += 1
+            elif row.count != count:
+                row.count = count
+                row.save(update_fields=['count'])
+                corrected += 1
+
+    return corrected
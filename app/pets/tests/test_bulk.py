@@ -0,0 +1,155 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.urls import reverse
+from django.test import TestCase, override_settings
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import PetManager, Order
+
+from pets.cache import get_cache
+
+PETS_URL = reverse('pets:pet-list')
+PETS_BULK_URL = reverse('pets:pet-bulk-update')
+ORDER_URL = reverse('pets:order-list')
+
+
+def pet_payload(i):
+    """Return a valid pet payload"""
+    return {
+        'name': f'Pet {i}',
+        'in_store_status': 'Instore',
+        'category': 'Dog',
+        'price': f'{i}.50',
+    }
+
+
+class BulkApiTests(TestCase):
+    """Test creating and updating batches of objects"""
+
+    def setUp(self):
+        get_cache().clear()
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com',
+            'testpass'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_bulk_create_pets(self):
+        """Test a list payload creates every pet in a fixed query count"""
+        payload = [pet_payload(i) for i in range(50)]
+
+        # One insert for the pets, the rest upserts their summary row
+        with self.assertNumQueries(9):
+            res = self.client.post(PETS_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(res.data), 50)
+        self.assertTrue(all(item['id'] for item in res.data))
+        self.assertEqual(
+            PetManager.objects.filter(user=self.user).count(), 50
+        )
+
+    def test_bulk_create_without_returned_ids(self):
+        """Test new ids are returned where inserts cannot report them"""
+        with patch.object(
+                connection.features, 'can_return_ids_from_bulk_insert',
+                False):
+            res = self.client.post(
+                PETS_URL, [pet_payload(i) for i in range(3)], format='json'
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(
+            sorted(item['id'] for item in res.data),
+            sorted(PetManager.objects.values_list('id', flat=True))
+        )
+
+    def test_bulk_create_reports_item_errors(self):
+        """Test an invalid item rejects the batch with per item errors"""
+        payload = [pet_payload(0), dict(pet_payload(1), category='Dragon')]
+
+        res = self.client.post(PETS_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0], {})
+        self.assertIn('category', res.data[1])
+        self.assertFalse(PetManager.objects.exists())
+
+    @override_settings(PETS_BULK_MAX_ITEMS=2)
+    def test_bulk_create_limit(self):
+        """Test batches over the configured size are refused"""
+        payload = [pet_payload(i) for i in range(3)]
+
+        res = self.client.post(PETS_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_create_orders(self):
+        """Test orders can be created in a batch"""
+        payload = [{
+            'customer_name': f'Customer {i}',
+            'customer_phone': '0400123123',
+            'customer_animal_choice': 'Cat',
+            'customer_budget': '200.00',
+            'customer_allocated_preference': 'Any',
+        } for i in range(5)]
+
+        res = self.client.post(ORDER_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Order.objects.filter(user=self.user).count(), 5)
+
+    def test_bulk_update_pets(self):
+        """Test a batch of partial updates is written in one statement"""
+        pets = [
+            PetManager.objects.create(user=self.user, **pet_payload(i))
+            for i in range(3)
+        ]
+        payload = [
+            {'id': pets[0].id, 'in_store_status': 'Onhold'},
+            {'id': pets[2].id, 'price': '9.99', 'name': 'Fizz'},
+        ]
+
+        res = self.client.patch(PETS_BULK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        for pet in pets:
+            pet.refresh_from_db()
+        self.assertEqual(pets[0].in_store_status, 'Onhold')
+        self.assertEqual(pets[1].name, 'Pet 1')
+        self.assertEqual(str(pets[2].price), '9.99')
+        self.assertEqual(pets[2].name, 'Fizz')
+
+    def test_bulk_update_rejects_boolean_ids(self):
+        """Test true and false are not read as ids 1 and 0"""
+        pet = PetManager.objects.create(user=self.user, **pet_payload(1))
+
+        res = self.client.patch(PETS_BULK_URL, [
+            {'id': pet.id, 'name': 'Fizz'}, {'id': True, 'name': 'Buzz'}
+        ], format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res.data[0], {})
+        self.assertIn('id', res.data[1])
+
+    def test_bulk_update_other_users_pets(self):
+        """Test ids belonging to another user are not found"""
+        user2 = get_user_model().objects.create_user(
+            'other@testing.com',
+            'testpass'
+        )
+        pet = PetManager.objects.create(user=user2, **pet_payload(1))
+
+        res = self.client.patch(
+            PETS_BULK_URL, [{'id': pet.id, 'name': 'Mine'}], format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('id', res.data[0])
+        pet.refresh_from_db()
+        self.assertEqual(pet.name, 'Pet 1')
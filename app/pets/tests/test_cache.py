@@ -0,0 +1,121 @@
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.test import TestCase
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import PetManager
+
+from pets.cache import get_cache, get_generation, invalidate_user_cache
+
+PETS_URL = reverse('pets:pet-list')
+
+
+def detail_url(pet_id):
+    """Return pet detail URL"""
+    return reverse('pets:pet-detail', args=[pet_id])
+
+
+def sample_pet(user, name='Bazzle'):
+    """Create and return a sample pet"""
+    return PetManager.objects.create(
+        user=user,
+        name=name,
+        in_store_status='Instore',
+        category='Cat',
+        price='120.90'
+    )
+
+
+class ResponseCacheTests(TestCase):
+    """Test the per-user versioned response cache"""
+
+    def setUp(self):
+        get_cache().clear()
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com',
+            'testpass'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_list_served_from_cache(self):
+        """Test a repeated list request runs no queries"""
+        sample_pet(self.user)
+        first = self.client.get(PETS_URL)
+
+        with self.assertNumQueries(0):
+            second = self.client.get(PETS_URL)
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data, first.data)
+
+    def test_orm_write_invalidates(self):
+        """Test a write outside the API is not hidden by a cached list"""
+        pet = sample_pet(self.user)
+        self.client.get(PETS_URL)
+
+        pet.delete()
+        sample_pet(self.user, name='Fizz')
+        res = self.client.get(PETS_URL)
+
+        self.assertEqual(
+            [item['name'] for item in res.data['results']], ['Fizz']
+        )
+
+    def test_query_params_normalized(self):
+        """Test param order does not change the cache key"""
+        self.client.get(PETS_URL, {'category': 'Cat', 'ordering': 'price'})
+
+        with self.assertNumQueries(0):
+            self.client.get(PETS_URL + '?ordering=price&category=Cat')
+
+    def test_create_invalidates(self):
+        """Test creating a pet through the API refreshes the list"""
+        self.client.get(PETS_URL)
+        payload = {
+            'name': 'Gemma',
+            'in_store_status': 'Instore',
+            'category': 'Dog',
+            'price': '400.20',
+        }
+        res = self.client.post(PETS_URL, payload)
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        res = self.client.get(PETS_URL)
+
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_update_and_delete_invalidate(self):
+        """Test updating and deleting a pet refresh cached responses"""
+        pet = sample_pet(self.user)
+        self.client.get(detail_url(pet.id))
+
+        self.client.patch(detail_url(pet.id), {'name': 'Fizz'})
+        res = self.client.get(detail_url(pet.id))
+        self.assertEqual(res.data['name'], 'Fizz')
+
+        self.client.get(PETS_URL)
+        self.client.delete(detail_url(pet.id))
+        res = self.client.get(PETS_URL)
+        self.assertEqual(res.data['results'], [])
+
+    def test_users_cached_separately(self):
+        """Test one user's writes leave other users' entries intact"""
+        user2 = get_user_model().objects.create_user(
+            'other@testing.com',
+            'testpass'
+        )
+        generation = get_generation(user2)
+
+        invalidate_user_cache(self.user)
+
+        self.assertEqual(get_generation(user2), generation)
+
+    def test_evicted_generation_does_not_reuse_keys(self):
+        """Test a lost counter restarts past previously used values"""
+        generation = get_generation(self.user)
+        get_cache().delete(f'pets:generation:{self.user.pk}')
+
+        self.assertNotEqual(get_generation(self.user), generation)
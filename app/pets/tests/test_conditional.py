@@ -0,0 +1,154 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.test import TestCase
+from django.utils.http import http_date
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Order, PetManager
+
+from pets.cache import get_cache, invalidate_user_cache
+
+PETS_URL = reverse('pets:pet-list')
+
+
+def detail_url(pet_id):
+    """Return pet detail URL"""
+    return reverse('pets:pet-detail', args=[pet_id])
+
+
+def sample_pet(user, name='Bazzle'):
+    """Create and return a sample pet"""
+    return PetManager.objects.create(
+        user=user,
+        name=name,
+        in_store_status='Instore',
+        category='Cat',
+        price='120.90'
+    )
+
+
+class ConditionalRequestTests(TestCase):
+    """Test ETag and Last-Modified handling in the pets API"""
+
+    def setUp(self):
+        get_cache().clear()
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com',
+            'testpass'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.pet = sample_pet(self.user)
+
+    def test_list_sends_validators(self):
+        """Test list responses carry ETag and Last-Modified"""
+        res = self.client.get(PETS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res['ETag'].startswith('"'))
+        self.assertIn('Last-Modified', res)
+
+    def test_if_none_match_returns_not_modified(self):
+        """Test a current ETag short circuits before any query"""
+        etag = self.client.get(PETS_URL)['ETag']
+
+        with self.assertNumQueries(0):
+            res = self.client.get(PETS_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res['ETag'], etag)
+
+    def test_etag_varies_by_query(self):
+        """Test different query params get different tags"""
+        etag = self.client.get(PETS_URL)['ETag']
+
+        res = self.client.get(
+            PETS_URL, {'category': 'Cat'}, HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_write_changes_etag(self):
+        """Test a write through the API invalidates the old tag"""
+        etag = self.client.get(detail_url(self.pet.id))['ETag']
+        self.client.patch(detail_url(self.pet.id), {'name': 'Fizz'})
+
+        res = self.client.get(
+            detail_url(self.pet.id), HTTP_IF_NONE_MATCH=etag
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['name'], 'Fizz')
+
+    def test_orm_write_changes_etag(self):
+        """Test saves and deletes outside the API invalidate the old tag"""
+        etag = self.client.get(PETS_URL)['ETag']
+        pet = PetManager.objects.get(pk=self.pet.pk)
+        pet.name = 'Fizz'
+        pet.save()
+
+        res = self.client.get(PETS_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'][0]['name'], 'Fizz')
+
+        pet.delete()
+        res = self.client.get(PETS_URL, HTTP_IF_NONE_MATCH=res['ETag'])
+
+        self.assertEqual(res.data['results'], [])
+
+    def test_other_models_change_etag(self):
+        """Test order writes outside the API invalidate the old tag"""
+        orders_url = reverse('pets:order-list')
+        etag = self.client.get(orders_url)['ETag']
+        Order.objects.create(
+            user=self.user, customer_name='Jane',
+            customer_phone='07123456789', customer_animal_choice='Cat',
+            customer_budget='90.00', customer_allocated_preference='Bazzle'
+        )
+
+        res = self.client.get(orders_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_if_modified_since(self):
+        """Test If-Modified-Since is answered from the watermark"""
+        res = self.client.get(
+            PETS_URL, HTTP_IF_MODIFIED_SINCE=http_date(time.time() + 60)
+        )
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        last_modified = self.client.get(PETS_URL)['Last-Modified']
+        invalidate_user_cache(self.user)
+        res = self.client.get(PETS_URL, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_if_match_allows_current_update(self):
+        """Test an update with the current tag goes through"""
+        etag = self.client.get(detail_url(self.pet.id))['ETag']
+
+        res = self.client.patch(
+            detail_url(self.pet.id), {'name': 'Fizz'}, HTTP_IF_MATCH=etag
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_if_match_rejects_lost_update(self):
+        """Test an update based on a stale tag is refused"""
+        etag = self.client.get(detail_url(self.pet.id))['ETag']
+        self.client.patch(detail_url(self.pet.id), {'name': 'Fizz'})
+
+        res = self.client.patch(
+            detail_url(self.pet.id), {'name': 'Buzz'}, HTTP_IF_MATCH=etag
+        )
+
+        self.assertEqual(
+            res.status_code, status.HTTP_412_PRECONDITION_FAILED
+        )
+        self.pet.refresh_from_db()
+        self.assertEqual(self.pet.name, 'Fizz')
@@ -0,0 +1,120 @@
+import csv
+import gzip
+import io
+import json
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.test import TestCase
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import PetManager, Customer
+
+PETS_EXPORT_URL = reverse('pets:pet-export')
+CUSTOMER_EXPORT_URL = reverse('pets:customer-export')
+
+
+class ExportApiTests(TestCase):
+    """Test streaming exports of the user's objects"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com',
+            'testpass'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        for i in range(5):
+            PetManager.objects.create(
+                user=self.user,
+                name=f'Pet, "{i}"',
+                in_store_status='Instore',
+                category='Cat',
+                price=f'{i}.50'
+            )
+        other = get_user_model().objects.create_user(
+            'other@testing.com',
+            'testpass'
+        )
+        PetManager.objects.create(
+            user=other,
+            name='Not mine',
+            in_store_status='Instore',
+            category='Cat',
+            price='1.00'
+        )
+
+    def test_export_ndjson(self):
+        """Test pets stream as one JSON object per line"""
+        res = self.client.get(PETS_EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        self.assertEqual(res['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(res.streaming_content).decode().splitlines()
+        items = [json.loads(line) for line in lines]
+        self.assertEqual(len(items), 5)
+        self.assertEqual(items[0]['price'], '4.50')
+        self.assertNotIn('Not mine', [item['name'] for item in items])
+
+    def test_export_csv(self):
+        """Test pets stream as CSV with a header row"""
+        res = self.client.get(PETS_EXPORT_URL, {'output': 'csv'})
+
+        self.assertEqual(res['Content-Type'], 'text/csv')
+        content = b''.join(res.streaming_content).decode()
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(
+            rows[0],
+            ['id', 'name', 'in_store_status', 'category', 'price', 'version']
+        )
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[1][1], 'Pet, "4"')
+
+    def test_export_gzip(self):
+        """Test the export is compressed when the client accepts gzip"""
+        res = self.client.get(PETS_EXPORT_URL, HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(res['Content-Encoding'], 'gzip')
+        content = gzip.decompress(b''.join(res.streaming_content))
+        self.assertEqual(len(content.decode().splitlines()), 5)
+
+    def test_export_respects_filters(self):
+        """Test the pet list filters apply to the export"""
+        PetManager.objects.create(
+            user=self.user,
+            name='Rex',
+            in_store_status='Onhold',
+            category='Dog',
+            price='10.00'
+        )
+
+        res = self.client.get(PETS_EXPORT_URL, {'category': 'Dog'})
+
+        lines = b''.join(res.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)['name'] for line in lines], ['Rex'])
+
+    def test_export_customers(self):
+        """Test customers can be exported"""
+        Customer.objects.create(
+            user=self.user,
+            name='Mary Jones',
+            email='maryjones@petlovers.com',
+            customer_phone='0400123123',
+            customer_address='99 Pet Lovers Street, Brisbane 4000'
+        )
+
+        res = self.client.get(CUSTOMER_EXPORT_URL, {'output': 'csv'})
+
+        rows = list(csv.reader(io.StringIO(
+            b''.join(res.streaming_content).decode()
+        )))
+        self.assertEqual(rows[1][2], 'Mary Jones')
+
+    def test_export_invalid_output(self):
+        """Test unknown output formats are rejected"""
+        res = self.client.get(PETS_EXPORT_URL, {'output': 'xml'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
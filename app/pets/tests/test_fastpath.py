@@ -0,0 +1,90 @@
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.test import TestCase
+
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from core.models import PetManager, Order, Customer
+
+from pets.fastpath import get_fast_representation
+from pets.serializers import PetSerializer, PetDetailSerializer, \
+    OrderSerializer, CustomerSerializer
+
+PETS_URL = reverse('pets:pet-list')
+
+
+class FastRepresentationTests(TestCase):
+    """Test the values() serialization path matches the serializers"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com',
+            'testpass'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        for i, price in enumerate(['120.90', '0.05', '999999.99', '7']):
+            PetManager.objects.create(
+                user=self.user,
+                name=f'Pet é "{i}"',
+                in_store_status='Instore',
+                category='Fish',
+                price=price
+            )
+        Order.objects.create(
+            user=self.user,
+            customer_name='Jan Smith',
+            customer_phone='0400123123',
+            customer_animal_choice='Kitten',
+            customer_budget='200',
+            customer_allocated_preference='Harry the Kitten'
+        )
+        Customer.objects.create(
+            user=self.user,
+            name='Mary Jones',
+            email='maryjones@petlovers.com',
+            customer_phone='0400123123',
+            customer_address='99 Pet Lovers Street, Brisbane 4000'
+        )
+
+    def assertParity(self, serializer_class, queryset):
+        fast = get_fast_representation(serializer_class)
+        self.assertIsNotNone(fast)
+        renderer = JSONRenderer()
+
+        expected = renderer.render(serializer_class(queryset, many=True).data)
+        actual = renderer.render(
+            fast.serialize(queryset.values(*fast.columns))
+        )
+
+        self.assertEqual(actual, expected)
+
+    def test_pet_parity(self):
+        """Test pet output is byte identical to PetSerializer"""
+        self.assertParity(PetSerializer, PetManager.objects.order_by('id'))
+
+    def test_order_parity(self):
+        """Test order output is byte identical to OrderSerializer"""
+        self.assertParity(OrderSerializer, Order.objects.order_by('id'))
+
+    def test_customer_parity(self):
+        """Test customer output is byte identical to CustomerSerializer"""
+        self.assertParity(CustomerSerializer, Customer.objects.order_by('id'))
+
+    def test_nested_serializer_not_supported(self):
+        """Test serializers with nested fields use the regular path"""
+        self.assertIsNone(get_fast_representation(PetDetailSerializer))
+
+    def test_list_endpoint_parity(self):
+        """Test the list endpoint renders the serializer's output"""
+        res = self.client.get(PETS_URL, {'page_size': 3})
+        res = self.client.get(res.data['next'])
+
+        pets = PetManager.objects.order_by('-name', '-id')[3:]
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            JSONRenderer().render(res.data['results']),
+            JSONRenderer().render(PetSerializer(pets, many=True).data)
+        )
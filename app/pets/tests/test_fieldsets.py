@@ -0,0 +1,195 @@
+import csv
+import io
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Customer, Order, PetManager
+
+from pets.prefetch import get_columns
+from pets.serializers import OrderSerializer, PetDetailSerializer, \
+    PetSerializer
+
+PETS_URL = reverse('pets:pet-list')
+ORDERS_URL = reverse('pets:order-list')
+CUSTOMERS_URL = reverse('pets:customer-list')
+PETS_EXPORT_URL = reverse('pets:pet-export')
+
+
+def pet_url(pet_id):
+    """Return pet detail URL"""
+    return reverse('pets:pet-detail', args=[pet_id])
+
+
+def pet_queries(queries):
+    """Return the SQL of captured queries reading the pets table"""
+    table = PetManager._meta.db_table
+    return [
+        query['sql'] for query in queries.captured_queries
+        if f'FROM "{table}"' in query['sql']
+    ]
+
+
+class SparseFieldsetTests(TestCase):
+    """Test ?fields= and ?expand= on the pets API"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com', 'testpass', name='Owner'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.pet = PetManager.objects.create(
+            user=self.user, name='Bazzle', in_store_status='Instore',
+            category='Cat', price='120.90'
+        )
+
+    def test_list_fields(self):
+        """Test a list renders and selects only the requested fields"""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(PETS_URL, {'fields': 'id,name'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data['results'], [{'id': self.pet.id, 'name': 'Bazzle'}]
+        )
+        sql = pet_queries(queries)[0]
+        self.assertIn('"name"', sql)
+        self.assertNotIn('"price"', sql)
+
+    def test_list_default_unchanged(self):
+        """Test lists without the params render every field"""
+        self.client.get(PETS_URL, {'fields': 'id'})
+
+        res = self.client.get(PETS_URL)
+
+        self.assertEqual(
+            res.data['results'], PetSerializer([self.pet], many=True).data
+        )
+
+    def test_list_expand(self):
+        """Test an expanded relation is nested and joined in one query"""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(
+                PETS_URL, {'fields': 'id,name', 'expand': 'user'}
+            )
+
+        self.assertEqual(res.data['results'], [{
+            'id': self.pet.id, 'name': 'Bazzle', 'user': {
+                'id': self.user.id, 'name': 'Owner',
+                'email': 'test@testing.com'
+            }
+        }])
+        sql = pet_queries(queries)
+        self.assertEqual(len(sql), 1)
+        self.assertIn('JOIN', sql[0])
+        self.assertNotIn('"price"', sql[0])
+
+    def test_detail_fields_drop_nested(self):
+        """Test a detail without its nested fields skips their join"""
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(
+                pet_url(self.pet.id), {'fields': 'id,in_store_status'}
+            )
+
+        self.assertEqual(
+            res.data, {'id': self.pet.id, 'in_store_status': 'Instore'}
+        )
+        sql = pet_queries(queries)[0]
+        self.assertNotIn('JOIN', sql)
+        self.assertNotIn('"image"', sql)
+
+    def test_detail_default_unchanged(self):
+        """Test a detail without the params still embeds the user"""
+        res = self.client.get(pet_url(self.pet.id))
+
+        self.assertEqual(res.data['user']['email'], 'test@testing.com')
+        self.assertIn('variants', res.data)
+
+    def test_unknown_names(self):
+        """Test unknown fields and expansions are rejected"""
+        res = self.client.get(PETS_URL, {'fields': 'id,colour'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('colour', str(res.data['fields']))
+
+        res = self.client.get(PETS_URL, {'expand': 'owner'})
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_writes_ignore_fields(self):
+        """Test a create validates and returns every field"""
+        res = self.client.post(f'{PETS_URL}?fields=id', {
+            'name': 'Gemma', 'in_store_status': 'Instore',
+            'category': 'Dog', 'price': '400.20'
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['price'], '400.20')
+
+    def test_order_decimal_fields(self):
+        """Test narrowed orders keep decimals as strings"""
+        Order.objects.create(
+            user=self.user, customer_name='Jane',
+            customer_phone='07123456789', customer_animal_choice='Cat',
+            customer_budget='90.00', customer_allocated_preference='Bazzle'
+        )
+
+        res = self.client.get(
+            ORDERS_URL, {'fields': 'customer_name,customer_budget'}
+        )
+
+        self.assertEqual(res.data['results'], [
+            {'customer_name': 'Jane', 'customer_budget': '90.00'}
+        ])
+
+    def test_customer_expand_replaces_key(self):
+        """Test expanding a customer's user nests it in place of the id"""
+        Customer.objects.create(
+            user=self.user, name='Jane', email='jane@testing.com',
+            customer_phone='07123456789', customer_address='1 High Street'
+        )
+
+        res = self.client.get(CUSTOMERS_URL, {'expand': 'user'})
+
+        self.assertEqual(res.data['results'][0]['user']['name'], 'Owner')
+        self.assertEqual(res.data['results'][0]['name'], 'Jane')
+
+    def test_export_fields(self):
+        """Test exports honour the requested fields"""
+        res = self.client.get(
+            PETS_EXPORT_URL, {'output': 'csv', 'fields': 'name,price'}
+        )
+
+        content = b''.join(res.streaming_content).decode()
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(rows, [['name', 'price'], ['Bazzle', '120.90']])
+
+
+class ColumnPlannerTests(TestCase):
+    """Test the columns planned from a serializer's fields"""
+
+    def test_flat_columns(self):
+        """Test plain fields map to their own columns"""
+        self.assertEqual(get_columns(OrderSerializer()), {
+            'id', 'customer_name', 'customer_phone',
+            'customer_animal_choice', 'customer_budget',
+            'customer_allocated_preference'
+        })
+
+    def test_nested_columns(self):
+        """Test a nested serializer adds the joined row's columns"""
+        serializer = PetSerializer()
+        serializer.sparse(('name',), ('user',))
+
+        self.assertEqual(get_columns(serializer), {
+            'id', 'name', 'user', 'user__id', 'user__name', 'user__email'
+        })
+
+    def test_method_fields_load_everything(self):
+        """Test a method field leaves the row unrestricted"""
+        self.assertIsNone(get_columns(PetDetailSerializer()))
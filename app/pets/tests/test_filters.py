@@ -0,0 +1,173 @@
+import itertools
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.http import QueryDict
+from django.urls import reverse
+from django.test import TestCase
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import PetManager, Category, StoreStatus
+
+from pets.filters import PetFilter
+
+PETS_URL = reverse('pets:pet-list')
+
+
+def sample_pet(user, name, **params):
+    """Create and return a sample pet"""
+    defaults = {
+        'in_store_status': 'Instore',
+        'category': 'Dog',
+        'price': '100.00',
+    }
+    defaults.update(params)
+
+    return PetManager.objects.create(user=user, name=name, **defaults)
+
+
+class PetFilterApiTests(TestCase):
+    """Test filtering and ordering the pets list"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com',
+            'testpass'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        sample_pet(self.user, 'Bazzle', category='Cat', price='120.90')
+        sample_pet(self.user, 'Gemma', category='Dog', price='400.20')
+        sample_pet(
+            self.user, 'Izzy', category='Bird', price='35.00',
+            in_store_status='Onhold'
+        )
+        sample_pet(
+            self.user, 'Drummond', category='Dog', price='250.00',
+            in_store_status='SoldPendingPickup'
+        )
+
+    def names(self, params):
+        res = self.client.get(PETS_URL, params)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [pet['name'] for pet in res.data['results']]
+
+    def test_filter_by_categories(self):
+        """Test returning pets in any of the given categories"""
+        names = self.names({'category': 'Cat,Bird'})
+
+        self.assertEqual(names, ['Izzy', 'Bazzle'])
+
+    def test_filter_by_in_store_status(self):
+        """Test returning pets with any of the given store statuses"""
+        names = self.names({'in_store_status': 'Onhold,SoldPendingPickup'})
+
+        self.assertEqual(names, ['Izzy', 'Drummond'])
+
+    def test_filter_by_price_range(self):
+        """Test returning pets within a price range"""
+        names = self.names({'price_min': '100', 'price_max': '260'})
+
+        self.assertEqual(names, ['Drummond', 'Bazzle'])
+
+    def test_filters_combine(self):
+        """Test filters narrow the list together"""
+        names = self.names({
+            'category': 'Dog',
+            'in_store_status': 'Instore',
+            'price_max': '500',
+        })
+
+        self.assertEqual(names, ['Gemma'])
+
+    def test_ordering(self):
+        """Test ordering by a whitelisted field"""
+        names = self.names({'ordering': '-price'})
+
+        self.assertEqual(names, ['Gemma', 'Drummond', 'Bazzle', 'Izzy'])
+
+    def test_ordering_paginates(self):
+        """Test cursors follow the requested ordering"""
+        res = self.client.get(PETS_URL, {'ordering': 'price', 'page_size': 3})
+        res = self.client.get(res.data['next'])
+
+        names = [pet['name'] for pet in res.data['results']]
+        self.assertEqual(names, ['Gemma'])
+
+    def test_invalid_params_rejected(self):
+        """Test unknown choices, prices and orderings are rejected"""
+        for params in [
+            {'category': 'Dragon'},
+            {'in_store_status': 'Lost'},
+            {'price_min': 'cheap'},
+            {'ordering': 'user'},
+        ]:
+            res = self.client.get(PETS_URL, params)
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Requires PostgreSQL')
+class PetFilterPlanTests(TestCase):
+    """Test every filter combination is served by an index range scan"""
+
+    params = {
+        'category': 'Cat,Dog',
+        'in_store_status': 'Onhold',
+        'price_min': '980',
+        'price_max': '20',
+        'ordering': '-price',
+    }
+    columns = {
+        'category': 'category',
+        'in_store_status': 'in_store_status',
+        'price_min': 'price',
+        'price_max': 'price',
+    }
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com',
+            'testpass'
+        )
+        categories = [c for c, _ in Category.CATEGORY_CHOICES]
+        statuses = [s for s, _ in StoreStatus.STATUS_CHOICES]
+        PetManager.objects.bulk_create(
+            PetManager(
+                user=self.user,
+                name=f'Pet {i}',
+                category=categories[i % len(categories)],
+                in_store_status=statuses[i % 7 % len(statuses)],
+                price=i % 1000,
+            )
+            for i in range(5000)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE core_petmanager')
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def test_filter_combinations_use_index_range(self):
+        """Test each filter combination seeks on a filtered column"""
+        for size in range(len(self.params) + 1):
+            for keys in itertools.combinations(self.params, size):
+                query_params = QueryDict(mutable=True)
+                query_params.update({k: self.params[k] for k in keys})
+                queryset = PetFilter(query_params).filter_queryset(
+                    PetManager.objects.filter(user=self.user)
+                )
+
+                plan = queryset.explain()
+                self.assertNotIn('Seq Scan', plan, keys)
+                self.assertIn('Index', plan, keys)
+                conditions = ' '.join(
+                    line for line in plan.splitlines() if 'Index Cond' in line
+                )
+                self.assertIn('user_id', conditions, keys)
+                filtered = {self.columns[k] for k in keys if k in self.columns}
+                if filtered:
+                    self.assertTrue(
+                        any(column in conditions for column in filtered),
+                        (keys, plan)
+                    )
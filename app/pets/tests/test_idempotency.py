@@ -0,0 +1,230 @@
+import datetime
+import threading
+import time
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Customer, IdempotencyKey, Order, PetManager
+
+from pets.idempotency import IdempotencyMixin, sweep_expired
+from pets.views import OrderViewSet
+
+ORDERS_URL = reverse('pets:order-list')
+CUSTOMERS_URL = reverse('pets:customer-list')
+PETS_URL = reverse('pets:pet-list')
+
+ORDER = {
+    'customer_name': 'Jane',
+    'customer_phone': '07123456789',
+    'customer_animal_choice': 'Cat',
+    'customer_budget': '90.00',
+    'customer_allocated_preference': 'Bazzle'
+}
+
+
+class IdempotencyApiTests(TestCase):
+    """Test creates retried with an Idempotency-Key"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com', 'testpass'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def post(self, url, payload, key='key-1'):
+        return self.client.post(
+            url, payload, format='json', HTTP_IDEMPOTENCY_KEY=key
+        )
+
+    def test_retry_replays_response(self):
+        """Test a retried order is created once and answered the same"""
+        first = self.post(ORDERS_URL, ORDER)
+        with self.assertNumQueries(1):
+            second = self.post(ORDERS_URL, ORDER)
+
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertFalse(first.has_header('Idempotent-Replayed'))
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_customer_and_pet_creates(self):
+        """Test customers and pets honour the header too"""
+        customer = {
+            'name': 'Jane', 'email': 'jane@testing.com',
+            'customer_phone': '07123456789',
+            'customer_address': '1 High Street'
+        }
+        pet = {
+            'name': 'Bazzle', 'in_store_status': 'Instore',
+            'category': 'Cat', 'price': '120.90'
+        }
+        for _ in range(2):
+            self.post(CUSTOMERS_URL, customer, 'customer')
+            self.post(PETS_URL, pet, 'pet')
+
+        self.assertEqual(Customer.objects.count(), 1)
+        self.assertEqual(PetManager.objects.count(), 1)
+
+    def test_without_key(self):
+        """Test creates without the header are not deduplicated"""
+        self.client.post(ORDERS_URL, ORDER)
+        self.client.post(ORDERS_URL, ORDER)
+
+        self.assertEqual(Order.objects.count(), 2)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def test_key_reused_for_other_request(self):
+        """Test a key sent with a different body is refused"""
+        self.post(ORDERS_URL, ORDER)
+
+        res = self.post(ORDERS_URL, dict(ORDER, customer_name='John'))
+
+        self.assertEqual(
+            res.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY
+        )
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_failed_create_not_stored(self):
+        """Test a rejected create leaves the key free for a fixed retry"""
+        res = self.post(ORDERS_URL, dict(ORDER, customer_budget='lots'))
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        res = self.post(ORDERS_URL, ORDER)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_keys_are_per_user(self):
+        """Test another user's key does not replay their response"""
+        self.post(ORDERS_URL, ORDER)
+        other = get_user_model().objects.create_user(
+            'other@testing.com', 'testpass'
+        )
+        self.client.force_authenticate(other)
+
+        res = self.post(ORDERS_URL, ORDER)
+
+        self.assertFalse(res.has_header('Idempotent-Replayed'))
+        self.assertEqual(Order.objects.filter(user=other).count(), 1)
+
+    def test_key_too_long(self):
+        """Test keys longer than the column are rejected"""
+        res = self.post(ORDERS_URL, ORDER, 'k' * 256)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Order.objects.exists())
+
+    def test_expired_key_runs_again(self):
+        """Test a key past its TTL creates a new object"""
+        self.post(ORDERS_URL, ORDER)
+        IdempotencyKey.objects.update(
+            created=timezone.now() - datetime.timedelta(days=2)
+        )
+
+        res = self.post(ORDERS_URL, ORDER)
+
+        self.assertFalse(res.has_header('Idempotent-Replayed'))
+        self.assertEqual(Order.objects.count(), 2)
+        self.assertEqual(IdempotencyKey.objects.count(), 1)
+
+    def test_claim_restores_lock_timeout(self):
+        """Test the short key wait does not outlive the claim"""
+        if connection.vendor != 'postgresql':
+            self.skipTest('lock_timeout is PostgreSQL only')
+        request = type('Request', (), {'user': self.user})()
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute('SHOW lock_timeout')
+            before = cursor.fetchone()[0]
+            IdempotencyMixin().claim_key(request, 'key-1', 'fingerprint')
+            cursor.execute('SHOW lock_timeout')
+
+            self.assertEqual(cursor.fetchone()[0], before)
+
+    def test_sweep_expired(self):
+        """Test the sweep deletes only keys past their TTL"""
+        for key in ('old-1', 'old-2', 'new'):
+            self.post(ORDERS_URL, dict(ORDER, customer_name=key), key)
+        IdempotencyKey.objects.filter(key__startswith='old').update(
+            created=timezone.now() - datetime.timedelta(days=2)
+        )
+
+        self.assertEqual(sweep_expired(batch_size=1), 2)
+        self.assertEqual(
+            list(IdempotencyKey.objects.values_list('key', flat=True)),
+            ['new']
+        )
+
+    def test_sweep_command(self):
+        """Test the sweep command reports the keys deleted"""
+        self.post(ORDERS_URL, ORDER)
+        IdempotencyKey.objects.update(
+            created=timezone.now() - datetime.timedelta(days=2)
+        )
+        out = StringIO()
+
+        call_command('sweep_idempotency_keys', stdout=out)
+
+        self.assertIn('Deleted 1 expired', out.getvalue())
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+
+class InFlightDuplicateTests(TransactionTestCase):
+    """Test a duplicate sent while the first request is still running"""
+
+    def test_duplicate_waits_for_first(self):
+        """Test the duplicate blocks, then replays the first response"""
+        user = get_user_model().objects.create_user(
+            'test@testing.com', 'testpass'
+        )
+        started, release = threading.Event(), threading.Event()
+        original = OrderViewSet.perform_create
+        responses = {}
+
+        def slow_create(view, serializer):
+            started.set()
+            release.wait(10)
+            original(view, serializer)
+
+        def post(name):
+            client = APIClient()
+            client.force_authenticate(user)
+            try:
+                responses[name] = client.post(
+                    ORDERS_URL, ORDER, format='json',
+                    HTTP_IDEMPOTENCY_KEY='key-1'
+                )
+            finally:
+                connection.close()
+
+        with patch.object(OrderViewSet, 'perform_create', slow_create):
+            first = threading.Thread(target=post, args=('first',))
+            first.start()
+            started.wait(10)
+            second = threading.Thread(target=post, args=('second',))
+            second.start()
+            time.sleep(0.2)
+            waiting = second.is_alive()
+            release.set()
+            first.join(10)
+            second.join(10)
+
+        self.assertTrue(waiting)
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(
+            responses['second'].data['id'], responses['first'].data['id']
+        )
+        self.assertEqual(responses['second']['Idempotent-Replayed'], 'true')
@@ -0,0 +1,150 @@
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from PIL import Image
+
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.urls import reverse
+from django.test import TestCase, override_settings
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import PetManager, pet_image_variant_path
+
+from pets.cache import get_cache
+from pets.images import _run, generate_variants, get_variant_urls
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def image_upload_url(pet_id):
+    """Return URL for pet image upload"""
+    return reverse('pets:pet-upload-image', args=[pet_id])
+
+
+def detail_url(pet_id):
+    """Return pet detail URL"""
+    return reverse('pets:pet-detail', args=[pet_id])
+
+
+def sample_pet(user, name='Bazzle'):
+    """Create and return a sample pet"""
+    return PetManager.objects.create(
+        user=user,
+        name=name,
+        in_store_status='Instore',
+        category='Cat',
+        price='120.90'
+    )
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class PetImagePipelineTests(TestCase):
+    """Test the background image variant pipeline"""
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        get_cache().clear()
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com',
+            'testpass'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.pet = sample_pet(self.user)
+
+    def upload(self, size=(1600, 900)):
+        """Upload a generated JPEG to the sample pet"""
+        with tempfile.NamedTemporaryFile(suffix='.jpg') as ntf:
+            Image.new('RGB', size, 'orange').save(ntf, format='JPEG')
+            ntf.seek(0)
+            return self.client.post(
+                image_upload_url(self.pet.id),
+                {'image': ntf},
+                format='multipart'
+            )
+
+    @patch('pets.views.schedule_variants')
+    def test_upload_returns_before_variants(self, schedule):
+        """Test uploading stores the original and queues the variants"""
+        res = self.upload()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['variants'], {})
+        self.pet.refresh_from_db()
+        self.assertTrue(os.path.exists(self.pet.image.path))
+        schedule.assert_called_once_with(self.pet, '')
+
+    @patch('pets.views.schedule_variants')
+    def test_generate_variants(self, schedule):
+        """Test each variant is written next to the original and exposed"""
+        self.upload()
+        self.pet.refresh_from_db()
+
+        generate_variants(self.pet.id, self.user.id, self.pet.image.name)
+
+        self.pet.refresh_from_db()
+        self.assertEqual(self.pet.image_variants, 'thumb,card,full')
+        for variant, size in (('thumb', 150), ('card', 400), ('full', 1200)):
+            path = pet_image_variant_path(self.pet.image.name, variant)
+            self.assertEqual(
+                os.path.dirname(path), os.path.dirname(self.pet.image.name)
+            )
+            with default_storage.open(path) as fh:
+                self.assertEqual(max(Image.open(fh).size), size)
+
+        res = self.client.get(detail_url(self.pet.id))
+        self.assertEqual(
+            set(res.data['variants']), {'thumb', 'card', 'full'}
+        )
+        self.assertTrue(
+            res.data['variants']['thumb'].endswith('_thumb.jpg')
+        )
+
+    @patch('pets.views.schedule_variants')
+    def test_stale_job_ignored(self, schedule):
+        """Test variants of a replaced image are not marked ready"""
+        self.upload()
+        self.pet.refresh_from_db()
+        old_name = self.pet.image.name
+        self.upload(size=(300, 300))
+
+        generate_variants(self.pet.id, self.user.id, old_name)
+
+        self.pet.refresh_from_db()
+        self.assertEqual(self.pet.image_variants, '')
+        self.assertEqual(get_variant_urls(self.pet), {})
+        self.assertFalse(default_storage.exists(
+            pet_image_variant_path(old_name, 'thumb')
+        ))
+
+    @patch('pets.views.schedule_variants')
+    def test_reupload_deletes_old_variants(self, schedule):
+        """Test replacing an image deletes the variants of the old one"""
+        self.upload()
+        self.pet.refresh_from_db()
+        old_name = self.pet.image.name
+        generate_variants(self.pet.id, self.user.id, old_name)
+        self.upload(size=(300, 300))
+        self.pet.refresh_from_db()
+
+        self.assertEqual(schedule.call_args[0][1], old_name)
+        # The job closes its thread's connection, which here is the test's
+        with patch('pets.images.connection'):
+            _run(self.pet.id, self.user.id, self.pet.image.name, old_name)
+
+        for variant in ('thumb', 'card', 'full'):
+            self.assertFalse(default_storage.exists(
+                pet_image_variant_path(old_name, variant)
+            ))
+            self.assertTrue(default_storage.exists(
+                pet_image_variant_path(self.pet.image.name, variant)
+            ))
@@ -0,0 +1,300 @@
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import InventorySummary, PetManager
+
+from pets import importer
+from pets.importer import Importer, upsert_portable, validate_batch
+
+IMPORT_URL = reverse('pets:pet-import')
+
+
+def record(sku='SKU1', name='Bazzle', category='Cat',
+           in_store_status='Instore', price='120.90'):
+    return {
+        'sku': sku, 'name': name, 'category': category,
+        'in_store_status': in_store_status, 'price': price
+    }
+
+
+def csv_text(records):
+    data = io.StringIO()
+    writer = csv.DictWriter(data, fieldnames=importer.FIELDS)
+    writer.writeheader()
+    writer.writerows(records)
+    return data.getvalue()
+
+
+class ValidateBatchTests(TestCase):
+    """Test column-wise validation of import records"""
+
+    def test_valid_rows_are_normalised(self):
+        """Test choices match case-insensitively and prices are quantized"""
+        rows, rejects = validate_batch([
+            record(category='dog', in_store_status='onhold', price='5')
+        ])
+
+        self.assertEqual(rejects, [])
+        self.assertEqual(rows[0][2:4], ('Dog', 'Onhold'))
+        self.assertEqual(str(rows[0][4]), '5.00')
+
+    def test_invalid_rows_are_rejected_with_reasons(self):
+        """Test each failing column is named in the reject"""
+        rows, rejects = validate_batch([
+            record(),
+            record(sku='', category='Dragon'),
+            record(price='1000000'),
+            'Invalid JSON',
+        ])
+
+        self.assertEqual(len(rows), 1)
+        self.assertEqual([reject[0] for reject in rejects], [1, 2, 3])
+        self.assertIn('sku is required', rejects[0][2])
+        self.assertIn("category 'Dragon' is not a choice", rejects[0][2])
+        self.assertIn('price', rejects[1][2])
+        self.assertEqual(rejects[2][2], 'Invalid JSON')
+
+
+class ImporterTests(TestCase):
+    """Test chunked upserts, checkpoints and rejects"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com', 'testpass'
+        )
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def write(self, name, text):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w') as handle:
+            handle.write(text)
+        return path
+
+    def test_upsert_by_sku(self):
+        """Test a second import updates pets in place by sku"""
+        Importer(self.user, 2).run(
+            [record('A'), record('B'), record('C', category='Dog')]
+        )
+        result = Importer(self.user, 2).run(
+            [record('A', price='1.00'), record('D')]
+        )
+
+        self.assertEqual(result['imported'], 2)
+        self.assertEqual(PetManager.objects.filter(user=self.user).count(), 4)
+        self.assertEqual(
+            str(PetManager.objects.get(user=self.user, sku='A').price), '1.00'
+        )
+        self.assertEqual(
+            InventorySummary.objects.get(
+                user=self.user, category='Cat'
+            ).count,
+            3
+        )
+
+    def test_upsert_keeps_status(self):
+        """Test an import sets the status of new pets only"""
+        for upsert in (None, upsert_portable):
+            for records in (
+                    [record('A', in_store_status='Onhold')],
+                    [record('A', in_store_status='Returned', price='1')]):
+                importer = Importer(self.user)
+                if upsert:
+                    importer.upsert = upsert
+                importer.run(records)
+
+            pet = PetManager.objects.get(user=self.user, sku='A')
+            self.assertEqual(pet.in_store_status, 'Onhold')
+            self.assertEqual(str(pet.price), '1.00')
+            pet.delete()
+
+    def test_summary_committed_with_each_chunk(self):
+        """Test every chunk moves the summary counts of the rows it wrote"""
+        for upsert in (None, upsert_portable):
+            for records in (
+                    [record('A'), record('B'), record('C')],
+                    [record('A', category='Dog'), record('B'),
+                     record('D', category='Dog', in_store_status='Onhold')]):
+                importer = Importer(self.user, 2)
+                if upsert:
+                    importer.upsert = upsert
+                importer.run(records)
+
+            self.assertEqual(
+                sorted(InventorySummary.objects.filter(
+                    user=self.user, count__gt=0
+                ).values_list('category', 'in_store_status', 'count')),
+                [('Cat', 'Instore', 2), ('Dog', 'Instore', 1),
+                 ('Dog', 'Onhold', 1)]
+            )
+            PetManager.objects.all().delete()
+            InventorySummary.objects.all().delete()
+
+    def test_duplicate_skus_keep_last(self):
+        """Test a key repeated within a chunk is written once"""
+        Importer(self.user).run([record('A'), record('A', name='Later')])
+
+        self.assertEqual(
+            PetManager.objects.get(user=self.user, sku='A').name, 'Later'
+        )
+
+    def test_portable_upsert(self):
+        """Test the ORM upsert used off PostgreSQL"""
+        for records in ([record('A'), record('B')],
+                        [record('A', name='Rex'), record('C')]):
+            portable = Importer(self.user, 2)
+            portable.upsert = upsert_portable
+            portable.run(records)
+
+        self.assertEqual(
+            sorted(PetManager.objects.values_list('sku', 'name')),
+            [('A', 'Rex'), ('B', 'Bazzle'), ('C', 'Bazzle')]
+        )
+
+    def test_command_writes_rejects(self):
+        """Test the command imports a CSV and lists rejected records"""
+        path = self.write('pets.csv', csv_text([
+            record('A'), record('B', category='Dragon'), record('C')
+        ]))
+        out = io.StringIO()
+
+        call_command(
+            'import_pets', path, user='test@testing.com', stdout=out
+        )
+
+        self.assertEqual(PetManager.objects.count(), 2)
+        with open(f'{path}.rejects.csv') as handle:
+            rows = list(csv.DictReader(handle))
+        self.assertEqual(rows[0]['record'], '2')
+        self.assertEqual(rows[0]['sku'], 'B')
+        self.assertIn('1 rejected', out.getvalue())
+        self.assertFalse(os.path.exists(f'{path}.checkpoint'))
+
+    def test_command_ndjson(self):
+        """Test NDJSON files are read one object per line"""
+        path = self.write('pets.ndjson', '\n'.join(
+            [json.dumps(record('A')), '{broken', json.dumps(record('B'))]
+        ))
+
+        call_command(
+            'import_pets', path, user='test@testing.com', stdout=io.StringIO()
+        )
+
+        self.assertEqual(PetManager.objects.count(), 2)
+
+    def test_command_resumes_from_checkpoint(self):
+        """Test a crashed import continues after the last committed chunk"""
+        path = self.write(
+            'pets.csv', csv_text([record(f'S{i}') for i in range(10)])
+        )
+        original = Importer.import_chunk
+        calls = []
+
+        def crash_on_third(self, chunk):
+            calls.append(len(chunk))
+            if len(calls) == 3:
+                raise RuntimeError('worker died')
+            original(self, chunk)
+
+        with patch.object(Importer, 'import_chunk', crash_on_third), \
+                self.assertRaises(RuntimeError):
+            call_command(
+                'import_pets', path, user='test@testing.com', chunk_size=3,
+                stdout=io.StringIO()
+            )
+        self.assertEqual(PetManager.objects.count(), 6)
+        self.assertEqual(
+            InventorySummary.objects.get(user=self.user).count, 6
+        )
+
+        with patch.object(Importer, 'import_chunk', autospec=True,
+                          side_effect=original) as import_chunk:
+            call_command(
+                'import_pets', path, user='test@testing.com', chunk_size=3,
+                stdout=io.StringIO()
+            )
+
+        self.assertEqual(
+            [len(call[0][1]) for call in import_chunk.call_args_list], [3, 1]
+        )
+        self.assertEqual(PetManager.objects.count(), 10)
+
+    def test_command_refuses_other_file_checkpoint(self):
+        """Test a checkpoint only resumes the file it was written for"""
+        path = self.write('pets.csv', csv_text([record('A')]))
+        with open(f'{path}.checkpoint', 'w') as handle:
+            json.dump({'source': 'other', 'records': 5}, handle)
+
+        with self.assertRaises(CommandError):
+            call_command(
+                'import_pets', path, user='test@testing.com',
+                stdout=io.StringIO()
+            )
+
+    def test_command_missing_columns(self):
+        """Test a CSV without the required columns fails up front"""
+        path = self.write('pets.csv', 'name,price\nRex,1.00\n')
+
+        with self.assertRaises(CommandError):
+            call_command(
+                'import_pets', path, user='test@testing.com',
+                stdout=io.StringIO()
+            )
+
+
+class ImportApiTests(TestCase):
+    """Test the pets import upload endpoint"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com', 'testpass'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def upload(self, name, text):
+        return self.client.post(IMPORT_URL, {
+            'file': SimpleUploadedFile(name, text.encode())
+        }, format='multipart')
+
+    def test_import_upload(self):
+        """Test uploading a CSV imports it and reports rejects"""
+        res = self.upload('pets.csv', csv_text([
+            record('A'), record('B', price='free')
+        ]))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['imported'], 1)
+        self.assertEqual(res.data['rejected'], 1)
+        self.assertEqual(res.data['errors'][0]['record'], 2)
+        self.assertEqual(PetManager.objects.get(user=self.user).sku, 'A')
+
+    def test_import_invalidates_list(self):
+        """Test imported pets appear in the next list response"""
+        self.client.get(reverse('pets:pet-list'))
+        self.upload('pets.ndjson', json.dumps(record('A')))
+
+        res = self.client.get(reverse('pets:pet-list'))
+
+        self.assertEqual(len(res.data['results']), 1)
+
+    def test_import_requires_file(self):
+        """Test a request without a file is rejected"""
+        res = self.client.post(IMPORT_URL, {}, format='multipart')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,161 @@
+import time
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.test import TestCase
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Order, PetManager
+
+from pets.cache import get_cache
+from pets.matching import InventoryIndex, get_index
+
+MATCH_ALL_URL = reverse('pets:order-match-all')
+PETS_URL = reverse('pets:pet-list')
+
+
+def matches_url(order_id):
+    """Return the URL of an order's candidates"""
+    return reverse('pets:order-matches', args=[order_id])
+
+
+def sample_pet(user, name, price, category='Cat', status='Instore'):
+    """Create and return a sample pet"""
+    return PetManager.objects.create(
+        user=user,
+        name=name,
+        in_store_status=status,
+        category=category,
+        price=price
+    )
+
+
+def sample_order(user, choice='Cat', budget='100.00', preference=''):
+    """Create and return a sample order"""
+    return Order.objects.create(
+        user=user,
+        customer_name='Jo',
+        customer_phone='0123',
+        customer_animal_choice=choice,
+        customer_budget=Decimal(budget),
+        customer_allocated_preference=preference
+    )
+
+
+class OrderMatchingTests(TestCase):
+    """Test matching orders against available pets"""
+
+    def setUp(self):
+        get_cache().clear()
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com',
+            'testpass'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.cheap = sample_pet(self.user, 'Tom', '40.00')
+        self.mid = sample_pet(self.user, 'Kit', '80.00')
+        self.dear = sample_pet(self.user, 'Lux', '150.00')
+        sample_pet(self.user, 'Rex', '90.00', category='Dog')
+        sample_pet(self.user, 'Gone', '95.00', status='Onhold')
+
+    def test_candidates_within_budget(self):
+        """Test candidates are the category's affordable pets nearest budget"""
+        order = sample_order(self.user)
+
+        res = self.client.get(matches_url(order.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item['id'] for item in res.data], [self.mid.id, self.cheap.id]
+        )
+        self.assertEqual(res.data[0]['price'], '80.00')
+
+    def test_preference_ranked_first(self):
+        """Test a pet named as the preference is offered first"""
+        order = sample_order(self.user, choice='cat', preference='tom')
+
+        res = self.client.get(matches_url(order.id), {'limit': 1})
+
+        self.assertEqual([item['id'] for item in res.data], [self.cheap.id])
+
+    def test_invalid_limit(self):
+        """Test a bad limit is rejected"""
+        order = sample_order(self.user)
+
+        res = self.client.get(matches_url(order.id), {'limit': 'many'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_index_rebuilt_after_write(self):
+        """Test the index picks up pets written through the API"""
+        order = sample_order(self.user, budget='200.00')
+        self.client.get(matches_url(order.id))
+
+        self.client.patch(
+            reverse('pets:pet-detail', args=[self.dear.id]),
+            {'in_store_status': 'Onhold'}
+        )
+        res = self.client.get(matches_url(order.id))
+
+        self.assertNotIn(self.dear.id, [item['id'] for item in res.data])
+
+    def test_index_rebuilt_after_orm_write(self):
+        """Test a pet sold outside the API is no longer offered"""
+        order = sample_order(self.user, budget='200.00')
+        self.client.get(matches_url(order.id))
+
+        pet = PetManager.objects.get(pk=self.dear.pk)
+        pet.in_store_status = 'PurchasedAndRehomed'
+        pet.save()
+        res = self.client.get(matches_url(order.id))
+
+        self.assertNotIn(self.dear.id, [item['id'] for item in res.data])
+
+    def test_index_reused_between_reads(self):
+        """Test an unchanged inventory is matched without queries"""
+        order = sample_order(self.user)
+        index = get_index(self.user)
+
+        with self.assertNumQueries(0):
+            self.assertIs(get_index(self.user), index)
+            index.match(order, 5)
+
+    def test_match_all_assigns_each_pet_once(self):
+        """Test batch matching gives each pet to one order only"""
+        first = sample_order(self.user)
+        second = sample_order(self.user)
+        third = sample_order(self.user)
+        sample_order(self.user, choice='Dragon')
+
+        res = self.client.get(MATCH_ALL_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        assigned = {item['order']: item['pet'] for item in res.data}
+        self.assertEqual(assigned[first.id]['id'], self.mid.id)
+        self.assertEqual(assigned[second.id]['id'], self.cheap.id)
+        self.assertIsNone(assigned[third.id])
+        self.assertEqual(len(assigned), 4)
+
+    def test_match_is_sub_millisecond(self):
+        """Test a lookup in a large index stays well under a millisecond"""
+        index = InventoryIndex(
+            {'id': i, 'name': f'Pet {i}', 'category': 'Cat',
+             'price': Decimal(i % 5000)}
+            for i in range(50000)
+        )
+        order = Order(
+            customer_animal_choice='Cat',
+            customer_budget=Decimal('2500.00'),
+            customer_allocated_preference='Pet 7'
+        )
+
+        start = time.perf_counter()
+        for _ in range(100):
+            index.match(order, 10)
+        elapsed = (time.perf_counter() - start) / 100
+
+        self.assertLess(elapsed, 0.001)
@@ -0,0 +1,130 @@
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.test import TestCase, override_settings
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import PetManager, Order
+
+from pets.cache import get_cache
+
+PETS_URL = reverse('pets:pet-list')
+ORDER_URL = reverse('pets:order-list')
+
+
+def sample_pet(user, name, **params):
+    """Create and return a sample pet"""
+    defaults = {
+        'in_store_status': 'Instore',
+        'category': 'Dog',
+        'price': '100.00',
+    }
+    defaults.update(params)
+
+    return PetManager.objects.create(user=user, name=name, **defaults)
+
+
+class KeysetPaginationTests(TestCase):
+    """Test cursor pagination of the pets API list endpoints"""
+
+    def setUp(self):
+        get_cache().clear()
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com',
+            'testpass'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def walk(self, url, params=None):
+        """Follow next links and return every page of names"""
+        pages = []
+        res = self.client.get(url, params)
+        while True:
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            pages.append([item['name'] for item in res.data['results']])
+            if not res.data['next']:
+                return pages
+            res = self.client.get(res.data['next'])
+
+    def test_list_is_paginated(self):
+        """Test list responses carry results and cursor links"""
+        sample_pet(self.user, 'Bazzle')
+
+        res = self.client.get(PETS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertIsNone(res.data['next'])
+        self.assertIsNone(res.data['previous'])
+
+    def test_pages_cover_every_row_once(self):
+        """Test duplicate names are split across pages by id"""
+        for name in ['Ace', 'Bo', 'Bo', 'Bo', 'Cy', 'Di', 'Di']:
+            sample_pet(self.user, name)
+
+        pages = self.walk(PETS_URL, {'page_size': 2})
+
+        names = [name for page in pages for name in page]
+        self.assertEqual(
+            names, ['Di', 'Di', 'Cy', 'Bo', 'Bo', 'Bo', 'Ace']
+        )
+        self.assertEqual([len(page) for page in pages], [2, 2, 2, 1])
+
+    def test_insert_before_cursor_does_not_shift_pages(self):
+        """Test rows created behind the cursor are not repeated"""
+        for name in ['Ace', 'Bo', 'Cy', 'Di']:
+            sample_pet(self.user, name)
+
+        res = self.client.get(PETS_URL, {'page_size': 2})
+        sample_pet(self.user, 'Zed')
+        res = self.client.get(res.data['next'])
+
+        names = [item['name'] for item in res.data['results']]
+        self.assertEqual(names, ['Bo', 'Ace'])
+
+    def test_previous_link_returns_prior_page(self):
+        """Test the previous cursor walks back to the earlier page"""
+        for name in ['Ace', 'Bo', 'Cy', 'Di', 'Ed']:
+            sample_pet(self.user, name)
+
+        first = self.client.get(PETS_URL, {'page_size': 2})
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+
+        self.assertEqual(back.data['results'], first.data['results'])
+
+    @override_settings(PETS_MAX_PAGE_SIZE=3)
+    def test_page_size_is_capped(self):
+        """Test page_size cannot exceed the configured maximum"""
+        for name in ['Ace', 'Bo', 'Cy', 'Di', 'Ed']:
+            sample_pet(self.user, name)
+
+        res = self.client.get(PETS_URL, {'page_size': 1000})
+
+        self.assertEqual(len(res.data['results']), 3)
+
+    def test_invalid_cursor(self):
+        """Test a tampered cursor returns not found"""
+        res = self.client.get(PETS_URL, {'cursor': 'not-a-cursor'})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_order_list_paginated_by_customer_name(self):
+        """Test orders are paged on the customer name key"""
+        for name in ['Ann', 'Bob', 'Cat']:
+            Order.objects.create(
+                user=self.user,
+                customer_name=name,
+                customer_phone='0400123123',
+                customer_animal_choice='Dog',
+                customer_budget='200.00',
+                customer_allocated_preference='Any'
+            )
+
+        res = self.client.get(ORDER_URL, {'page_size': 2})
+        res = self.client.get(res.data['next'])
+
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'][0]['customer_name'], 'Ann')
@@ -0,0 +1,125 @@
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.test import TestCase
+
+from rest_framework import serializers, status
+from rest_framework.test import APIClient
+
+from core.models import PetManager, Customer
+
+from pets.prefetch import get_related_paths, plan_queryset
+from pets.serializers import PetSerializer, PetDetailSerializer, \
+    CustomerDetailSerializer
+
+PETS_URL = reverse('pets:pet-list')
+
+
+def detail_url(pet_id):
+    """Return pet detail URL"""
+    return reverse('pets:pet-detail', args=[pet_id])
+
+
+def sample_pet(user, name='Bazzle'):
+    """Create and return a sample pet"""
+    return PetManager.objects.create(
+        user=user,
+        name=name,
+        in_store_status='Instore',
+        category='Cat',
+        price='120.90'
+    )
+
+
+class OwnerPetsSerializer(serializers.ModelSerializer):
+    """Serialize a user with the pets they own"""
+    petmanager_set = PetDetailSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = get_user_model()
+        fields = ('id', 'email', 'petmanager_set')
+
+
+class PrefetchPlannerTests(TestCase):
+    """Test related paths are planned from the serializer field tree"""
+
+    def test_flat_serializer_needs_nothing(self):
+        """Test serializers without nested relations plan no joins"""
+        self.assertEqual(get_related_paths(PetSerializer()), ([], []))
+
+    def test_nested_foreign_key_is_joined(self):
+        """Test a nested forward relation is select_related"""
+        paths = get_related_paths(CustomerDetailSerializer())
+
+        self.assertEqual(paths, (['user'], []))
+
+    def test_nested_many_is_prefetched(self):
+        """Test reverse relations and everything below them are prefetched"""
+        paths = get_related_paths(OwnerPetsSerializer())
+
+        self.assertEqual(paths, ([], ['petmanager_set__user']))
+
+    def test_nested_many_query_count_is_constant(self):
+        """Test serializing many owners with many pets runs fixed queries"""
+        for i in range(3):
+            user = get_user_model().objects.create_user(
+                f'user{i}@testing.com', 'testpass'
+            )
+            for j in range(i + 2):
+                sample_pet(user, f'Pet {j}')
+
+        serializer = OwnerPetsSerializer()
+        queryset = plan_queryset(get_user_model().objects.all(), serializer)
+        with self.assertNumQueries(2):
+            data = OwnerPetsSerializer(queryset, many=True).data
+
+        self.assertEqual(sum(len(u['petmanager_set']) for u in data), 9)
+
+
+class PrefetchApiTests(TestCase):
+    """Test the pets API loads related rows up front"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com',
+            'testpass'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_retrieve_pet_joins_owner(self):
+        """Test retrieving a pet embeds its owner in one query"""
+        pet = sample_pet(self.user)
+
+        with self.assertNumQueries(1):
+            res = self.client.get(detail_url(pet.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['user']['email'], self.user.email)
+
+    def test_retrieve_customer_detail(self):
+        """Test retrieving a customer embeds its owner"""
+        customer = Customer.objects.create(
+            user=self.user,
+            name='Mary Jones',
+            email='maryjones@petlovers.com',
+            customer_phone='0400123123',
+            customer_address='99 Pet Lovers Street, Brisbane 4000'
+        )
+
+        with self.assertNumQueries(1):
+            res = self.client.get(
+                reverse('pets:customer-detail', args=[customer.id])
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['user']['id'], self.user.id)
+
+    def test_list_query_count_is_constant(self):
+        """Test listing pets does not grow queries with row count"""
+        for i in range(20):
+            sample_pet(self.user, f'Pet {i}')
+
+        with self.assertNumQueries(1):
+            res = self.client.get(PETS_URL)
+
+        self.assertEqual(len(res.data['results']), 20)
@@ -0,0 +1,226 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.urls import reverse
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Customer, PetManager
+
+from pets.cache import get_cache, invalidate_user_cache
+from pets.search import PrefixIndex, get_search_backend, \
+    has_trigram_extension
+
+PETS_URL = reverse('pets:pet-list')
+PET_SEARCH_URL = reverse('pets:pet-search')
+CUSTOMER_SEARCH_URL = reverse('pets:customer-search')
+BULK_URL = reverse('pets:pet-bulk-update')
+
+
+def sample_pet(user, name):
+    """Create and return a sample pet"""
+    return PetManager.objects.create(
+        user=user,
+        name=name,
+        in_store_status='Instore',
+        category='Cat',
+        price='120.90'
+    )
+
+
+def ids(res):
+    return [item['id'] for item in res.data['results']]
+
+
+class PrefixIndexTests(TestCase):
+    """Test the in-process prefix and trigram index"""
+
+    def setUp(self):
+        self.index = PrefixIndex(('name', 'email'))
+        self.index.add(1, ('Bazzle', 'baz@example.com'))
+        self.index.add(2, ('Basil Brush', 'basil@example.com'))
+        self.index.add(3, ('Rex', 'rex@example.com'))
+
+    def test_prefix_ranked_above_fuzzy(self):
+        """Test exact and prefix words outrank close spellings"""
+        self.assertEqual(self.index.search('bazzle'), [1])
+        self.assertEqual(self.index.search('bas'), [2])
+        self.assertEqual(self.index.search('bazle')[0], 1)
+
+    def test_every_word_must_match(self):
+        """Test a multi word term needs all of its words"""
+        self.assertEqual(self.index.search('basil br'), [2])
+        self.assertEqual(self.index.search('basil rex'), [])
+
+    def test_incremental_updates(self):
+        """Test re-adding and removing rows updates the words"""
+        self.index.add(3, ('Rover', 'rover@example.com'))
+        self.assertEqual(self.index.search('rex'), [])
+        self.assertEqual(self.index.search('rov'), [3])
+
+        self.index.remove(3)
+        self.assertEqual(self.index.search('rov'), [])
+        self.assertNotIn('rover', self.index.words)
+
+
+class SearchApiTests(TestCase):
+    """Test the search action on pets and customers"""
+
+    def setUp(self):
+        get_cache().clear()
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com',
+            'testpass'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.bazzle = sample_pet(self.user, 'Bazzle')
+        self.basil = sample_pet(self.user, 'Basil')
+        sample_pet(self.user, 'Rex')
+        other = get_user_model().objects.create_user(
+            'other@testing.com',
+            'testpass'
+        )
+        sample_pet(other, 'Bazza')
+
+    def test_term_required(self):
+        """Test searching without a term is rejected"""
+        res = self.client.get(PET_SEARCH_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_prefix_search(self):
+        """Test a partial name finds the user's pets, best first"""
+        res = self.client.get(PET_SEARCH_URL, {'q': 'bazz'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(ids(res), [self.bazzle.id])
+
+    def test_customer_search_by_phone_or_email(self):
+        """Test customers are found by phone or email"""
+        customer = Customer.objects.create(
+            user=self.user,
+            name='Jo Bloggs',
+            email='jo@example.com',
+            customer_phone='0161 496 0000',
+            customer_address='1 Road'
+        )
+
+        res = self.client.get(CUSTOMER_SEARCH_URL, {'q': 'bloggs'})
+        self.assertEqual(ids(res), [customer.id])
+        res = self.client.get(CUSTOMER_SEARCH_URL, {'q': '01614960000'})
+        self.assertEqual(ids(res), [customer.id])
+
+    def test_pagination(self):
+        """Test results are paged by offset with next links"""
+        for i in range(5):
+            sample_pet(self.user, f'Bazzle {i}')
+
+        res = self.client.get(PET_SEARCH_URL, {'q': 'bazzle', 'page_size': 4})
+        self.assertEqual(len(res.data['results']), 4)
+        self.assertIsNone(res.data['previous'])
+
+        res = self.client.get(res.data['next'])
+        self.assertEqual(len(res.data['results']), 2)
+        self.assertIsNone(res.data['next'])
+        self.assertIsNotNone(res.data['previous'])
+
+    def test_trigram_index_used(self):
+        """Test the PostgreSQL search can be served by the trigram index"""
+        if not has_trigram_extension():
+            self.skipTest('pg_trgm is not installed')
+        with connection.cursor() as cursor:
+            cursor.execute('SET enable_seqscan = off')
+            cursor.execute(
+                'EXPLAIN SELECT id FROM core_petmanager '
+                "WHERE 'bazz' <%% name"
+            )
+            plan = '\n'.join(row[0] for row in cursor.fetchall())
+            cursor.execute('SET enable_seqscan = on')
+
+        self.assertIn('core_petmanager_name_trgm', plan)
+
+
+@override_settings(PETS_SEARCH_BACKEND='pets.search.InMemorySearchBackend')
+class InMemorySearchApiTests(SearchApiTests):
+    """Test the search action against the in-process backend"""
+
+    def test_trigram_index_used(self):
+        pass
+
+    def test_index_follows_other_processes(self):
+        """Test a write seen only through the generation rebuilds the index"""
+        self.client.get(PET_SEARCH_URL, {'q': 'bazz'})
+
+        # Another worker's write and bump reach no receiver in this process
+        PetManager.objects.filter(pk=self.basil.pk).update(name='Zebra')
+        with patch('pets.cache.generation_bumped.send'):
+            invalidate_user_cache(self.user)
+        res = self.client.get(PET_SEARCH_URL, {'q': 'zeb'})
+
+        self.assertEqual(ids(res), [self.basil.id])
+
+    @override_settings(PETS_SEARCH_INDEXES=1)
+    def test_least_recently_used_dropped(self):
+        """Test only the configured number of indexes are kept"""
+        backend = get_search_backend()
+        self.client.get(PET_SEARCH_URL, {'q': 'bazz'})
+        self.client.get(CUSTOMER_SEARCH_URL, {'q': 'jo'})
+
+        self.assertEqual(
+            [key[0] for key in backend.indexes], ['core.Customer']
+        )
+
+
+@override_settings(PETS_SEARCH_BACKEND='pets.search.InMemorySearchBackend')
+class InMemoryIndexUpdateTests(TransactionTestCase):
+    """Test committed writes in this process update the index in place"""
+
+    def setUp(self):
+        get_cache().clear()
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com',
+            'testpass'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.bazzle = sample_pet(self.user, 'Bazzle')
+        self.client.get(PET_SEARCH_URL, {'q': 'bazz'})
+        self.index = self.current_index()
+
+    def current_index(self):
+        backend = get_search_backend()
+        return backend.get_index(PetManager, self.user, ('name',))
+
+    def test_index_follows_writes(self):
+        """Test saves, bulk updates and deletes reach the same index"""
+        pet = sample_pet(self.user, 'Bazooka')
+        res = self.client.get(PET_SEARCH_URL, {'q': 'bazo'})
+        self.assertEqual(ids(res), [pet.id])
+
+        self.client.patch(
+            BULK_URL, [{'id': pet.id, 'name': 'Gizmo'}], format='json'
+        )
+        res = self.client.get(PET_SEARCH_URL, {'q': 'giz'})
+        self.assertEqual(ids(res), [pet.id])
+
+        pet.delete()
+        res = self.client.get(PET_SEARCH_URL, {'q': 'giz'})
+        self.assertEqual(ids(res), [])
+        self.assertIs(self.current_index(), self.index)
+
+    def test_rolled_back_write_not_indexed(self):
+        """Test a write is applied only once its transaction commits"""
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            self.bazzle.name = 'Gizmo'
+            self.bazzle.save()
+            raise RuntimeError('rolled back')
+
+        res = self.client.get(PET_SEARCH_URL, {'q': 'giz'})
+        self.assertEqual(ids(res), [])
+        res = self.client.get(PET_SEARCH_URL, {'q': 'bazz'})
+        self.assertEqual(ids(res), [self.bazzle.id])
+        self.assertIs(self.current_index(), self.index)
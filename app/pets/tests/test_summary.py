@@ -0,0 +1,131 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from django.test import TestCase
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import InventorySummary, PetManager
+
+from pets.cache import get_cache
+
+SUMMARY_URL = reverse('pets:summary')
+PETS_URL = reverse('pets:pet-list')
+BULK_URL = reverse('pets:pet-bulk-update')
+
+
+def detail_url(pet_id):
+    """Return pet detail URL"""
+    return reverse('pets:pet-detail', args=[pet_id])
+
+
+def pet_payload(name='Bazzle', category='Cat', in_store_status='Instore'):
+    return {
+        'name': name,
+        'in_store_status': in_store_status,
+        'category': category,
+        'price': '120.90',
+    }
+
+
+class InventorySummaryTests(TestCase):
+    """Test the incrementally maintained inventory summary"""
+
+    def setUp(self):
+        get_cache().clear()
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com',
+            'testpass'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def counts(self):
+        return self.client.get(SUMMARY_URL).data
+
+    def test_summary_lists_every_combination(self):
+        """Test the summary has a zero for every category and status"""
+        res = self.client.get(SUMMARY_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data), 6)
+        self.assertEqual(res.data['Cat']['Onhold'], 0)
+
+    def test_summary_requires_auth(self):
+        """Test the summary is not public"""
+        res = APIClient().get(SUMMARY_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_create_update_delete_tracked(self):
+        """Test single writes keep the counts current"""
+        res = self.client.post(PETS_URL, pet_payload())
+        self.client.post(PETS_URL, pet_payload(name='Rex', category='Dog'))
+        self.assertEqual(self.counts()['Cat']['Instore'], 1)
+        self.assertEqual(self.counts()['Dog']['Instore'], 1)
+
+        self.client.patch(
+            detail_url(res.data['id']), {'in_store_status': 'Onhold'}
+        )
+        self.assertEqual(self.counts()['Cat']['Instore'], 0)
+        self.assertEqual(self.counts()['Cat']['Onhold'], 1)
+
+        self.client.delete(detail_url(res.data['id']))
+        self.assertEqual(self.counts()['Cat']['Onhold'], 0)
+        self.assertEqual(self.counts()['Dog']['Instore'], 1)
+
+    def test_bulk_writes_tracked(self):
+        """Test bulk create and bulk update adjust the counts"""
+        res = self.client.post(
+            PETS_URL,
+            [pet_payload(name=f'Pet {i}') for i in range(5)],
+            format='json'
+        )
+        self.assertEqual(self.counts()['Cat']['Instore'], 5)
+
+        self.client.patch(
+            BULK_URL,
+            [{'id': item['id'], 'category': 'Bird'} for item in res.data[:2]],
+            format='json'
+        )
+        self.assertEqual(self.counts()['Cat']['Instore'], 3)
+        self.assertEqual(self.counts()['Bird']['Instore'], 2)
+
+    def test_summary_limited_to_user(self):
+        """Test other users' pets are not counted"""
+        other = get_user_model().objects.create_user(
+            'other@testing.com',
+            'testpass'
+        )
+        client = APIClient()
+        client.force_authenticate(other)
+        client.post(PETS_URL, pet_payload())
+
+        self.assertEqual(self.counts()['Cat']['Instore'], 0)
+
+    def test_read_is_single_query(self):
+        """Test reading the summary does not scan the pets"""
+        for i in range(20):
+            self.client.post(PETS_URL, pet_payload(name=f'Pet {i}'))
+
+        with self.assertNumQueries(1):
+            res = self.client.get(SUMMARY_URL)
+        self.assertEqual(res.data['Cat']['Instore'], 20)
+
+    def test_reconcile_fixes_drift(self):
+        """Test the reconcile command rebuilds drifted counts"""
+        self.client.post(PETS_URL, pet_payload())
+        PetManager.objects.create(user=self.user, **pet_payload(name='Rex'))
+        InventorySummary.objects.create(
+            user=self.user, category='Fish', in_store_status='Onhold', count=4
+        )
+
+        out = StringIO()
+        call_command('reconcile_inventory', stdout=out)
+
+        self.assertIn('test@testing.com: 2 rows corrected', out.getvalue())
+        self.assertEqual(self.counts()['Cat']['Instore'], 2)
+        self.assertEqual(self.counts()['Fish']['Onhold'], 0)
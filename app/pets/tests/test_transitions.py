@@ -0,0 +1,360 @@
+import threading
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import InventorySummary, PetManager
+
+from pets.serializers import PetSerializer
+from pets.summary import adjust_summary, summary_keys
+from pets.transitions import TRANSITIONS, TransitionConflict, \
+    save_versioned, transition_pet
+
+PETS_URL = reverse('pets:pet-list')
+
+
+def transition_url(pet_id):
+    """Return the status transition URL of a pet"""
+    return reverse('pets:pet-transition', args=[pet_id])
+
+
+def detail_url(pet_id):
+    """Return the pet detail URL"""
+    return reverse('pets:pet-detail', args=[pet_id])
+
+
+def sample_pet(user, **params):
+    """Create a pet counted in the user's summary"""
+    defaults = {
+        'name': 'Bazzle',
+        'in_store_status': 'Instore',
+        'category': 'Cat',
+        'price': '120.90'
+    }
+    defaults.update(params)
+    pet = PetManager.objects.create(user=user, **defaults)
+    adjust_summary(user, added=summary_keys(pet))
+
+    return pet
+
+
+def summary_count(user, in_store_status):
+    row = InventorySummary.objects.filter(
+        user=user, category='Cat', in_store_status=in_store_status
+    ).first()
+    return row.count if row else 0
+
+
+class TransitionApiTests(TestCase):
+    """Test moving pets through the store status graph"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com', 'testpass'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.pet = sample_pet(self.user)
+
+    def test_graph_covers_every_status(self):
+        """Test each store status has its outgoing transitions"""
+        statuses = {key for key, _ in PetManager._meta.get_field(
+            'in_store_status'
+        ).choices}
+
+        self.assertEqual(set(TRANSITIONS), statuses)
+        for targets in TRANSITIONS.values():
+            self.assertLessEqual(set(targets), statuses)
+
+    def test_transition(self):
+        """Test an allowed transition moves the pet and its summary"""
+        res = self.client.post(
+            transition_url(self.pet.id), {'in_store_status': 'Onhold'}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['in_store_status'], 'Onhold')
+        self.assertEqual(res.data['version'], 1)
+        self.pet.refresh_from_db()
+        self.assertEqual(self.pet.in_store_status, 'Onhold')
+        self.assertEqual(summary_count(self.user, 'Instore'), 0)
+        self.assertEqual(summary_count(self.user, 'Onhold'), 1)
+
+    def test_transition_not_in_graph(self):
+        """Test a transition the graph lacks is refused with the options"""
+        res = self.client.post(
+            transition_url(self.pet.id),
+            {'in_store_status': 'PurchasedAndRehomed'}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            list(res.data['allowed']), ['Onhold', 'SoldPendingPickup']
+        )
+        self.pet.refresh_from_db()
+        self.assertEqual(self.pet.in_store_status, 'Instore')
+        self.assertEqual(self.pet.version, 0)
+
+    def test_transition_stale_version(self):
+        """Test a client holding an old version is told to re-read"""
+        self.client.post(
+            transition_url(self.pet.id), {'in_store_status': 'Onhold'}
+        )
+
+        res = self.client.post(transition_url(self.pet.id), {
+            'in_store_status': 'SoldPendingPickup', 'version': 0
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(res.data['in_store_status'], 'Onhold')
+        self.assertEqual(res.data['version'], 1)
+
+    def test_transition_unknown_status(self):
+        """Test a status outside the choices is a validation error"""
+        res = self.client.post(
+            transition_url(self.pet.id), {'in_store_status': 'Lost'}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_transition_other_users_pet(self):
+        """Test pets of other users cannot be moved"""
+        other = get_user_model().objects.create_user(
+            'other@testing.com', 'testpass'
+        )
+        pet = sample_pet(other)
+
+        res = self.client.post(
+            transition_url(pet.id), {'in_store_status': 'Onhold'}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_transition_refreshes_list(self):
+        """Test the cached pet list shows the new status"""
+        self.client.get(PETS_URL)
+        self.client.post(
+            transition_url(self.pet.id), {'in_store_status': 'Onhold'}
+        )
+
+        res = self.client.get(PETS_URL)
+
+        self.assertEqual(res.data['results'][0]['in_store_status'], 'Onhold')
+
+    def test_transition_retries_changed_copy(self):
+        """Test a copy read before another change is re-read, not written"""
+        stale = PetManager.objects.get(pk=self.pet.pk)
+        transition_pet(self.user, self.pet, 'Onhold')
+
+        pet = transition_pet(self.user, stale, 'SoldPendingPickup')
+
+        self.assertEqual(pet.version, 2)
+        with self.assertRaises(TransitionConflict):
+            transition_pet(
+                self.user, PetManager.objects.get(pk=self.pet.pk), 'Onhold'
+            )
+
+    def test_update_bumps_version(self):
+        """Test edits move the version on so pending transitions fail"""
+        res = self.client.patch(detail_url(self.pet.id), {'price': '99.00'})
+
+        self.assertEqual(res.data['version'], 1)
+        res = self.client.post(transition_url(self.pet.id), {
+            'in_store_status': 'Onhold', 'version': 0
+        })
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+
+    def test_update_keeps_concurrent_status(self):
+        """Test an edit read before a transition does not undo it"""
+        stale = PetManager.objects.get(pk=self.pet.pk)
+        transition_pet(self.user, self.pet, 'Onhold')
+
+        serializer = PetSerializer(stale, data={'price': '1.00'}, partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        self.pet.refresh_from_db()
+        self.assertEqual(self.pet.in_store_status, 'Onhold')
+        self.assertEqual(str(self.pet.price), '1.00')
+
+    def test_update_status_follows_graph(self):
+        """Test an update may only move status along the graph"""
+        res = self.client.patch(
+            detail_url(self.pet.id), {'in_store_status': 'PurchasedAndRehomed'}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(
+            list(res.data['allowed']), ['Onhold', 'SoldPendingPickup']
+        )
+        self.pet.refresh_from_db()
+        self.assertEqual(self.pet.in_store_status, 'Instore')
+
+        res = self.client.patch(detail_url(self.pet.id), {
+            'in_store_status': 'Onhold', 'price': '5.00'
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['in_store_status'], 'Onhold')
+        self.assertEqual(res.data['price'], '5.00')
+        self.assertEqual(summary_count(self.user, 'Instore'), 0)
+        self.assertEqual(summary_count(self.user, 'Onhold'), 1)
+
+    def test_update_stale_version(self):
+        """Test the second of two updates read at one version is refused"""
+        first = self.client.patch(
+            detail_url(self.pet.id), {'price': '1.00', 'version': 0}
+        )
+        second = self.client.patch(
+            detail_url(self.pet.id), {'price': '2.00', 'version': 0}
+        )
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(second.data['version'], 1)
+        self.pet.refresh_from_db()
+        self.assertEqual(str(self.pet.price), '1.00')
+
+    def test_save_versioned_refuses_stale_copy(self):
+        """Test a copy read before a transition is not written"""
+        stale = PetManager.objects.get(pk=self.pet.pk)
+        transition_pet(self.user, self.pet, 'Onhold')
+        serializer = PetSerializer(stale, data={'price': '1.00'}, partial=True)
+        serializer.is_valid(raise_exception=True)
+
+        with self.assertRaises(TransitionConflict) as raised:
+            save_versioned(self.user, serializer)
+
+        self.assertEqual(raised.exception.pet.in_store_status, 'Onhold')
+        self.pet.refresh_from_db()
+        self.assertEqual(str(self.pet.price), '120.90')
+        self.assertEqual(summary_count(self.user, 'Onhold'), 1)
+
+    def test_bulk_update_status_follows_graph(self):
+        """Test one illegal move rejects the whole batch"""
+        pet = sample_pet(self.user, name='Gemma')
+
+        res = self.client.patch(reverse('pets:pet-bulk-update'), [
+            {'id': self.pet.id, 'in_store_status': 'Onhold'},
+            {'id': pet.id, 'in_store_status': 'Returned'},
+        ], format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(res.data['id'], pet.id)
+        self.assertEqual(
+            set(PetManager.objects.values_list('in_store_status', flat=True)),
+            {'Instore'}
+        )
+        self.assertEqual(summary_count(self.user, 'Instore'), 2)
+
+    def test_bulk_update_bumps_versions(self):
+        """Test bulk edits move the version of every pet written"""
+        pet = sample_pet(self.user, name='Gemma')
+
+        res = self.client.patch(reverse('pets:pet-bulk-update'), [
+            {'id': self.pet.id, 'price': '10.00'},
+            {'id': pet.id, 'price': '20.00'},
+        ], format='json')
+
+        self.assertEqual([item['version'] for item in res.data], [1, 1])
+        self.assertEqual(
+            set(PetManager.objects.values_list('version', flat=True)), {1}
+        )
+
+
+class ConcurrentTransitionTests(TransactionTestCase):
+    """Test transitions racing on one pet from many threads"""
+
+    threads = 8
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com', 'testpass'
+        )
+        self.pet = sample_pet(self.user)
+
+    def race(self, work):
+        """Run work on every thread at once, return results and errors"""
+        barrier = threading.Barrier(self.threads)
+        results, errors = [], []
+
+        def run(number):
+            try:
+                with connection.cursor() as cursor:
+                    # Any wait on a lock held for longer is a failure
+                    cursor.execute("SET lock_timeout = '2s'")
+                barrier.wait(10)
+                results.append(work(number))
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        runners = [
+            threading.Thread(target=run, args=(number,))
+            for number in range(self.threads)
+        ]
+        for runner in runners:
+            runner.start()
+        for runner in runners:
+            runner.join(60)
+
+        return results, errors
+
+    def test_one_hold_wins(self):
+        """Test only one of many simultaneous holds on a pet succeeds"""
+        def hold(number):
+            pet = PetManager.objects.get(pk=self.pet.pk)
+            try:
+                transition_pet(self.user, pet, 'Onhold')
+            except TransitionConflict:
+                return False
+            return True
+
+        results, errors = self.race(hold)
+
+        self.assertEqual(errors, [])
+        self.assertEqual(results.count(True), 1)
+        self.pet.refresh_from_db()
+        self.assertEqual(self.pet.version, 1)
+        self.assertEqual(summary_count(self.user, 'Onhold'), 1)
+        self.assertEqual(summary_count(self.user, 'Instore'), 0)
+
+    def test_no_lost_updates(self):
+        """Test every successful transition is counted in the version"""
+        def toggle(number):
+            moved = Counter()
+            for _ in range(25):
+                pet = PetManager.objects.get(pk=self.pet.pk)
+                target = 'Onhold' if pet.in_store_status == 'Instore' \
+                    else 'Instore'
+                try:
+                    transition_pet(self.user, pet, target, pet.version)
+                except TransitionConflict:
+                    continue
+                moved[target] += 1
+            return moved
+
+        results, errors = self.race(toggle)
+
+        self.assertEqual(errors, [])
+        moved = sum(results, Counter())
+        self.pet.refresh_from_db()
+        self.assertEqual(self.pet.version, sum(moved.values()))
+        self.assertEqual(moved['Onhold'] - moved['Instore'], int(
+            self.pet.in_store_status == 'Onhold'
+        ))
+        self.assertEqual(
+            summary_count(self.user, 'Onhold')
+            + summary_count(self.user, 'Instore'),
+            1
+        )
+        self.assertEqual(
+            summary_count(self.user, self.pet.in_store_status), 1
+        )
@@ -0,0 +1,213 @@
+from django.db import transaction
+from django.db.models import F, Q
+from django.http import Http404
+from django.utils.translation import ugettext_lazy as _
+
+from rest_framework import serializers, status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+
+from core.models import PetManager
+
+from pets.cache import invalidate_user_cache
+from pets.summary import adjust_summary, summary_keys
+
+# Store statuses a pet may move to from each status
+TRANSITIONS = {
+    'Ordered': ('Instore',),
+    'Instore': ('Onhold', 'SoldPendingPickup'),
+    'Onhold': ('Instore', 'SoldPendingPickup'),
+    'SoldPendingPickup': ('Instore', 'PurchasedAndRehomed'),
+    'PurchasedAndRehomed': ('Returned',),
+    'Returned': ('Instore',),
+}
+
+# Attempts at a transition before giving up on a busy pet
+MAX_ATTEMPTS = 3
+
+
+class TransitionConflict(Exception):
+    """Raised when a pet cannot make the requested transition"""
+
+    def __init__(self, message, pet):
+        super().__init__(message)
+        self.pet = pet
+
+
+def allowed_transitions(in_store_status):
+    """Return the statuses a pet may move to from in_store_status"""
+    return TRANSITIONS.get(in_store_status, ())
+
+
+def transition_pet(user, pet, to_status, version=None):
+    """Move a user's pet to to_status unless it changed since it was read
+
+    The change is one UPDATE conditional on the status and version that
+    were read, so concurrent writers never wait on a row lock held for a
+    read; the loser matches no row, re-reads and is checked again. With
+    version given the caller's copy must be current, without it the
+    transition is retried against the latest copy a few times.
+    """
+    for _attempt in range(MAX_ATTEMPTS):
+        if version is not None and version != pet.version:
+            raise TransitionConflict(
+                _('Pet has changed since it was fetched'), pet
+            )
+        if to_status not in allowed_transitions(pet.in_store_status):
+            raise TransitionConflict(
+                _('Cannot move a pet from %(from)s to %(to)s') % {
+                    'from': pet.in_store_status, 'to': to_status
+                },
+                pet
+            )
+
+        with transaction.atomic():
+            moved = PetManager.objects.filter(
+                pk=pet.pk, in_store_status=pet.in_store_status,
+                version=pet.version
+            ).update(in_store_status=to_status, version=F('version') + 1)
+            if moved:
+                adjust_summary(
+                    user,
+                    added=[(pet.category, to_status)],
+                    removed=[(pet.category, pet.in_store_status)]
+                )
+        if moved:
+            pet.in_store_status = to_status
+            pet.version += 1
+            return pet
+
+        try:
+            pet.refresh_from_db()
+        except PetManager.DoesNotExist:
+            raise Http404
+
+    raise TransitionConflict(_('Pet is being changed, try again'), pet)
+
+
+class PetUpdateSerializer(serializers.Serializer):
+    """Serializer for the store status and version sent with an update"""
+    in_store_status = serializers.ChoiceField(
+        choices=list(TRANSITIONS), required=False
+    )
+    version = serializers.IntegerField(min_value=0, required=False)
+
+
+class PetTransitionSerializer(PetUpdateSerializer):
+    """Serializer for a requested store status transition"""
+    in_store_status = serializers.ChoiceField(choices=list(TRANSITIONS))
+
+
+def _stale(pets):
+    """Return the first pet whose row moved past the version it holds"""
+    current = dict(PetManager.objects.filter(
+        pk__in=[pet.pk for pet in pets]
+    ).values_list('id', 'version'))
+    for pet in pets:
+        if pet.pk not in current:
+            raise Http404
+        if current[pet.pk] != pet.version:
+            pet.refresh_from_db()
+            return pet
+
+
+def save_versioned(user, serializer):
+    """Save a pet update unless a pet changed since the client read it
+
+    Store status is read-only on the serializer, so a status sent with
+    the update is moved through transition_pet and the graph applies.
+    The other columns are written behind one UPDATE filtered on the
+    version each pet was read at, the one sent or else the one loaded,
+    which also locks the rows; a pet changed in between matches no row
+    and raises TransitionConflict. The summary moves from the keys the
+    locked rows held. Call it inside a transaction.
+    """
+    many = isinstance(serializer, serializers.ListSerializer)
+    pets = serializer.instance if many else [serializer.instance]
+    items = serializer.initial_data if many else [serializer.initial_data]
+
+    requested = [PetUpdateSerializer(data=item) for item in items]
+    if not all([request.is_valid() for request in requested]):
+        errors = [request.errors for request in requested]
+        raise serializers.ValidationError(errors if many else errors[0])
+
+    for pet, request in zip(pets, requested):
+        version = request.validated_data.get('version', pet.version)
+        to_status = request.validated_data.get(
+            'in_store_status', pet.in_store_status
+        )
+        if to_status != pet.in_store_status:
+            transition_pet(user, pet, to_status, version)
+        elif version != pet.version:
+            raise TransitionConflict(
+                _('Pet has changed since it was fetched'), pet
+            )
+
+    if not any(serializer.validated_data if many
+               else [serializer.validated_data]):
+        return
+
+    unique = {pet.pk: pet for pet in pets}
+    current = Q()
+    for pet in unique.values():
+        current |= Q(pk=pet.pk, version=pet.version)
+    moved = PetManager.objects.filter(current).update(
+        version=F('version') + 1
+    )
+    if moved != len(unique):
+        raise TransitionConflict(
+            _('Pet has changed since it was fetched'),
+            _stale(unique.values())
+        )
+
+    rows = {
+        pk: (category, in_store_status, version)
+        for pk, category, in_store_status, version in
+        PetManager.objects.filter(pk__in=list(unique)).values_list(
+            'id', 'category', 'in_store_status', 'version'
+        )
+    }
+    removed = [rows[pk][:2] for pk in unique]
+    serializer.save()
+    for pet in unique.values():
+        _category, pet.in_store_status, pet.version = rows[pet.pk]
+    adjust_summary(
+        user, added=summary_keys(list(unique.values())), removed=removed
+    )
+
+
+class TransitionMixin:
+    """Move a pet along the store status graph without lost updates
+
+    A TransitionConflict raised by the transition action or an update is
+    answered with 409 Conflict, the pet's current status and version and
+    the statuses it may move to.
+    """
+
+    def handle_exception(self, exc):
+        if isinstance(exc, TransitionConflict):
+            return Response({
+                'detail': str(exc),
+                'id': exc.pet.id,
+                'in_store_status': exc.pet.in_store_status,
+                'version': exc.pet.version,
+                'allowed': allowed_transitions(exc.pet.in_store_status),
+            }, status=status.HTTP_409_CONFLICT)
+
+        return super().handle_exception(exc)
+
+    @action(methods=['POST'], detail=True, url_path='transition')
+    def transition(self, request, pk=None):
+        """Change a pet's store status if the graph allows it"""
+        pet = self.get_object()
+        serializer = PetTransitionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        pet = transition_pet(
+            request.user, pet,
+            serializer.validated_data['in_store_status'],
+            serializer.validated_data.get('version')
+        )
+        invalidate_user_cache(request.user)
+
+        return Response(self.serializer_class(pet).data)
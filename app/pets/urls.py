@@ -4,12 +4,17 @@ from rest_framework.routers import DefaultRouter
 from pets import views
 
 router = DefaultRouter()
-router.register('pets', views.PetViewSet)
+router.register('pets', views.PetViewSet, basename='pet')
 router.register('order', views.OrderViewSet)
 router.register('customer', views.CustomerViewSet)
 
 app_name = 'pets'
 
 urlpatterns = [
+    path(
+        'summary/',
+        views.InventorySummaryView.as_view(),
+        name='summary'
+    ),
     path('', include(router.urls))
 ]
\ No newline at end of file
@@ -1,8 +1,12 @@
+from django.db import transaction
+from django.utils.translation import ugettext_lazy as _
+
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import viewsets, mixins, status
-from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
 
 from rest_framework import serializers
 
@@ -12,12 +16,29 @@ from core.models import PetName
 from core.models import Customer
 
 from pets import serializers
+from pets.bulk import BulkModelMixin
+from pets.cache import CachedResponseMixin, invalidate_user_cache
+from pets.conditional import ConditionalRequestMixin
+from pets.export import ExportMixin
+from pets.fastpath import FastListMixin
+from pets.filters import PetFilter
+from pets.idempotency import IdempotencyMixin
+from pets.images import schedule_variants
+from pets.importer import ImportMixin
+from pets.matching import get_index
+from pets.pagination import KeysetPagination
+from pets.prefetch import RelatedQuerysetMixin
+from pets.search import SearchMixin
+from pets.summary import adjust_summary, get_summary, summary_keys
+from pets.transitions import TransitionMixin, save_versioned
+
+from user.authentication import CachedTokenAuthentication
 
 class BasePetAttrViewSet(viewsets.GenericViewSet,
                         mixins.ListModelMixin,
                         mixins.CreateModelMixin):
     """Base viewset for user owned pet attributes"""
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated,)
 
     def get_queryset(self):
@@ -41,30 +62,29 @@ class BasePetAttrViewSet(viewsets.GenericViewSet,
         """Create a new object"""
         serializer.save(user=self.request.user)
 
-class PetViewSet(viewsets.ModelViewSet):
+class PetViewSet(ConditionalRequestMixin, IdempotencyMixin,
+                 CachedResponseMixin, BulkModelMixin, ExportMixin,
+                 ImportMixin, SearchMixin, TransitionMixin, FastListMixin,
+                 RelatedQuerysetMixin, viewsets.ModelViewSet):
     """Manage pets in the database"""
     serializer_class = serializers.PetSerializer
     queryset = PetManager.objects.all()
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated,)
+    pagination_class = KeysetPagination
+    ordering = ('-name', '-id')
+    search_fields = ('name',)
+    # Queries per request with cold caches, see core.tests.test_query_budgets
+    query_budget = {
+        'list': 2, 'retrieve': 2, 'create': 8, 'upload_image': 3,
+        'transition': 10
+    }
 
-    def _params_to_inst(self, qs):
-        """Convert a list of string IDS to a list of integers"""
-        return [int(str_id) for str_id in qs.split(',')]
-        if category:
-            category_ids: self._params_to_ints(category)
-            queryset = queryset.filter(category__id__in=category_ids)
-        if in_store_status:
-            in_store_status_ids = self_parama_to_ints(ingredients)
-            queryset = queryset.filter(in_store_status__id__in=in_store_status_id)
-    
     def get_queryset(self):
         """Retrieve the pets for the authenticated user"""
-        category = self.request.query_params.get('category')
-        in_store_status = self.request.query_params.get('in_store_status')
-        queryset = self.queryset
+        queryset = self.queryset.filter(user=self.request.user)
 
-        return self.queryset(user=self.request.user).order_by('-name')
+        return PetFilter(self.request.query_params).filter_queryset(queryset)
 
     def get_serializer_class(self):
         """Return appropriate serializer class"""
@@ -77,7 +97,22 @@ class PetViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         """Create a new Pet"""
-        serializer.save(user=self.request.user)
+        with transaction.atomic():
+            serializer.save(user=self.request.user)
+            adjust_summary(
+                self.request.user, added=summary_keys(serializer.instance)
+            )
+
+    def perform_update(self, serializer):
+        """Update Pets at the version read, moving status by transition"""
+        with transaction.atomic():
+            save_versioned(self.request.user, serializer)
+
+    def perform_destroy(self, instance):
+        """Delete a Pet and drop it from the summary counts"""
+        with transaction.atomic():
+            adjust_summary(self.request.user, removed=summary_keys(instance))
+            instance.delete()
 
     @action(methods=['POST'], detail=True, url_path='upload-image')
     def upload_image(self, request, pk=None):
@@ -89,7 +124,10 @@ class PetViewSet(viewsets.ModelViewSet):
         )
 
         if serializer.is_valid():
-            serializer.save()
+            previous = pet.image.name
+            pet = serializer.save(image_variants='')
+            schedule_variants(pet, previous)
+            invalidate_user_cache(request.user)
             return Response(
                 serializer.data,
                 status=status.HTTP_200_OK
@@ -99,16 +137,35 @@ class PetViewSet(viewsets.ModelViewSet):
             serializer.errors,
             status=status.HTTP_400_BAD_REQUEST
         )
-class OrderViewSet(viewsets.ModelViewSet):
+
+
+class InventorySummaryView(APIView):
+    """Count the user's pets by category and store status"""
+    authentication_classes = (CachedTokenAuthentication,)
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request):
+        return Response(get_summary(request.user))
+
+
+class OrderViewSet(ConditionalRequestMixin, IdempotencyMixin,
+                   CachedResponseMixin, BulkModelMixin, ExportMixin,
+                   FastListMixin, RelatedQuerysetMixin,
+                   viewsets.ModelViewSet):
     """Manage orders in the database"""
     serializer_class = serializers.OrderSerializer
     queryset = Order.objects.all()
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated,)
+    pagination_class = KeysetPagination
+    ordering = ('-customer_name', '-id')
+    query_budget = {'list': 2, 'retrieve': 2, 'create': 2}
 
     def get_queryset(self):
         """Retrieve the orders for the authenticated user"""
-        return self.queryset(user=self.request.user).order_by('-name')
+        return self.queryset.filter(
+            user=self.request.user
+        ).order_by(*self.ordering)
 
     def get_serializer_class(self):
         """Return appropriate serializer class"""
@@ -119,18 +176,65 @@ class OrderViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         """Create a new Order"""
-        serializer.save(user=self.request.user)    
+        serializer.save(user=self.request.user)
+
+    def get_match_limit(self):
+        """Return the ?limit= number of candidates to offer"""
+        try:
+            limit = int(self.request.query_params.get('limit', 5))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= 100:
+            raise ValidationError(
+                {'limit': [_('Enter a whole number from 1 to 100')]}
+            )
+        return limit
+
+    @action(methods=['GET'], detail=True, url_path='matches')
+    def matches(self, request, pk=None):
+        """List the available pets that best fit an order"""
+        order = self.get_object()
+        candidates = get_index(request.user).match(
+            order, self.get_match_limit()
+        )
+
+        return Response(
+            serializers.PetCandidateSerializer(candidates, many=True).data
+        )
+
+    @action(methods=['GET'], detail=False, url_path='matches')
+    def match_all(self, request):
+        """Assign available pets to every order in one pass"""
+        orders = self.get_queryset().only(
+            'id', 'customer_animal_choice', 'customer_budget',
+            'customer_allocated_preference'
+        )
+        results = get_index(request.user).match_all(orders)
+
+        return Response(serializers.OrderMatchSerializer(
+            [{'order': order, 'pet': pet} for order, pet in results],
+            many=True
+        ).data)
 
-class CustomerViewSet(viewsets.ModelViewSet):
+class CustomerViewSet(ConditionalRequestMixin, IdempotencyMixin,
+                      CachedResponseMixin, BulkModelMixin, ExportMixin,
+                      SearchMixin, FastListMixin, RelatedQuerysetMixin,
+                      viewsets.ModelViewSet):
     """Manage customers in the database"""
     serializer_class = serializers.CustomerSerializer
     queryset = Customer.objects.all()
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated,)
+    pagination_class = KeysetPagination
+    ordering = ('-name', '-id')
+    search_fields = ('name', 'customer_phone', 'email')
+    query_budget = {'list': 2, 'retrieve': 2, 'create': 2}
 
     def get_queryset(self):
         """Retrieve the Customers for the authenticated user"""
-        return self.queryset(user=self.request.user).order_by('-name')
+        return self.queryset.filter(
+            user=self.request.user
+        ).order_by(*self.ordering)
 
     def get_serializer_class(self):
         """Return appropriate serializer class"""
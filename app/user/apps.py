@@ -3,3 +3,10 @@ from django.apps import AppConfig
 
 class UserConfig(AppConfig):
     name = 'user'
+
+    def ready(self):
+        from user import signals  # noqa: F401
+        from core.metrics import registry
+        from user.login import collect_login_metrics
+
+        registry.register_collector(collect_login_metrics)
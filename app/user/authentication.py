@@ -0,0 +1,90 @@
+import pickle
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.translation import ugettext_lazy as _
+
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+# Per process layer in front of the shared cache: key -> (expires, payload)
+_local = {}
+_local_lock = threading.Lock()
+
+
+def _cache():
+    return caches[getattr(settings, 'AUTH_TOKEN_CACHE_ALIAS', 'default')]
+
+
+def _cache_key(key):
+    return f'auth:token:{key}'
+
+
+def _local_get(key):
+    entry = _local.get(key)
+    if entry is None:
+        return None
+    expires, payload = entry
+    if expires < time.monotonic():
+        _local.pop(key, None)
+        return None
+
+    return payload
+
+
+def _local_set(key, payload):
+    ttl = getattr(settings, 'AUTH_TOKEN_LOCAL_TTL', 5)
+    with _local_lock:
+        if len(_local) >= getattr(settings, 'AUTH_TOKEN_LOCAL_SIZE', 10000):
+            _local.clear()
+        _local[key] = (time.monotonic() + ttl, payload)
+
+
+def revoke_token(key):
+    """Drop a token from both cache layers so its next use is re-checked"""
+    _local.pop(key, None)
+    _cache().delete(_cache_key(key))
+
+
+def revoke_user_tokens(user):
+    """Drop every cached token belonging to a user"""
+    for key in Token.objects.filter(user=user).values_list('key', flat=True):
+        revoke_token(key)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication that remembers token to user lookups
+
+    Hits are served from a short lived in-process map, then from the shared
+    cache, and only a miss runs the token and user query. Logging out,
+    changing the password or deactivating the user revokes the entries.
+    """
+
+    def authenticate_credentials(self, key):
+        payload = _local_get(key)
+        if payload is None:
+            payload = _cache().get(_cache_key(key))
+            if payload is None:
+                model = self.get_model()
+                try:
+                    token = model.objects.select_related('user').get(key=key)
+                except model.DoesNotExist:
+                    raise exceptions.AuthenticationFailed(_('Invalid token.'))
+                if not token.user.is_active:
+                    raise exceptions.AuthenticationFailed(
+                        _('User inactive or deleted.')
+                    )
+                payload = pickle.dumps(token, pickle.HIGHEST_PROTOCOL)
+                _cache().set(
+                    _cache_key(key),
+                    payload,
+                    getattr(settings, 'AUTH_TOKEN_CACHE_TTL', 60)
+                )
+            _local_set(key, payload)
+
+        # Every request gets its own instances to change as it pleases
+        token = pickle.loads(payload)
+        return (token.user, token)
@@ -0,0 +1,153 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import check_password, make_password
+from django.utils.translation import ugettext_lazy as _
+
+from rest_framework import exceptions, status
+
+
+class LoginUnavailable(exceptions.APIException):
+    """Raised when too many password checks are already waiting"""
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = _('Too many logins in progress, try again shortly')
+    default_code = 'login_unavailable'
+
+
+class LoginPool:
+    """Run password hashing on a bounded pool of worker threads
+
+    At most workers hashes run at once and at most max_pending wait behind
+    them; anything beyond that is refused straight away instead of tying up
+    a request worker. With no workers hashing runs inline on the caller.
+    """
+
+    def __init__(self, workers, max_pending, timeout):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix='login'
+        ) if workers else None
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.active = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_seconds = 0.0
+        self.hash_seconds = 0.0
+
+    def _call(self, queued, func, args):
+        started = time.perf_counter()
+        with self.lock:
+            self.pending -= 1
+            self.active += 1
+            self.wait_seconds += started - queued
+        try:
+            return func(*args)
+        finally:
+            with self.lock:
+                self.active -= 1
+                self.completed += 1
+                self.hash_seconds += time.perf_counter() - started
+
+    def run(self, func, *args):
+        """Run func on the pool and return its result"""
+        with self.lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise LoginUnavailable()
+            self.pending += 1
+        queued = time.perf_counter()
+        if self.executor is None:
+            return self._call(queued, func, args)
+
+        future = self.executor.submit(self._call, queued, func, args)
+        try:
+            return future.result(self.timeout)
+        except TimeoutError:
+            # A hash still queued is dropped so it cannot run after the 503
+            if future.cancel():
+                with self.lock:
+                    self.pending -= 1
+                    self.rejected += 1
+            raise LoginUnavailable()
+
+    def metrics(self):
+        """Return a snapshot of the pool's counters"""
+        with self.lock:
+            return {
+                'workers': self.workers,
+                'pending': self.pending,
+                'active': self.active,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'wait_seconds': self.wait_seconds,
+                'hash_seconds': self.hash_seconds,
+            }
+
+
+_pool = None
+
+
+def get_login_pool():
+    """Return the process wide login pool, starting it on first use"""
+    global _pool
+    if _pool is None:
+        _pool = LoginPool(
+            getattr(settings, 'AUTH_LOGIN_WORKERS', 2),
+            getattr(settings, 'AUTH_LOGIN_MAX_PENDING', 32),
+            getattr(settings, 'AUTH_LOGIN_TIMEOUT', 10),
+        )
+    return _pool
+
+
+def collect_login_metrics():
+    """Return the login pool counters as metric families for /metrics"""
+    stats = get_login_pool().metrics()
+    return [
+        ('login_pool_pending', 'gauge',
+         'Password checks waiting for a worker', [({}, stats['pending'])]),
+        ('login_pool_active', 'gauge',
+         'Password checks running', [({}, stats['active'])]),
+        ('login_pool_completed_total', 'counter',
+         'Password checks finished', [({}, stats['completed'])]),
+        ('login_pool_rejected_total', 'counter',
+         'Logins refused with a full queue', [({}, stats['rejected'])]),
+        ('login_pool_wait_seconds_total', 'counter',
+         'Time password checks spent queued', [({}, stats['wait_seconds'])]),
+    ]
+
+
+def _check(password, encoded):
+    """Return whether password matches and whether its hash is outdated"""
+    outdated = []
+    return check_password(password, encoded, outdated.append), bool(outdated)
+
+
+def authenticate_email(email, password):
+    """Return the active user for email and password or None
+
+    Mirrors ModelBackend, but only the hash runs on the login pool, the
+    queries stay on the request thread. Unknown emails still pay for one
+    hash so response times do not reveal which accounts exist.
+    """
+    model = get_user_model()
+    pool = get_login_pool()
+    try:
+        user = model._default_manager.get_by_natural_key(email)
+    except model.DoesNotExist:
+        pool.run(make_password, password)
+        return None
+
+    valid, outdated = pool.run(_check, password, user.password)
+    if not valid or not user.is_active:
+        return None
+    if outdated:
+        user.set_password(password)
+        user.save(update_fields=['password'])
+
+    return user
@@ -0,0 +1,99 @@
+import statistics
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from rest_framework.authtoken.models import Token
+
+from user import login
+from user.login import LoginPool
+
+
+class Command(BaseCommand):
+    """Django command to measure logins against other API latency"""
+    help = 'Time token logins and a concurrent API read, inline vs pooled'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=8)
+        parser.add_argument('--seconds', type=float, default=5)
+
+    def login_loop(self, deadline, counts):
+        client = Client()
+        payload = {'email': 'bench-login@example.com', 'password': 'benchpass'}
+        try:
+            while time.perf_counter() < deadline:
+                res = client.post(reverse('user:token'), payload)
+                counts[res.status_code] = counts.get(res.status_code, 0) + 1
+        finally:
+            connection.close()
+
+    def api_loop(self, deadline, token, latencies):
+        client = Client(HTTP_AUTHORIZATION=f'Token {token}')
+        try:
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                client.get(reverse('user:me'))
+                latencies.append(time.perf_counter() - start)
+        finally:
+            connection.close()
+
+    def run_mode(self, pool, token, options):
+        """Run the mixed load against one pool and return its figures"""
+        login._pool = pool
+        deadline = time.perf_counter() + options['seconds']
+        counts, latencies = {}, []
+        threads = [
+            threading.Thread(target=self.login_loop, args=(deadline, counts))
+            for _ in range(options['logins'])
+        ]
+        threads.append(threading.Thread(
+            target=self.api_loop, args=(deadline, token, latencies)
+        ))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        latencies.sort()
+        return (
+            counts.get(200, 0) / options['seconds'],
+            counts.get(503, 0),
+            statistics.median(latencies) * 1000,
+            latencies[int(len(latencies) * 0.95)] * 1000,
+        )
+
+    def handle(self, *args, **options):
+        user = get_user_model().objects.create_user(
+            'bench-login@example.com', 'benchpass'
+        )
+        token = Token.objects.create(user=user)
+        modes = (
+            ('inline', LoginPool(0, options['logins'], 10)),
+            ('pooled', LoginPool(
+                settings.AUTH_LOGIN_WORKERS,
+                settings.AUTH_LOGIN_MAX_PENDING,
+                settings.AUTH_LOGIN_TIMEOUT
+            )),
+        )
+        self.stdout.write(
+            f'{"mode":>8} {"logins/s":>10} {"rejected":>9} '
+            f'{"api p50":>9} {"api p95":>9}'
+        )
+        try:
+            for name, pool in modes:
+                rate, rejected, p50, p95 = self.run_mode(
+                    pool, token.key, options
+                )
+                self.stdout.write(
+                    f'{name:>8} {rate:>10.1f} {rejected:>9} '
+                    f'{p50:>7.1f}ms {p95:>7.1f}ms'
+                )
+        finally:
+            login._pool = None
+            user.delete()
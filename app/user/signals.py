@@ -0,0 +1,20 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from rest_framework.authtoken.models import Token
+
+from user.authentication import revoke_token, revoke_user_tokens
+
+
+@receiver(post_save, sender=get_user_model())
+def revoke_on_user_save(sender, instance, created, **kwargs):
+    """Forget cached tokens when a password or is_active may have changed"""
+    if not created:
+        revoke_user_tokens(instance)
+
+
+@receiver(post_delete, sender=Token)
+def revoke_on_token_delete(sender, instance, **kwargs):
+    """Forget a token as soon as it is deleted"""
+    revoke_token(instance.key)
@@ -0,0 +1,96 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient, APIRequestFactory
+
+from user import authentication
+from user.authentication import CachedTokenAuthentication
+
+ME_URL = reverse('user:me')
+LOGOUT_URL = reverse('user:logout')
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Test the cached token authentication backend"""
+
+    def setUp(self):
+        authentication._cache().clear()
+        authentication._local.clear()
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com',
+            'testpass',
+            name='Test'
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def authenticate(self):
+        request = APIRequestFactory().get(
+            '/', HTTP_AUTHORIZATION=f'Token {self.token.key}'
+        )
+        return CachedTokenAuthentication().authenticate(request)
+
+    def test_cache_hit_runs_no_queries(self):
+        """Test a cached token authenticates without touching the db"""
+        self.authenticate()
+
+        with self.assertNumQueries(0):
+            user, token = self.authenticate()
+        self.assertEqual(user, self.user)
+        self.assertEqual(token.key, self.token.key)
+
+    def test_shared_cache_hit_runs_no_queries(self):
+        """Test another process finds the token in the shared cache"""
+        self.authenticate()
+        authentication._local.clear()
+
+        with self.assertNumQueries(0):
+            user, _ = self.authenticate()
+        self.assertEqual(user, self.user)
+
+    def test_hits_return_separate_instances(self):
+        """Test requests never share a cached user instance"""
+        first, _ = self.authenticate()
+        second, _ = self.authenticate()
+
+        self.assertIsNot(first, second)
+
+    def test_logout_revokes_token(self):
+        """Test logging out rejects the token right away"""
+        self.assertEqual(
+            self.client.get(ME_URL).status_code, status.HTTP_200_OK
+        )
+
+        res = self.client.post(LOGOUT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Token.objects.filter(key=self.token.key).exists())
+        self.assertEqual(
+            self.client.get(ME_URL).status_code,
+            status.HTTP_401_UNAUTHORIZED
+        )
+
+    def test_password_change_revokes_cache(self):
+        """Test updating the password drops the cached lookup"""
+        self.authenticate()
+
+        res = self.client.patch(ME_URL, {'password': 'newpass123'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(1):
+            user, _ = self.authenticate()
+        self.assertTrue(user.check_password('newpass123'))
+
+    def test_deactivated_user_rejected(self):
+        """Test flipping is_active off rejects a cached token"""
+        self.authenticate()
+
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
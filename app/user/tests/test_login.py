@@ -0,0 +1,121 @@
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from user.login import LoginPool, LoginUnavailable, authenticate_email
+
+TOKEN_URL = reverse('user:token')
+METRICS_URL = reverse('user:token-metrics')
+
+
+class LoginPoolTests(TestCase):
+    """Test the bounded password hashing pool"""
+
+    def test_run_returns_result(self):
+        """Test work submitted to the pool returns its result"""
+        pool = LoginPool(2, 4, 5)
+
+        self.assertEqual(pool.run(sum, (1, 2)), 3)
+        self.assertEqual(pool.metrics()['completed'], 1)
+        self.assertEqual(pool.metrics()['pending'], 0)
+
+    def test_inline_without_workers(self):
+        """Test a pool with no workers hashes on the calling thread"""
+        pool = LoginPool(0, 4, 5)
+
+        self.assertEqual(
+            pool.run(threading.current_thread), threading.current_thread()
+        )
+
+    def test_full_queue_rejected(self):
+        """Test logins beyond the pending limit are refused at once"""
+        pool = LoginPool(1, 1, 5)
+        release = threading.Event()
+        started = threading.Event()
+
+        def block():
+            started.set()
+            release.wait(5)
+
+        runner = threading.Thread(target=pool.run, args=(block,))
+        runner.start()
+        started.wait(5)
+        waiter = threading.Thread(target=pool.run, args=(lambda: None,))
+        waiter.start()
+        while pool.metrics()['pending'] < 1:
+            time.sleep(0.001)
+
+        with self.assertRaises(LoginUnavailable):
+            pool.run(lambda: None)
+        release.set()
+        runner.join()
+        waiter.join()
+        self.assertEqual(pool.metrics()['rejected'], 1)
+        self.assertEqual(pool.metrics()['completed'], 2)
+
+    def test_timed_out_hash_cancelled(self):
+        """Test a hash that times out in the queue never runs"""
+        pool = LoginPool(1, 4, 0.05)
+        release = threading.Event()
+        ran = []
+        busy = pool.executor.submit(release.wait, 5)
+
+        with self.assertRaises(LoginUnavailable):
+            pool.run(ran.append, 1)
+        self.assertEqual(pool.metrics()['pending'], 0)
+        self.assertEqual(pool.metrics()['rejected'], 1)
+        release.set()
+        busy.result()
+        pool.executor.shutdown()
+        self.assertEqual(ran, [])
+        self.assertEqual(pool.metrics()['completed'], 0)
+
+
+class TokenLoginTests(TestCase):
+    """Test the token endpoint backed by the login pool"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'test@testing.com',
+            'testpass'
+        )
+        self.client = APIClient()
+
+    def test_authenticate_email(self):
+        """Test the password check accepts only the right password"""
+        self.assertEqual(
+            authenticate_email('test@testing.com', 'testpass'), self.user
+        )
+        self.assertIsNone(authenticate_email('test@testing.com', 'wrong'))
+        self.assertIsNone(authenticate_email('other@testing.com', 'testpass'))
+
+    def test_inactive_user_rejected(self):
+        """Test an inactive user cannot obtain a token"""
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.post(
+            TOKEN_URL, {'email': 'test@testing.com', 'password': 'testpass'}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_metrics_admin_only(self):
+        """Test the pool metrics are only shown to staff"""
+        self.client.force_authenticate(self.user)
+        res = self.client.get(METRICS_URL)
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.user.is_staff = True
+        self.user.save()
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('pending', res.data)
+        self.assertIn('rejected', res.data)